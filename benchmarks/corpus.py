@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Synthetic markdown corpus for the benchmarks.
+
+Documents are built from a seeded random generator, so the same kind, size
+and seed always give the same text. Kinds:
+
+- prose: headings and paragraphs with inline formatting and links
+- lists: deeply nested bullet, numbered and task lists
+- tables: large pipe tables
+- code: many fenced code blocks in several languages
+- mermaid: mermaid diagram fences
+- front_matter: a long YAML front matter block followed by prose
+- mixed: all of the above, section by section
+
+Usage:
+    python benchmarks/corpus.py OUTPUT_DIR [--kinds prose,...] [--sizes 1K,...] [--seed N]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+KINDS = ["prose", "lists", "tables", "code", "mermaid", "front_matter", "mixed"]
+
+DEFAULT_SIZES = "1K,10K,100K,1M,10M,50M"
+
+WORDS = (
+    "render preview editor document markdown section paragraph heading table "
+    "list item block inline code fence diagram value result change update text "
+    "format style theme window buffer cache parser token stream output input the "
+    "a of and to in is that for with on as by it this from at be are was"
+).split()
+
+CODE_SAMPLES = {
+    "python": (
+        "def fibonacci(n: int) -> int:\n"
+        "    \"\"\"Return the {index}th Fibonacci number.\"\"\"\n"
+        "    a, b = 0, 1\n"
+        "    for _ in range(n):\n"
+        "        a, b = b, a + b\n"
+        "    return a\n"
+    ),
+    "javascript": (
+        "function debounce(fn, wait = {index}) {{\n"
+        "  let timer = null;\n"
+        "  return (...args) => {{\n"
+        "    clearTimeout(timer);\n"
+        "    timer = setTimeout(() => fn(...args), wait);\n"
+        "  }};\n"
+        "}}\n"
+    ),
+    "bash": (
+        "for file in docs/*.md; do\n"
+        "    markdown-editor render \"$file\" --jobs {index}\n"
+        "done\n"
+    ),
+    "json": (
+        "{{\n"
+        "  \"id\": {index},\n"
+        "  \"name\": \"item-{index}\",\n"
+        "  \"tags\": [\"alpha\", \"beta\"]\n"
+        "}}\n"
+    ),
+}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 10K or 5M into bytes."""
+    value = value.strip().upper()
+    multiplier = 1
+    if value.endswith("K"):
+        multiplier, value = 1024, value[:-1]
+    elif value.endswith("M"):
+        multiplier, value = 1024 * 1024, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def _sentence(rng: random.Random) -> str:
+    """Build a sentence with some inline formatting."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+    position = rng.randrange(len(words))
+    decoration = rng.random()
+    if decoration < 0.2:
+        words[position] = f"**{words[position]}**"
+    elif decoration < 0.35:
+        words[position] = f"*{words[position]}*"
+    elif decoration < 0.5:
+        words[position] = f"`{words[position]}`"
+    elif decoration < 0.6:
+        words[position] = f"[{words[position]}](https://example.com/{position})"
+    return " ".join(words).capitalize() + "."
+
+
+def _prose(rng: random.Random, index: int) -> str:
+    """Build a section of headings and paragraphs."""
+    parts = [f"## Section {index}\n"]
+    for _ in range(rng.randint(2, 4)):
+        parts.append(" ".join(_sentence(rng) for _ in range(rng.randint(2, 5))) + "\n")
+    if rng.random() < 0.3:
+        parts.append(f"### Subsection {index}\n")
+        parts.append("> " + _sentence(rng) + "\n")
+    return "\n".join(parts) + "\n"
+
+
+def _lists(rng: random.Random, index: int) -> str:
+    """Build a section of nested lists, six levels deep."""
+    lines = [f"## List {index}", ""]
+    for item in range(rng.randint(3, 6)):
+        depth = 0
+        for _ in range(rng.randint(1, 6)):
+            indent = "    " * depth
+            kind = rng.random()
+            if kind < 0.5:
+                marker = "-"
+            elif kind < 0.8:
+                marker = f"{item + 1}."
+            else:
+                marker = "- [x]" if rng.random() < 0.5 else "- [ ]"
+            lines.append(f"{indent}{marker} {_sentence(rng)}")
+            depth = min(depth + 1, 5)
+    return "\n".join(lines) + "\n\n"
+
+
+def _table(rng: random.Random, index: int) -> str:
+    """Build a large pipe table."""
+    columns = rng.randint(4, 8)
+    lines = [
+        f"## Table {index}",
+        "",
+        "| " + " | ".join(f"Column {column}" for column in range(columns)) + " |",
+        "|" + "|".join(":---" if column == 0 else "---:" for column in range(columns)) + "|",
+    ]
+    for row in range(rng.randint(20, 60)):
+        cells = [rng.choice(WORDS)] + [str(rng.randint(0, 100000)) for _ in range(columns - 1)]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n\n"
+
+
+def _code(rng: random.Random, index: int) -> str:
+    """Build a section with a few fenced code blocks."""
+    parts = [f"## Code {index}\n", _sentence(rng) + "\n"]
+    for block in range(rng.randint(2, 4)):
+        language = rng.choice(sorted(CODE_SAMPLES))
+        # The index makes each block distinct, so highlighting can't be reused
+        code = CODE_SAMPLES[language].format(index=index * 10 + block)
+        parts.append(f"```{language}\n{code}```\n")
+    return "\n".join(parts) + "\n"
+
+
+def _mermaid(rng: random.Random, index: int) -> str:
+    """Build a section with a mermaid diagram."""
+    nodes = rng.randint(4, 12)
+    edges = "\n".join(
+        f"    N{index}_{node} --> N{index}_{rng.randrange(nodes)}[{rng.choice(WORDS)}]"
+        for node in range(nodes)
+    )
+    return f"## Diagram {index}\n\n```mermaid\ngraph TD\n{edges}\n```\n\n{_sentence(rng)}\n\n"
+
+
+def _front_matter(rng: random.Random, size: int) -> str:
+    """Build YAML front matter of about a tenth of the document size."""
+    lines = ["---", "title: Benchmark document", "author: Benchmark", "tags: [benchmark, corpus]"]
+    length = 0
+    index = 0
+    while length < max(256, size // 10):
+        line = f"key_{index}: {' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))}"
+        lines.append(line)
+        length += len(line) + 1
+        index += 1
+    lines.append("---")
+    return "\n".join(lines) + "\n\n"
+
+
+SECTIONS = {
+    "prose": [_prose],
+    "lists": [_lists],
+    "tables": [_table],
+    "code": [_code],
+    "mermaid": [_mermaid],
+    "front_matter": [_prose],
+    "mixed": [_prose, _lists, _table, _code, _mermaid],
+}
+
+
+def generate(kind: str, size: int, seed: int = 0) -> str:
+    """
+    Generate a markdown document.
+    
+    Args:
+        kind: One of KINDS
+        size: Approximate size in characters
+        seed: Seed of the random generator
+        
+    Returns:
+        Markdown text of at least the given size
+    """
+    if kind not in SECTIONS:
+        raise ValueError(f"Unknown corpus kind: {kind}")
+    
+    rng = random.Random(f"{kind}:{seed}")
+    parts = [f"# Benchmark corpus: {kind}\n\n"]
+    if kind == "front_matter":
+        parts.insert(0, _front_matter(rng, size))
+    
+    builders = SECTIONS[kind]
+    length = sum(len(part) for part in parts)
+    index = 0
+    while length < size:
+        part = builders[index % len(builders)](rng, index)
+        parts.append(part)
+        length += len(part)
+        index += 1
+    
+    return "".join(parts)
+
+
+def main() -> int:
+    """Write the corpus to a directory."""
+    parser = argparse.ArgumentParser(description="Generate the benchmark markdown corpus")
+    parser.add_argument("output", help="Directory to write the documents to")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="Comma-separated document kinds")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+    args = parser.parse_args()
+    
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    
+    for kind in args.kinds.split(","):
+        for label in args.sizes.split(","):
+            path = output / f"{kind}-{label.strip().upper()}.md"
+            path.write_text(generate(kind, parse_size(label), args.seed), encoding="utf-8")
+            print(path)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+HTML-to-markdown conversion benchmark.
+
+Compares the single-pass converter with the regex cascade it replaced, on
+rich text HTML shaped like QTextEdit.toHtml() output from 1 KB to 5 MB.
+
+The regex cascade grows quadratically; at 5 MB it takes minutes. Use
+--legacy-max-size to skip it above a size.
+
+Usage:
+    python benchmarks/html_to_markdown.py [--sizes 1K,10K,...] [--runs N]
+                                          [--legacy-max-size SIZE] [--json]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+DEFAULT_SIZES = "1K,10K,100K,1M,5M"
+
+QT_HEADER = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" /><style type="text/css">\n'
+    'p, li { white-space: pre-wrap; }\n'
+    '</style></head><body style=" font-family:\'Sans Serif\'; font-size:9pt; font-weight:400; font-style:normal;">\n'
+)
+QT_FOOTER = '</body></html>'
+QT_PARAGRAPH = '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">'
+
+# One section of a rich text document: headings, formatted text and a list
+SECTION = (
+    '<h2 style=" margin-top:16px; margin-bottom:12px;">Section {index}</h2>\n'
+    + QT_PARAGRAPH + 'Plain text with <span style=" font-weight:700;">bold</span>, '
+    '<span style=" font-style:italic;">italic</span> and '
+    '<a href="https://example.com/{index}"><span style=" text-decoration: underline; color:#0000ff;">a link</span></a>.</p>\n'
+    + QT_PARAGRAPH + '<span style=" font-family:\'Consolas\';">inline_code({index})</span> in a sentence '
+    'that goes on for a while so the paragraph has a realistic length.</p>\n'
+    '<ul style="margin-top: 0px; margin-bottom: 0px; -qt-list-indent: 1;">'
+    '<li style=" margin-top:0px; margin-bottom:0px;">First item</li>\n'
+    '<li style=" margin-top:0px; margin-bottom:0px;">Second <span style=" font-weight:700;">item</span></li></ul>\n'
+    '<p style="-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px;"><br /></p>\n'
+)
+
+
+def legacy_html_to_markdown(html: str) -> str:
+    """The regex cascade the single-pass converter replaced."""
+    replacements = [
+        (r'<h1[^>]*>(.*?)</h1>', r'# \1'),
+        (r'<h2[^>]*>(.*?)</h2>', r'## \1'),
+        (r'<h3[^>]*>(.*?)</h3>', r'### \1'),
+        (r'<h4[^>]*>(.*?)</h4>', r'#### \1'),
+        (r'<h5[^>]*>(.*?)</h5>', r'##### \1'),
+        (r'<h6[^>]*>(.*?)</h6>', r'###### \1'),
+        (r'<strong[^>]*>(.*?)</strong>', r'**\1**'),
+        (r'<b[^>]*>(.*?)</b>', r'**\1**'),
+        (r'<em[^>]*>(.*?)</em>', r'*\1*'),
+        (r'<i[^>]*>(.*?)</i>', r'*\1*'),
+        (r'<code[^>]*>(.*?)</code>', r'`\1`'),
+        (r'<a[^>]*href="([^"]*)"[^>]*>(.*?)</a>', r'[\2](\1)'),
+        (r'<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*/?>', r'![\2](\1)'),
+        (r'<br[^>]*/?>', r'\n'),
+        (r'<p[^>]*>', r'\n'),
+        (r'</p>', r'\n'),
+        (r'<div[^>]*>', r''),
+        (r'</div>', r''),
+    ]
+    
+    text = html
+    for pattern, replacement in replacements:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE | re.DOTALL)
+    
+    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
+    return text.strip()
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 10K or 5M into bytes."""
+    value = value.strip().upper()
+    multiplier = 1
+    if value.endswith("K"):
+        multiplier, value = 1024, value[:-1]
+    elif value.endswith("M"):
+        multiplier, value = 1024 * 1024, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def build_document(size: int) -> str:
+    """Build rich text HTML of about the given size."""
+    sections = []
+    length = len(QT_HEADER) + len(QT_FOOTER)
+    index = 0
+    while length < size:
+        section = SECTION.format(index=index)
+        sections.append(section)
+        length += len(section)
+        index += 1
+    return QT_HEADER + "".join(sections) + QT_FOOTER
+
+
+def time_call(function, argument, runs: int) -> float:
+    """Get the median time of a call in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    """Run the benchmark and report the timings."""
+    parser = argparse.ArgumentParser(description="Compare HTML-to-markdown converters")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated input sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per size")
+    parser.add_argument("--legacy-max-size", help="Skip the regex cascade above this size")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    sys.path.insert(0, str(SRC_DIR))
+    from markdown_editor.core.html_to_markdown import html_to_markdown
+    
+    legacy_max_size = parse_size(args.legacy_max_size) if args.legacy_max_size else None
+    
+    results = []
+    for size in (parse_size(value) for value in args.sizes.split(",")):
+        document = build_document(size)
+        single_pass = time_call(html_to_markdown, document, args.runs)
+        if legacy_max_size is None or size <= legacy_max_size:
+            legacy = time_call(legacy_html_to_markdown, document, args.runs)
+        else:
+            legacy = None
+        results.append({
+            "bytes": len(document),
+            "legacy_ms": legacy * 1000 if legacy is not None else None,
+            "single_pass_ms": single_pass * 1000,
+            "speedup": legacy / single_pass if legacy is not None and single_pass > 0 else None,
+        })
+    
+    if args.json:
+        print(json.dumps({"runs": args.runs, "results": results}, indent=2))
+    else:
+        print(f"HTML to markdown, median of {args.runs} runs")
+        print(f"  {'size':>10}   {'regex cascade':>14}   {'single pass':>12}   speedup")
+        for result in results:
+            if result['legacy_ms'] is None:
+                print(f"  {result['bytes']:>10,}   {'skipped':>14}   "
+                      f"{result['single_pass_ms']:>9.1f} ms")
+            else:
+                print(f"  {result['bytes']:>10,}   {result['legacy_ms']:>11.1f} ms   "
+                      f"{result['single_pass_ms']:>9.1f} ms   {result['speedup']:6.2f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
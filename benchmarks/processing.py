@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the core processing paths.
+
+Times, on every document of the synthetic corpus (see corpus.py):
+- MarkdownProcessor.markdown_to_html
+- MarkdownProcessor.html_to_markdown_approximation, on the rendered HTML
+- MarkdownProcessor.extract_metadata
+- FileManager.open_file and FileManager.save_file, on temporary files
+
+Runs headless: no QApplication is created. Results carry the interpreter,
+library versions and git commit, so a JSON report saved with --output can be
+compared with a later run on the same machine with --compare.
+
+Usage:
+    python benchmarks/processing.py [--kinds prose,...] [--sizes 1K,...] [--runs N]
+                                    [--operations markdown_to_html,...]
+                                    [--json] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from corpus import KINDS, generate, parse_size
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# The full range goes up to 50M; rendering that takes minutes per kind
+DEFAULT_SIZES = "1K,10K,100K,1M"
+
+OPERATIONS = ["markdown_to_html", "html_to_markdown", "extract_metadata", "open_file", "save_file"]
+
+
+def time_call(function, runs: int, setup=None) -> dict:
+    """Time a call, running setup (untimed) before each run."""
+    timings = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+def environment() -> dict:
+    """Describe what the results were measured with."""
+    import markdown
+    import pymdownx
+    from PyQt6.QtCore import PYQT_VERSION_STR
+    
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "markdown": markdown.__version__,
+        "pymdownx": pymdownx.__version__,
+        "pyqt": PYQT_VERSION_STR,
+    }
+
+
+def run_benchmarks(kinds, sizes, operations, runs: int, seed: int) -> list:
+    """Time every operation on every corpus document."""
+    from PyQt6.QtCore import QSettings
+    from markdown_editor.core.file_manager import FileManager
+    from markdown_editor.core.highlight_cache import highlight_cache
+    from markdown_editor.core.markdown_processor import MarkdownProcessor
+    
+    processor = MarkdownProcessor()
+    results = []
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the recent files list out of the user's settings
+        QSettings.setPath(QSettings.Format.NativeFormat, QSettings.Scope.UserScope, directory)
+        file_manager = FileManager()
+        
+        for kind in kinds:
+            for label in sizes:
+                text = generate(kind, parse_size(label), seed)
+                html = processor.markdown_to_html(text)
+                path = str(Path(directory) / f"{kind}-{label}.md")
+                Path(path).write_text(text, encoding="utf-8")
+                save_paths = (str(Path(directory) / f"{kind}-{label}-saved-{run}.md") for run in itertools.count())
+                
+                calls = {
+                    # Highlighting is memoized; every run starts cold
+                    "markdown_to_html": (lambda: processor.markdown_to_html(text), highlight_cache.clear),
+                    "html_to_markdown": (lambda: processor.html_to_markdown_approximation(html), None),
+                    "extract_metadata": (lambda: processor.extract_metadata(text), None),
+                    "open_file": (lambda: file_manager.open_file(path), None),
+                    # A fresh path each run, since saving content the file
+                    # already has is skipped
+                    "save_file": (lambda: file_manager.save_file(text, next(save_paths)), None),
+                }
+                
+                for operation in operations:
+                    function, setup = calls[operation]
+                    timing = time_call(function, runs, setup)
+                    size = len(html) if operation == "html_to_markdown" else len(text.encode("utf-8"))
+                    results.append({
+                        "operation": operation,
+                        "kind": kind,
+                        "size": label,
+                        "bytes": size,
+                        **timing,
+                        "mb_per_s": size / 1024 / 1024 / (timing["median_ms"] / 1000) if timing["median_ms"] else None,
+                    })
+    
+    return results
+
+
+def compare(results: list, baseline: dict) -> list:
+    """Pair results with the same measurement of a baseline report."""
+    previous = {
+        (result["operation"], result["kind"], result["size"]): result
+        for result in baseline.get("results", [])
+    }
+    comparison = []
+    for result in results:
+        before = previous.get((result["operation"], result["kind"], result["size"]))
+        if before is None or not before["median_ms"]:
+            continue
+        comparison.append({
+            "operation": result["operation"],
+            "kind": result["kind"],
+            "size": result["size"],
+            "baseline_ms": before["median_ms"],
+            "median_ms": result["median_ms"],
+            "ratio": result["median_ms"] / before["median_ms"],
+        })
+    return comparison
+
+
+def main() -> int:
+    """Run the suite and report the timings."""
+    parser = argparse.ArgumentParser(description="Benchmark the core processing paths")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="Comma-separated corpus kinds")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated sizes, up to 50M (default: {DEFAULT_SIZES})")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="Comma-separated operations to time")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus generator")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare with")
+    args = parser.parse_args()
+    
+    sys.path.insert(0, str(SRC_DIR))
+    
+    kinds = [kind.strip() for kind in args.kinds.split(",")]
+    sizes = [size.strip().upper() for size in args.sizes.split(",")]
+    operations = [operation.strip() for operation in args.operations.split(",")]
+    for operation in operations:
+        if operation not in OPERATIONS:
+            parser.error(f"unknown operation: {operation}")
+    
+    report = {
+        "environment": environment(),
+        "runs": args.runs,
+        "seed": args.seed,
+        "results": run_benchmarks(kinds, sizes, operations, args.runs, args.seed),
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            report["comparison"] = compare(report["results"], json.load(file))
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    
+    print(f"Core processing, median of {args.runs} runs ({report['environment']['commit'] or 'no commit'})")
+    print(f"  {'operation':<18} {'kind':<13} {'size':>6} {'bytes':>12} {'median':>12} {'MB/s':>9}")
+    for result in report["results"]:
+        throughput = f"{result['mb_per_s']:9.1f}" if result["mb_per_s"] is not None else f"{'-':>9}"
+        print(f"  {result['operation']:<18} {result['kind']:<13} {result['size']:>6} "
+              f"{result['bytes']:>12,} {result['median_ms']:>9.2f} ms {throughput}")
+    
+    if "comparison" in report:
+        print()
+        print(f"Compared with {args.compare} (ratio > 1 is slower)")
+        for entry in report["comparison"]:
+            print(f"  {entry['operation']:<18} {entry['kind']:<13} {entry['size']:>6} "
+                  f"{entry['baseline_ms']:>9.2f} ms -> {entry['median_ms']:>9.2f} ms   {entry['ratio']:5.2f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
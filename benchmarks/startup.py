@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the markdown editor.
+
+Measures, from the start of a fresh process:
+- import time of the application module
+- time until the main window is exposed
+- time until the first keystroke has been handled by the editor
+- time until the preview engine and markdown processor are loaded
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--json]
+
+Runs headless (offscreen) when no display is available.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+METRICS = ["import", "window", "first_keystroke", "preview_ready"]
+
+
+def run_child() -> dict:
+    """Start the application in this process and time each milestone."""
+    start = time.perf_counter()
+    
+    sys.path.insert(0, str(SRC_DIR))
+    from markdown_editor.app import MarkdownEditorApp
+    imported = time.perf_counter()
+    
+    from PyQt6.QtCore import QCoreApplication, QEventLoop, Qt
+    from PyQt6.QtTest import QTest
+    
+    editor_app = MarkdownEditorApp()
+    app = editor_app.create_application()
+    window = editor_app.create_main_window()
+    window.show()
+    QTest.qWaitForWindowExposed(window)
+    shown = time.perf_counter()
+    
+    # Type into the editor that has focus on startup; content_changed is
+    # debounced, so the keystroke is timed by the text edit itself
+    window.editor.focus_editor()
+    keystrokes = []
+    window.editor.rich_editor.textChanged.connect(lambda: keystrokes.append(time.perf_counter()))
+    QTest.keyClick(window.editor.rich_editor, Qt.Key.Key_A)
+    app.processEvents()
+    typed = keystrokes[0] if keystrokes else float("nan")
+    
+    # Wait for the deferred preview engine and markdown processor
+    deadline = time.perf_counter() + 30
+    while window.markdown_processor is None and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    preview_ready = time.perf_counter() if window.markdown_processor is not None else float("nan")
+    
+    window.editor.shutdown()
+    
+    return {
+        "import": imported - start,
+        "window": shown - start,
+        "first_keystroke": typed - start,
+        "preview_ready": preview_ready - start,
+    }
+
+
+def main() -> int:
+    """Run the benchmark in fresh processes and report the medians."""
+    parser = argparse.ArgumentParser(description="Measure markdown editor startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes to start")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(run_child()))
+        return 0
+    
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    
+    results = {
+        metric: {
+            "median_ms": statistics.median(run[metric] for run in runs) * 1000,
+            "min_ms": min(run[metric] for run in runs) * 1000,
+            "max_ms": max(run[metric] for run in runs) * 1000,
+        }
+        for metric in METRICS
+    }
+    
+    if args.json:
+        print(json.dumps({"runs": args.runs, "results": results}, indent=2))
+    else:
+        print(f"Startup over {args.runs} runs (ms since process start)")
+        for metric in METRICS:
+            values = results[metric]
+            print(f"  {metric:<16} median {values['median_ms']:8.1f}   "
+                  f"min {values['min_ms']:8.1f}   max {values['max_ms']:8.1f}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,7 @@ current_dir = Path(__file__).parent
 src_dir = current_dir / "src"
 sys.path.insert(0, str(src_dir))
 
-from markdown_editor.app import main
+from markdown_editor.cli import main
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -40,7 +40,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "markdown-editor=markdown_editor.app:main",
+            "markdown-editor=markdown_editor.cli:main",
         ],
         "gui_scripts": [
             "markdown-editor-gui=markdown_editor.app:main",
@@ -4,9 +4,10 @@ Main application entry point for the markdown editor.
 
 import sys
 import os
+import importlib.util
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QSplashScreen, QMessageBox
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QCoreApplication
 from PyQt6.QtGui import QPixmap, QFont, QIcon
 
 # Add the src directory to the Python path for imports
@@ -14,7 +15,6 @@ current_dir = Path(__file__).parent
 src_dir = current_dir.parent
 sys.path.insert(0, str(src_dir))
 
-from markdown_editor.ui.main_window import MainWindow
 from markdown_editor import __version__
 
 
@@ -31,6 +31,9 @@ class MarkdownEditorApp:
     
     def create_application(self):
         """Create the QApplication instance."""
+        # Required for QtWebEngine, which is imported after the application exists
+        QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+        
         self.app = QApplication(sys.argv)
         
         # Set application properties
@@ -74,6 +77,9 @@ class MarkdownEditorApp:
     
     def create_main_window(self):
         """Create and setup the main window."""
+        # Deferred so the splash screen is up while the UI modules load
+        from markdown_editor.ui.main_window import MainWindow
+        
         self.main_window = MainWindow()
         return self.main_window
     
@@ -91,11 +97,10 @@ class MarkdownEditorApp:
     def _open_file_delayed(self, file_path):
         """Open a file with a small delay."""
         if self.main_window:
-            success, content = self.main_window.file_manager.open_file(file_path)
+            # The window shows the content when the file manager reports it opened
+            success, content = self.main_window.file_manager.open_file_async(file_path)
             if success:
-                self.main_window.editor.set_content(content)
-                self.main_window._update_window_title()
-                self.main_window.status_bar.showMessage(f"Opened: {os.path.basename(file_path)}", 3000)
+                self.main_window.status_bar.showMessage(f"Opening: {os.path.basename(file_path)}...")
             else:
                 QMessageBox.warning(
                     self.main_window,
@@ -136,8 +141,9 @@ class MarkdownEditorApp:
             # Show splash screen
             splash = self.show_splash_screen()
             
-            # Simulate loading time
-            QTimer.singleShot(1500, lambda: self._finish_startup(splash))
+            # Show the editor right away; the preview engine loads once
+            # the window is up
+            self._finish_startup(splash)
             
             # Start event loop
             return app.exec()
@@ -172,15 +178,12 @@ def main():
         print("Python 3.8 or later is required.", file=sys.stderr)
         return 1
     
-    # Check for required packages
-    try:
-        import PyQt6
-        import markdown
-        import pymdown
-    except ImportError as e:
-        print(f"Missing required package: {e}", file=sys.stderr)
-        print("Please install dependencies: pip install -r requirements.txt", file=sys.stderr)
-        return 1
+    # Check for required packages without importing them yet
+    for package in ("PyQt6", "markdown", "pymdownx"):
+        if importlib.util.find_spec(package) is None:
+            print(f"Missing required package: No module named '{package}'", file=sys.stderr)
+            print("Please install dependencies: pip install -r requirements.txt", file=sys.stderr)
+            return 1
     
     # Create and run application
     app = MarkdownEditorApp()
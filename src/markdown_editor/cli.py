@@ -0,0 +1,90 @@
+"""
+Command line entry point for the markdown editor.
+
+Subcommands run headless and never create a QApplication; anything else
+starts the GUI.
+"""
+
+import argparse
+import sys
+
+
+def _render_command(args) -> int:
+    """Render a directory tree of markdown files to HTML."""
+    from markdown_editor.core.batch_renderer import render_tree, format_report
+    
+    report = render_tree(args.source, args.output, args.jobs)
+    if not args.quiet:
+        print(format_report(report))
+    
+    return 1 if report['failed'] else 0
+
+
+def _profile_command(args) -> int:
+    """Time every markdown processor while rendering files."""
+    import json
+    from pathlib import Path
+    from markdown_editor.core.markdown_processor import MarkdownProcessor
+    from markdown_editor.core.render_profiler import format_profile_report
+    
+    processor = MarkdownProcessor(profile=True)
+    
+    for filename in args.files:
+        text = Path(filename).read_text(encoding="utf-8")
+        for _ in range(args.runs):
+            processor.markdown_to_html(text)
+    
+    report = processor.get_profile_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_profile_report(report, args.top))
+    
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the headless subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="markdown-editor",
+        description="A modern, user-friendly markdown editor with live preview"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    render_parser = subparsers.add_parser(
+        "render",
+        help="Render markdown files to HTML without opening the editor"
+    )
+    render_parser.add_argument("source", help="Directory (or single file) to render")
+    render_parser.add_argument("-o", "--output", help="Output directory (default: next to the sources)")
+    render_parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: one per core)")
+    render_parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the throughput report")
+    render_parser.set_defaults(handler=_render_command)
+    
+    profile_parser = subparsers.add_parser(
+        "profile",
+        help="Time each markdown extension processor on the given files"
+    )
+    profile_parser.add_argument("files", nargs="+", help="Markdown files to render")
+    profile_parser.add_argument("-n", "--runs", type=int, default=5, help="Renders per file (default: 5)")
+    profile_parser.add_argument("--top", type=int, default=15, help="Processors to list (default: 15)")
+    profile_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    profile_parser.set_defaults(handler=_profile_command)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    """Main entry point for the command line."""
+    argv = sys.argv[1:] if argv is None else argv
+    
+    if argv and argv[0] in ("render", "profile", "-h", "--help"):
+        args = create_parser().parse_args(argv)
+        return args.handler(args)
+    
+    from markdown_editor.app import main as gui_main
+    return gui_main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
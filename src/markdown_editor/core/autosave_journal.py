@@ -0,0 +1,202 @@
+"""
+Append-only auto-save journal of a document's edits.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# The journal is compacted into a new snapshot once it is larger than this
+# fraction of the snapshot, so compaction costs stay proportional to typing
+COMPACT_RATIO = 0.5
+# Journals smaller than this are never compacted
+COMPACT_MIN_SIZE = 64 * 1024
+
+
+def get_auto_save_dir() -> Path:
+    """Get the directory of the auto-save journals."""
+    return Path.home() / '.markdown_editor' / 'autosave'
+
+
+def _journal_key(filepath: Optional[str]) -> str:
+    """
+    Get the name of the journal files of a document.
+    
+    Args:
+        filepath: Path of the document, or None for an untitled one
+        
+    Returns:
+        Hash of the full path, so documents with the same name don't collide
+    """
+    if not filepath:
+        return "untitled"
+    return hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+
+
+class AutosaveJournal:
+    """
+    Snapshot of a document plus a journal of the line edits made since.
+    
+    Edits replace a range of lines, like TextStatistics.replace_lines(). They
+    are buffered by record() and appended to the journal by flush(), so
+    auto-saving writes what was typed rather than the whole document. Once
+    the journal outgrows the snapshot, compact() writes a new snapshot and
+    starts an empty journal.
+    
+    The snapshot and the journal start with the same unique generation id.
+    A journal is only replayed onto the snapshot of its generation, so a
+    crash while compacting never applies old edits to a new snapshot.
+    """
+    
+    def __init__(self, filepath: Optional[str], base: str = "", directory: Optional[Path] = None):
+        """
+        Initialize the journal of a document.
+        
+        Nothing is written until the first flush(); files left by an earlier
+        session stay available to recover() until then.
+        
+        Args:
+            filepath: Path of the document, or None for an untitled one
+            base: Content the recorded edits apply to
+            directory: Directory of the journal files
+        """
+        directory = directory or get_auto_save_dir()
+        key = _journal_key(filepath)
+        
+        self.filepath = filepath
+        self.snapshot_path = directory / f"{key}.snapshot.md"
+        self.journal_path = directory / f"{key}.journal"
+        
+        self.base = base  # Content of the snapshot, until it is written
+        self.generation = ""
+        self.snapshot_size = len(base)
+        self.journal_size = 0
+        self.pending: List[Tuple[int, int, List[str]]] = []
+    
+    def start(self, base: str) -> None:
+        """
+        Start over from new content, removing the journal files.
+        
+        Args:
+            base: Content the edits recorded from now on apply to
+        """
+        self.discard()
+        self.base = base
+        self.snapshot_size = len(base)
+    
+    def record(self, first: int, count: int, lines: List[str]) -> None:
+        """
+        Record that a range of lines was replaced.
+        
+        Args:
+            first: Number of the first replaced line, from 0
+            count: Number of replaced lines
+            lines: Text of the new lines, without line endings
+        """
+        if self.pending:
+            # Typing within a line keeps replacing the lines of the last edit
+            last_first, last_count, last_lines = self.pending[-1]
+            if first == last_first and count == len(last_lines):
+                self.pending[-1] = (first, last_count, lines)
+                return
+        self.pending.append((first, count, lines))
+    
+    def has_pending(self) -> bool:
+        """Check if there are edits that weren't flushed."""
+        return bool(self.pending)
+    
+    def flush(self) -> int:
+        """
+        Append the recorded edits to the journal.
+        
+        Returns:
+            Number of characters written
+        """
+        if self.base is not None:
+            self._write_snapshot(self.base)
+        if not self.pending:
+            return 0
+        
+        data = "".join(json.dumps(edit, ensure_ascii=False) + "\n" for edit in self.pending)
+        with open(self.journal_path, 'a', encoding='utf-8', newline='') as file:
+            file.write(data)
+        
+        self.pending = []
+        self.journal_size += len(data)
+        return len(data)
+    
+    def needs_compaction(self) -> bool:
+        """Check if the journal has outgrown its snapshot."""
+        return self.journal_size > max(COMPACT_MIN_SIZE, self.snapshot_size * COMPACT_RATIO)
+    
+    def compact(self, content: str) -> None:
+        """
+        Replace the snapshot and journal by a snapshot of the content.
+        
+        Args:
+            content: Current content, including every recorded edit
+        """
+        self.pending = []
+        self._write_snapshot(content)
+    
+    def discard(self) -> None:
+        """Remove the journal files and forget the unflushed edits."""
+        for path in (self.journal_path, self.snapshot_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        
+        self.pending = []
+        self.journal_size = 0
+    
+    def recover(self) -> Optional[str]:
+        """
+        Replay the journal files left on disk onto their snapshot.
+        
+        Returns:
+            Recovered content, or None if there are no journal files
+        """
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8', newline='') as file:
+                generation, _, content = file.read().partition('\n')
+        except (OSError, ValueError):
+            return None
+        
+        lines = content.split('\n')
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8', newline='') as file:
+                if file.readline().rstrip('\n') != generation:
+                    return content
+                for entry in file:
+                    # The last entry is cut short if writing it was interrupted
+                    try:
+                        first, count, new_lines = json.loads(entry)
+                    except ValueError:
+                        break
+                    lines[first:first + count] = new_lines
+        except OSError:
+            return content
+        
+        return '\n'.join(lines)
+    
+    def _write_snapshot(self, content: str) -> None:
+        """Write a snapshot of the next generation and start its journal."""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        self.generation = uuid.uuid4().hex
+        
+        temporary = self.snapshot_path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8', newline='') as file:
+            file.write(f"{self.generation}\n")
+            file.write(content)
+        os.replace(temporary, self.snapshot_path)
+        
+        with open(self.journal_path, 'w', encoding='utf-8', newline='') as file:
+            file.write(f"{self.generation}\n")
+        
+        self.base = None
+        self.snapshot_size = len(content)
+        self.journal_size = 0
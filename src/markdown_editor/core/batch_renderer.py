@@ -0,0 +1,154 @@
+"""
+Headless rendering of markdown files to HTML across a process pool.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .html_export import build_html_document
+from .text_file import read_text
+
+
+MARKDOWN_EXTENSIONS = frozenset({'.md', '.markdown', '.mdown', '.mkd', '.mkdn', '.mdx'})
+
+# Processor of the current worker process, created by the pool initializer
+_processor = None
+
+
+def find_markdown_files(source: str) -> List[Path]:
+    """
+    Find markdown files under a directory.
+    
+    Args:
+        source: Directory to walk, or a single markdown file
+        
+    Returns:
+        Sorted list of markdown file paths
+    """
+    source_path = Path(source)
+    if source_path.is_file():
+        return [source_path]
+    
+    files = []
+    for directory, subdirectories, filenames in os.walk(source_path):
+        # Skip hidden directories such as .git
+        subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+        for filename in filenames:
+            if Path(filename).suffix.lower() in MARKDOWN_EXTENSIONS:
+                files.append(Path(directory) / filename)
+    
+    return sorted(files)
+
+
+def _init_worker() -> None:
+    """Create the markdown processor for a worker process."""
+    global _processor
+    from .markdown_processor import MarkdownProcessor
+    _processor = MarkdownProcessor()
+
+
+def _render_file(job: Tuple[str, str]) -> Tuple[str, int, Optional[str]]:
+    """
+    Render one markdown file to an HTML file.
+    
+    Args:
+        job: Tuple of (markdown path, html path)
+        
+    Returns:
+        Tuple of (markdown path, bytes read, error message or None)
+    """
+    source_file, output_file = job
+    try:
+        # Sources may be in any encoding the editor opens
+        content = read_text(source_file)[0]
+        size = os.path.getsize(source_file)
+        
+        html = _processor.markdown_to_html(content)
+        document = build_html_document(html, Path(source_file).stem)
+        
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write(document)
+        
+        return source_file, size, None
+    except Exception as e:
+        return source_file, 0, str(e)
+
+
+def render_tree(source: str, output: Optional[str] = None, jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Render every markdown file under a directory to HTML.
+    
+    The directory layout is mirrored under the output directory, with each
+    file's suffix replaced by ``.html``.
+    
+    Args:
+        source: Directory to render, or a single markdown file
+        output: Output directory (next to the sources if None)
+        jobs: Number of worker processes (one per core if None)
+        
+    Returns:
+        Dictionary with the rendering report
+    """
+    source_path = Path(source)
+    root = source_path.parent if source_path.is_file() else source_path
+    output_root = Path(output) if output else root
+    
+    files = find_markdown_files(source)
+    work = [
+        (str(path), str((output_root / path.relative_to(root)).with_suffix('.html')))
+        for path in files
+    ]
+    
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(work)))
+    rendered = 0
+    total_bytes = 0
+    errors = []
+    
+    start = time.perf_counter()
+    if work:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            chunksize = max(1, len(work) // (jobs * 4))
+            for source_file, size, error in pool.map(_render_file, work, chunksize=chunksize):
+                if error:
+                    errors.append((source_file, error))
+                else:
+                    rendered += 1
+                    total_bytes += size
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'files': rendered,
+        'failed': len(errors),
+        'errors': errors,
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'jobs': jobs,
+        'files_per_second': rendered / elapsed if elapsed > 0 else 0.0,
+        'mb_per_second': total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Format a rendering report for the terminal.
+    
+    Args:
+        report: Report returned by render_tree
+        
+    Returns:
+        Human readable report
+    """
+    lines = [
+        f"Rendered {report['files']} files ({report['bytes'] / (1024 * 1024):.2f} MB) "
+        f"in {report['seconds']:.2f}s with {report['jobs']} workers",
+        f"Throughput: {report['files_per_second']:.1f} files/s, {report['mb_per_second']:.2f} MB/s",
+    ]
+    if report['failed']:
+        lines.append(f"Failed: {report['failed']} files")
+        for source_file, error in report['errors']:
+            lines.append(f"  {source_file}: {error}")
+    return "\n".join(lines)
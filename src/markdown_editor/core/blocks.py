@@ -0,0 +1,310 @@
+"""
+Splitting of markdown source into independently renderable top-level blocks.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from markdown.util import BLOCK_LEVEL_ELEMENTS
+
+
+# Opening/closing code fence (``` or ~~~, optionally indented)
+FENCE_PATTERN = re.compile(r'^[ \t]*(`{3,}|~{3,})(.*)$')
+
+# Top-level list item marker
+LIST_ITEM_PATTERN = re.compile(r'^(?:[*+-]|\d+[.)])[ \t]')
+
+# Definition list description
+DEFINITION_PATTERN = re.compile(r'^:[ \t]', re.MULTILINE)
+
+# Raw HTML block opener at the start of a block
+HTML_BLOCK_PATTERN = re.compile(r'^<([a-zA-Z][a-zA-Z0-9-]*)[\s/>]')
+
+# Block-level tags that keep a raw HTML block together across blank lines,
+# as Python-Markdown treats them; void tags have nothing to keep together
+HTML_VOID_TAGS = frozenset(['hr'])
+HTML_BLOCK_TAGS = frozenset(BLOCK_LEVEL_ELEMENTS) - HTML_VOID_TAGS
+
+# Raw HTML comment opener, which keeps its block together until it closes
+HTML_COMMENT_START = '<!--'
+HTML_COMMENT_END = '-->'
+
+# Definitions that affect rendering of other blocks
+REFERENCE_PATTERN = re.compile(r'^ {0,3}\[(?!\^)[^\]]+\]:[ \t]*\S.*$', re.MULTILINE)
+ABBREVIATION_PATTERN = re.compile(r'^\*\[([^\]]+)\]:.*$', re.MULTILINE)
+FOOTNOTE_PATTERN = re.compile(r'^ {0,3}\[\^[^\]]+\]:', re.MULTILINE)
+
+# Footnote reference, as opposed to a definition
+FOOTNOTE_REFERENCE_PATTERN = re.compile(r'\[\^([^\]]+)\](?!:)')
+
+# ATX headings are split out of a paragraph before footnotes are parsed
+HEADING_PATTERN = re.compile(r'^#{1,6}(?:[ \t]|$)')
+
+# Attribute list at the end of a line outside indented code, and the ids in it
+ATTRIBUTE_LIST_PATTERN = re.compile(r'^(?! {4}|\t).*[ ]\{:?([^}\n]*)\}[ ]*(?:#+[ ]*)?$', re.MULTILINE)
+ATTRIBUTE_ID_PATTERN = re.compile(r'(?:^|\s)#([^\s}]+)')
+
+
+def split_blocks(text: str) -> List[str]:
+    """
+    Split markdown text into top-level blocks.
+    
+    A new block starts at an unindented line that follows a blank line,
+    unless that line continues the previous construct (an open code fence,
+    an unbalanced raw HTML block, a list, a blockquote or a definition list).
+    Joining the returned blocks yields the original text.
+    
+    Args:
+        text: The markdown content to split
+        
+    Returns:
+        List of block source strings
+    """
+    return list(iter_blocks(text.splitlines(keepends=True)))
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Split markdown lines into top-level blocks as they are read.
+    
+    Only the block being assembled is held in memory, so this works on
+    open files of any size. See split_blocks for the splitting rules.
+    
+    Args:
+        lines: Markdown lines, including their line endings
+        
+    Yields:
+        Block source strings
+    """
+    return _merge_definition_lists(_iter_raw_blocks(lines))
+
+
+def _iter_raw_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Split lines into blocks at blank lines, before merging definition lists."""
+    current = []
+    first_line = ""
+    fence = None  # type: Optional[Tuple[str, int]]
+    html_tag = None  # type: Optional[str]
+    html_depth = 0
+    in_comment = False
+    previous_blank = False
+    
+    for line in lines:
+        stripped = line.strip()
+        
+        if fence is not None:
+            current.append(line)
+            match = FENCE_PATTERN.match(line)
+            if (match and match.group(1)[0] == fence[0]
+                    and len(match.group(1)) >= fence[1]
+                    and not match.group(2).strip()):
+                fence = None
+            continue
+        
+        if not stripped:
+            current.append(line)
+            previous_blank = True
+            continue
+        
+        if (current and previous_blank and html_depth <= 0 and not in_comment
+                and not line[0].isspace()
+                and not _continues_block(first_line, line)):
+            yield "".join(current)
+            current = []
+        
+        if not current:
+            first_line = line
+            html_tag = None
+            html_depth = 0
+            match = HTML_BLOCK_PATTERN.match(line)
+            if match and match.group(1).lower() in HTML_BLOCK_TAGS:
+                html_tag = match.group(1).lower()
+            else:
+                in_comment = line.startswith(HTML_COMMENT_START)
+        
+        current.append(line)
+        previous_blank = False
+        
+        if in_comment:
+            # The comment may close on its opening line
+            start = len(HTML_COMMENT_START) if len(current) == 1 else 0
+            in_comment = HTML_COMMENT_END not in line[start:]
+            continue
+        
+        if html_tag is not None:
+            lowered = line.lower()
+            html_depth += len(re.findall(r'<%s[\s/>]' % html_tag, lowered))
+            html_depth -= lowered.count('</%s>' % html_tag)
+            continue
+        
+        match = FENCE_PATTERN.match(line)
+        if match:
+            fence = (match.group(1)[0], len(match.group(1)))
+    
+    if current:
+        yield "".join(current)
+
+
+def _continues_block(first_line: str, line: str) -> bool:
+    """
+    Check if an unindented line after a blank line continues a block.
+    
+    Args:
+        first_line: First line of the current block
+        line: Line following the blank line
+        
+    Returns:
+        True if the line belongs to the current block
+    """
+    if LIST_ITEM_PATTERN.match(first_line) and LIST_ITEM_PATTERN.match(line):
+        return True
+    if first_line.startswith('>') and line.startswith('>'):
+        return True
+    return bool(DEFINITION_PATTERN.match(line))
+
+
+def _merge_definition_lists(blocks: Iterable[str]) -> Iterator[str]:
+    """
+    Merge adjacent blocks that both hold definition list items.
+    
+    Consecutive definition lists render as a single list, so a term after a
+    blank line has to stay in the block of the list before it.
+    
+    Args:
+        blocks: Blocks as split at blank lines
+        
+    Yields:
+        Blocks with definition lists kept together
+    """
+    pending = None
+    previous_definitions = False
+    
+    for block in blocks:
+        has_definitions = '\n:' in block and bool(DEFINITION_PATTERN.search(block))
+        if pending is not None and previous_definitions and has_definitions:
+            pending += block
+        else:
+            if pending is not None:
+                yield pending
+            pending = block
+        previous_definitions = has_definitions
+    
+    if pending is not None:
+        yield pending
+
+
+def extract_definitions(block: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Extract definitions from a block that other blocks may refer to.
+    
+    Args:
+        block: Block source text
+        
+    Returns:
+        Tuple of (reference definitions, abbreviation definitions,
+        footnote definitions) as markdown source
+    """
+    references = []
+    abbreviations = []
+    footnotes = []
+    
+    if ']:' not in block:
+        return references, abbreviations, footnotes
+    
+    references = REFERENCE_PATTERN.findall(block)
+    abbreviations = [match.group(0) for match in ABBREVIATION_PATTERN.finditer(block)]
+    
+    # A footnote definition runs until the next one or the end of the block
+    starts = [match.start() for match in FOOTNOTE_PATTERN.finditer(block)]
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(block)
+        footnotes.append(_footnote_source(block[start:end]))
+    
+    return references, abbreviations, footnotes
+
+
+def _footnote_source(text: str) -> str:
+    """
+    Trim a footnote definition to the lines Python-Markdown gives it.
+    
+    The definition keeps its own paragraph (lazy continuation lines
+    included) and any following paragraphs indented as its body.
+    
+    Args:
+        text: Source from the definition to the next one or the block end
+        
+    Returns:
+        Footnote definition as markdown source
+    """
+    lines = text.split('\n')
+    kept = [lines[0]]
+    in_paragraph = True
+    
+    for line in lines[1:]:
+        if not line.strip():
+            in_paragraph = False
+        elif HEADING_PATTERN.match(line):
+            break
+        elif in_paragraph or line.startswith(('    ', '\t')):
+            in_paragraph = True
+        else:
+            break
+        kept.append(line)
+    
+    return '\n'.join(kept).rstrip()
+
+
+def abbreviation_terms(definitions: List[str]) -> List[str]:
+    """
+    Get the abbreviated terms from abbreviation definitions.
+    
+    Args:
+        definitions: Abbreviation definition lines
+        
+    Returns:
+        List of abbreviated terms
+    """
+    terms = []
+    for definition in definitions:
+        match = ABBREVIATION_PATTERN.match(definition)
+        if match:
+            terms.append(match.group(1))
+    return terms
+
+
+def attribute_ids(block: str) -> List[str]:
+    """
+    Get the ids a block sets with attribute lists, such as {#custom}.
+    
+    Args:
+        block: Block source text
+        
+    Returns:
+        Ids in source order
+    """
+    if '{' not in block or FENCE_PATTERN.match(block.split('\n', 1)[0]):
+        return []
+    
+    ids = []
+    for match in ATTRIBUTE_LIST_PATTERN.finditer(block):
+        ids.extend(ATTRIBUTE_ID_PATTERN.findall(match.group(1)))
+    return ids
+
+
+def has_repeated_footnotes(text: str) -> bool:
+    """
+    Check if a footnote is referenced more than once.
+    
+    Python-Markdown numbers the repeated references and links back to each
+    of them from the footnote list, which only works within one conversion.
+    
+    Args:
+        text: Markdown source
+        
+    Returns:
+        True if some footnote label is referenced twice
+    """
+    if '[^' not in text:
+        return False
+    labels = FOOTNOTE_REFERENCE_PATTERN.findall(text)
+    return len(labels) != len(set(labels))
@@ -0,0 +1,202 @@
+"""
+Markdown serialization of a QTextDocument, block by block.
+"""
+
+from PyQt6.QtGui import (
+    QTextBlock, QTextBlockFormat, QTextBlockUserData, QTextCharFormat,
+    QTextDocument, QTextListFormat
+)
+
+from .html_to_markdown import MONOSPACE_FONTS, format_inline, format_link
+
+ORDERED_LIST_STYLES = frozenset({
+    QTextListFormat.Style.ListDecimal,
+    QTextListFormat.Style.ListLowerAlpha,
+    QTextListFormat.Style.ListUpperAlpha,
+    QTextListFormat.Style.ListLowerRoman,
+    QTextListFormat.Style.ListUpperRoman,
+})
+
+# Qt's line separator (Shift+Enter) and the placeholder of inline objects
+LINE_SEPARATOR = '\u2028'
+OBJECT_REPLACEMENT = '\ufffc'
+
+
+class _BlockMarkdown(QTextBlockUserData):
+    """Markdown of a block's text, as of one revision of the block."""
+    
+    def __init__(self, revision: int, text: str):
+        """Initialize the block data."""
+        super().__init__()
+        self.revision = revision
+        self.text = text
+
+
+def _fragment_markers(char_format: QTextCharFormat) -> str:
+    """
+    Get the opening markdown markers for a character format.
+    
+    Args:
+        char_format: Format of a text fragment
+        
+    Returns:
+        Opening markers; a code font is a single backtick
+    """
+    families = " ".join(char_format.fontFamilies() or []).lower()
+    if char_format.fontFixedPitch() or any(font in families for font in MONOSPACE_FONTS):
+        return '`'
+    
+    markers = ''
+    if char_format.fontWeight() >= 600:
+        markers += '**'
+    if char_format.fontItalic():
+        markers += '*'
+    if char_format.fontStrikeOut():
+        markers += '~~'
+    # Links are underlined anyway
+    if char_format.fontUnderline() and not char_format.isAnchor():
+        markers += '^^'
+    return markers
+
+
+def _block_text(block: QTextBlock) -> str:
+    """
+    Serialize the text of a block, without list or heading prefixes.
+    
+    Args:
+        block: Block to serialize
+        
+    Returns:
+        Markdown text of the block
+    """
+    parts = []
+    link_parts = []
+    link_href = ''
+    
+    iterator = block.begin()
+    while not iterator.atEnd():
+        fragment = iterator.fragment()
+        iterator += 1
+        if not fragment.isValid():
+            continue
+        
+        char_format = fragment.charFormat()
+        href = char_format.anchorHref() if char_format.isAnchor() else ''
+        if href != link_href:
+            if link_parts:
+                parts.append(format_link("".join(link_parts), link_href))
+                link_parts = []
+            link_href = href
+        target = link_parts if href else parts
+        
+        text = fragment.text()
+        if char_format.isImageFormat():
+            name = char_format.toImageFormat().name()
+            target.append(f"![]({name})" * text.count(OBJECT_REPLACEMENT))
+            continue
+        
+        target.append(format_inline(text.replace(LINE_SEPARATOR, '\n'), _fragment_markers(char_format)))
+    
+    if link_parts:
+        parts.append(format_link("".join(link_parts), link_href))
+    
+    return "".join(parts)
+
+
+def _block_prefix(block: QTextBlock) -> str:
+    """
+    Get the heading or list marker of a block.
+    
+    Item numbers depend on the other items of the list, so prefixes are not
+    cached with the block text.
+    
+    Args:
+        block: Block to get the prefix for
+        
+    Returns:
+        Markdown prefix, or an empty string
+    """
+    block_format = block.blockFormat()
+    heading_level = block_format.headingLevel()
+    if heading_level > 0:
+        return "#" * heading_level + " "
+    
+    text_list = block.textList()
+    if text_list is None:
+        return ""
+    
+    list_format = text_list.format()
+    prefix = "    " * max(0, list_format.indent() - 1)
+    if list_format.style() in ORDERED_LIST_STYLES:
+        prefix += f"{list_format.start() + text_list.itemNumber(block)}. "
+    else:
+        prefix += "- "
+    
+    marker = block_format.marker()
+    if marker == QTextBlockFormat.MarkerType.Checked:
+        prefix += "[x] "
+    elif marker == QTextBlockFormat.MarkerType.Unchecked:
+        prefix += "[ ] "
+    return prefix
+
+
+class DocumentMarkdownWriter:
+    """
+    Serializes a QTextDocument to markdown without going through HTML.
+    
+    Each block's markdown is kept in the block's user data along with the
+    block revision it was made from. Blocks whose text or formatting changed
+    since then are serialized again; all others are reused. Every block is one
+    line, so markdown typed as plain text is kept as is.
+    """
+    
+    def __init__(self, document: QTextDocument):
+        """
+        Initialize the writer.
+        
+        Args:
+            document: Document to serialize
+        """
+        self.document = document
+        self.serialized_blocks = 0  # Blocks serialized by the last to_markdown call
+        
+        self.document.contentsChange.connect(self._on_contents_change)
+    
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        """Invalidate the blocks an edit touched, including format-only edits."""
+        # Format changes leave the block revision alone
+        block = self.document.findBlock(position)
+        end = self.document.findBlock(position + chars_added)
+        if not end.isValid():
+            end = self.document.lastBlock()
+        
+        while block.isValid():
+            data = block.userData()
+            if isinstance(data, _BlockMarkdown):
+                data.revision = -1
+            if block.blockNumber() >= end.blockNumber():
+                break
+            block = block.next()
+    
+    def to_markdown(self) -> str:
+        """
+        Serialize the document.
+        
+        Returns:
+            Markdown text
+        """
+        lines = []
+        serialized = 0
+        
+        block = self.document.begin()
+        while block.isValid():
+            data = block.userData()
+            if not isinstance(data, _BlockMarkdown) or data.revision != block.revision():
+                data = _BlockMarkdown(block.revision(), _block_text(block))
+                block.setUserData(data)
+                serialized += 1
+            lines.append(_block_prefix(block) + data.text)
+            block = block.next()
+        
+        self.serialized_blocks = serialized
+        return "\n".join(lines)
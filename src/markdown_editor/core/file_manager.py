@@ -5,20 +5,53 @@ File management functionality for the markdown editor.
 import os
 import json
 from pathlib import Path
-from typing import List, Optional, Tuple
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer, QSettings
+from typing import Callable, List, Optional, Tuple
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot, QTimer, QSettings, QFileSystemWatcher
+
+from .autosave_journal import AutosaveJournal
+from .file_worker import FileWorker
+from .text_file import DEFAULT_FORMAT, content_hash, describe_format, read_text, write_atomic
+
+# Milliseconds between checks of the current file for changes by other
+# programs, in case the file system watcher misses them
+WATCH_POLL_INTERVAL = 2000
+# Milliseconds to wait after a change notification, for the change to finish
+WATCH_SETTLE_DELAY = 200
 
 
 class FileManager(QObject):
     """
     Handles file operations for the markdown editor.
+    
+    Files can be opened and saved synchronously or, with the *_async
+    methods, on a worker thread that reports progress and can be cancelled.
+    One background operation runs at a time; file_opened and file_saved are
+    emitted either way.
+    
+    Files are saved in the encoding and line endings they were opened with,
+    or in UTF-8 once they have characters their encoding can't represent;
+    format_changed is emitted then.
+    
+    The content is modified when its hash differs from the hash of the
+    content last opened or saved, so undoing every edit makes it clean
+    again and saving unchanged content doesn't write the file.
+    
+    The current file is watched for changes by other programs. Its size and
+    modification time are compared with those seen when it was last opened
+    or saved, and only if they differ is it read and hashed;
+    file_changed_externally is emitted if its content changed.
     """
     
     # Signals
-    file_opened = pyqtSignal(str, str)  # filepath, content
+    file_opened = pyqtSignal(str, object)  # filepath, content
     file_saved = pyqtSignal(str)  # filepath
     file_created = pyqtSignal()
     recent_files_updated = pyqtSignal(list)  # list of recent files
+    operation_progress = pyqtSignal(int, int)  # done, total
+    operation_failed = pyqtSignal(str)  # error message
+    operation_cancelled = pyqtSignal()
+    file_changed_externally = pyqtSignal(str, object)  # filepath, content on disk
+    format_changed = pyqtSignal(str, str)  # old and new format description
     
     def __init__(self):
         """Initialize the file manager."""
@@ -26,6 +59,9 @@ class FileManager(QObject):
         
         self.current_file = None
         self.content_modified = False
+        self.file_format = dict(DEFAULT_FORMAT)  # Encoding and line endings of the current file
+        self.saved_hash = content_hash("")  # Hash of the content last opened or saved
+        self.saved_length = 0
         self.auto_save_timer = QTimer()
         self.auto_save_timer.timeout.connect(self._auto_save)
         self.auto_save_timer.setSingleShot(True)
@@ -37,13 +73,38 @@ class FileManager(QObject):
         # Auto-save content (temporary storage)
         self.auto_save_content = ""
         self.auto_save_filepath = ""
+        self.auto_save_source = None  # Returns the content to auto-save, if set
+        self.auto_save_journal = AutosaveJournal(None)  # Edits of the current document
+        
+        # Background file operations, the worker thread is started on first use
+        self.thread = None
+        self.worker = None
+        self.operation = None  # (id, kind, filepath, content, modification count)
+        self.operation_count = 0
+        self.modification_count = 0  # Edits so far, to tell if a save is still current
+        
+        # Changes to the current file by other programs
+        self.saved_stat = None  # (size, modification time) when last opened or saved
+        self.file_watcher = QFileSystemWatcher()
+        self.file_watcher.fileChanged.connect(self._on_watched_file_changed)
+        self.watch_timer = QTimer()
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_SETTLE_DELAY)
+        self.watch_timer.timeout.connect(self.check_external_change)
+        self.poll_timer = QTimer()
+        self.poll_timer.setInterval(WATCH_POLL_INTERVAL)
+        self.poll_timer.timeout.connect(self.check_external_change)
     
     def new_file(self) -> None:
         """Create a new file."""
         self.current_file = None
         self.content_modified = False
+        self.file_format = dict(DEFAULT_FORMAT)
+        self._set_saved_content("", content_hash(""))
         self.auto_save_content = ""
         self.auto_save_filepath = ""
+        self._start_journal(None, "")
+        self._watch(None)
         self.file_created.emit()
     
     def open_file(self, filepath: str) -> Tuple[bool, str]:
@@ -57,34 +118,80 @@ class FileManager(QObject):
             Tuple of (success, content_or_error_message)
         """
         try:
-            # Validate file exists
-            if not os.path.exists(filepath):
-                return False, f"File not found: {filepath}"
-            
-            # Check if it's a markdown file
-            if not self._is_markdown_file(filepath):
-                return False, f"Not a markdown file: {filepath}"
+            error = self._check_openable(filepath)
+            if error:
+                return False, error
             
             # Read file content
-            with open(filepath, 'r', encoding='utf-8') as file:
-                content = file.read()
+            content, file_format, new_hash = read_text(filepath)
             
-            self.current_file = filepath
-            self.content_modified = False
-            self.auto_save_content = content
-            self.auto_save_filepath = filepath
-            
-            # Add to recent files
-            self._add_to_recent_files(filepath)
-            
-            # Emit signal
-            self.file_opened.emit(filepath, content)
+            self._finish_open(filepath, content, new_hash, file_format)
             
             return True, content
             
         except Exception as e:
             return False, f"Error opening file: {str(e)}"
     
+    def open_file_async(self, filepath: str) -> Tuple[bool, str]:
+        """
+        Start opening a markdown file on the worker thread.
+        
+        file_opened is emitted once the file is read, operation_failed or
+        operation_cancelled otherwise.
+        
+        Args:
+            filepath: Path to the file to open
+            
+        Returns:
+            Tuple of (started, filepath_or_error_message)
+        """
+        error = self._check_openable(filepath) or self._check_idle()
+        if error:
+            return False, error
+        
+        operation = self._start_operation('open', filepath)
+        self.worker.read_requested.emit(operation, filepath)
+        return True, filepath
+    
+    def _check_openable(self, filepath: str) -> Optional[str]:
+        """
+        Check that a file can be opened.
+        
+        Args:
+            filepath: Path to the file to open
+            
+        Returns:
+            Error message, or None if the file can be opened
+        """
+        # Validate file exists
+        if not os.path.exists(filepath):
+            return f"File not found: {filepath}"
+        
+        # Check if it's a markdown file
+        if not self._is_markdown_file(filepath):
+            return f"Not a markdown file: {filepath}"
+        
+        return None
+    
+    def _finish_open(self, filepath: str, content: str, saved_hash: str, file_format: dict) -> None:
+        """Make an opened file the current file."""
+        self.current_file = filepath
+        self.content_modified = False
+        self.file_format = file_format
+        self._set_saved_content(content, saved_hash)
+        self.auto_save_content = content
+        self.auto_save_filepath = filepath
+        
+        # Files left by a crash stay on disk until reset_auto_save()
+        self._start_journal(filepath, content)
+        self._watch(filepath)
+        
+        # Add to recent files
+        self._add_to_recent_files(filepath)
+        
+        # Emit signal
+        self.file_opened.emit(filepath, content)
+    
     def save_file(self, content: str, filepath: Optional[str] = None) -> Tuple[bool, str]:
         """
         Save content to a file.
@@ -103,29 +210,247 @@ class FileManager(QObject):
             if not save_path:
                 return False, "No file path specified"
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            # This content supersedes whatever is being written in the background
+            self.cancel_operation()
             
-            # Write file
-            with open(save_path, 'w', encoding='utf-8') as file:
-                file.write(content)
-            
-            self.current_file = save_path
-            self.content_modified = False
-            self.auto_save_content = content
-            self.auto_save_filepath = save_path
+            # Write file, unless it already has this content
+            new_hash = content_hash(content)
+            file_format = self.file_format
+            if not self._is_saved(save_path, new_hash):
+                # Ensure directory exists
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                file_format = write_atomic(save_path, content, self.file_format)
             
-            # Add to recent files
-            self._add_to_recent_files(save_path)
-            
-            # Emit signal
-            self.file_saved.emit(save_path)
+            self._finish_save(save_path, content, self.modification_count, new_hash, file_format)
             
             return True, save_path
             
         except Exception as e:
             return False, f"Error saving file: {str(e)}"
     
+    def save_file_async(self, content: str, filepath: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Start saving content to a file on the worker thread.
+        
+        The file is replaced only once it is completely written, and not
+        written at all if it already has this content. file_saved is emitted
+        when it is saved, operation_failed or operation_cancelled otherwise.
+        
+        Args:
+            content: Content to save
+            filepath: Path to save to (if None, uses current file)
+            
+        Returns:
+            Tuple of (started, filepath_or_error_message)
+        """
+        save_path = filepath or self.current_file
+        if not save_path:
+            return False, "No file path specified"
+        
+        error = self._check_idle()
+        if error:
+            return False, error
+        
+        # The worker hashes the content and skips writing it if it's saved
+        disk_hash = self.saved_hash if save_path == self.current_file else ""
+        operation = self._start_operation('save', save_path, content)
+        self.worker.write_requested.emit(operation, save_path, content, disk_hash, dict(self.file_format))
+        return True, save_path
+    
+    def _finish_save(self, filepath: str, content: str, modification_count: int, saved_hash: str,
+                     file_format: dict) -> None:
+        """Make a saved file the current file."""
+        previous_format, self.file_format = self.file_format, dict(file_format)
+        self.current_file = filepath
+        self._set_saved_content(content, saved_hash)
+        self._watch(filepath)
+        # Edits made while saving are still unsaved, and still journaled
+        # against the previous snapshot
+        if modification_count == self.modification_count:
+            self.content_modified = False
+            self._start_journal(filepath, content)
+            self.auto_save_journal.start(content)
+        self.auto_save_content = content
+        self.auto_save_filepath = filepath
+        
+        # Add to recent files
+        self._add_to_recent_files(filepath)
+        
+        # Emit signal
+        self.file_saved.emit(filepath)
+        if file_format['encoding'] != previous_format['encoding']:
+            self.format_changed.emit(describe_format(previous_format), describe_format(file_format))
+    
+    def _is_saved(self, filepath: str, new_hash: str) -> bool:
+        """Check if a file was last opened or saved with content of this hash."""
+        return filepath == self.current_file and new_hash == self.saved_hash and os.path.exists(filepath)
+    
+    def _set_saved_content(self, content: str, saved_hash: str) -> None:
+        """Remember the content last opened or saved."""
+        self.saved_hash = saved_hash
+        self.saved_length = len(content)
+    
+    def check_external_change(self) -> bool:
+        """
+        Check if another program changed the current file.
+        
+        Returns:
+            True if file_changed_externally was emitted
+        """
+        filepath = self.current_file
+        # The file changes while it is saved in the background
+        if not filepath or self.operation is not None:
+            return False
+        
+        # Files replaced by a rename are no longer watched
+        if filepath not in self.file_watcher.files() and os.path.exists(filepath):
+            self.file_watcher.addPath(filepath)
+        
+        stat = self._stat(filepath)
+        if stat is None or stat == self.saved_stat:
+            return False
+        self.saved_stat = stat
+        
+        try:
+            content, file_format, new_hash = read_text(filepath)
+        except Exception:
+            return False
+        
+        # Touched, or rewritten with the same content
+        if new_hash == self.saved_hash:
+            return False
+        
+        self.file_format = file_format
+        self._set_saved_content(content, new_hash)
+        self.file_changed_externally.emit(filepath, content)
+        return True
+    
+    def _watch(self, filepath: Optional[str]) -> None:
+        """Watch a file for changes by other programs instead of the current one."""
+        watched = self.file_watcher.files()
+        if watched:
+            self.file_watcher.removePaths(watched)
+        
+        self.saved_stat = self._stat(filepath) if filepath else None
+        if self.saved_stat is None:
+            self.poll_timer.stop()
+            return
+        
+        self.file_watcher.addPath(filepath)
+        self.poll_timer.start()
+    
+    def _stat(self, filepath: str) -> Optional[Tuple[int, int]]:
+        """Get the size and modification time of a file, None if it doesn't exist."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    @pyqtSlot(str)
+    def _on_watched_file_changed(self, filepath):
+        """Check the current file once a change to it has settled."""
+        self.watch_timer.start()
+    
+    def is_busy(self) -> bool:
+        """Check if a background file operation is running."""
+        return self.operation is not None
+    
+    def cancel_operation(self) -> bool:
+        """
+        Cancel the background file operation.
+        
+        Returns:
+            True if an operation was running
+        """
+        if self.operation is None:
+            return False
+        self.worker.cancelled_operation = self.operation[0]
+        return True
+    
+    def shutdown(self) -> None:
+        """
+        Stop the worker thread, finishing a save that is in progress.
+        
+        The auto-save journal is removed: unsaved changes were either saved
+        or discarded before closing.
+        """
+        self.auto_save_timer.stop()
+        self.poll_timer.stop()
+        self.watch_timer.stop()
+        
+        if self.thread is not None:
+            if self.operation is not None and self.operation[1] == 'open':
+                self.cancel_operation()
+            self.thread.quit()
+            self.thread.wait()
+            self.thread = None
+            self.worker = None
+        
+        self.auto_save_journal.discard()
+    
+    def _check_idle(self) -> Optional[str]:
+        """Get an error message if a background operation is running."""
+        if self.operation is not None:
+            return "Another file operation is in progress"
+        return None
+    
+    def _start_operation(self, kind: str, filepath: str, content: Optional[str] = None) -> int:
+        """Record a new background operation, starting the worker thread if needed."""
+        if self.thread is None:
+            self.thread = QThread()
+            self.thread.setObjectName("FileOperationThread")
+            self.worker = FileWorker()
+            self.worker.moveToThread(self.thread)
+            self.worker.progress.connect(self._on_operation_progress)
+            self.worker.read_finished.connect(self._on_read_finished)
+            self.worker.write_finished.connect(self._on_write_finished)
+            self.worker.failed.connect(self._on_operation_failed)
+            self.worker.cancelled.connect(self._on_operation_cancelled)
+            self.thread.start()
+        
+        self.operation_count += 1
+        self.operation = (self.operation_count, kind, filepath, content, self.modification_count)
+        return self.operation_count
+    
+    def _end_operation(self, operation: int) -> Optional[tuple]:
+        """Get and clear the running operation if it has this id."""
+        if self.operation is None or self.operation[0] != operation:
+            return None
+        current, self.operation = self.operation, None
+        return current
+    
+    @pyqtSlot(int, int, int)
+    def _on_operation_progress(self, operation, done, total):
+        """Forward the progress of the running operation."""
+        if self.operation is not None and self.operation[0] == operation:
+            self.operation_progress.emit(done, total)
+    
+    @pyqtSlot(int, str, object, str, object)
+    def _on_read_finished(self, operation, filepath, content, saved_hash, file_format):
+        """Make a file read in the background the current file."""
+        if self._end_operation(operation) is not None:
+            self._finish_open(filepath, content, saved_hash, file_format)
+    
+    @pyqtSlot(int, str, str, bool, object)
+    def _on_write_finished(self, operation, filepath, saved_hash, written, file_format):
+        """Make a file written in the background the current file."""
+        finished = self._end_operation(operation)
+        if finished is not None:
+            self._finish_save(filepath, finished[3], finished[4], saved_hash, file_format)
+    
+    @pyqtSlot(int, str)
+    def _on_operation_failed(self, operation, message):
+        """Report a failed background operation."""
+        if self._end_operation(operation) is not None:
+            self.operation_failed.emit(message)
+    
+    @pyqtSlot(int)
+    def _on_operation_cancelled(self, operation):
+        """Report a cancelled background operation."""
+        if self._end_operation(operation) is not None:
+            self.operation_cancelled.emit()
+    
     def set_content_modified(self, modified: bool = True) -> None:
         """
         Mark content as modified and start auto-save timer.
@@ -134,10 +459,33 @@ class FileManager(QObject):
             modified: Whether content is modified
         """
         self.content_modified = modified
+        if modified:
+            self.modification_count += 1
         
         if modified and self.auto_save_interval > 0:
             self.auto_save_timer.start(self.auto_save_interval)
     
+    def update_modified(self, length: int, source: Callable[[], str]) -> bool:
+        """
+        Mark the content modified unless it's the content last opened or saved.
+        
+        Lengths are compared first, so the content is only fetched and
+        hashed when an edit may have restored it.
+        
+        Args:
+            length: Number of characters of the content
+            source: Function returning the content
+            
+        Returns:
+            Whether the content is modified
+        """
+        modified = length != self.saved_length or content_hash(source()) != self.saved_hash
+        self.set_content_modified(modified)
+        if not modified:
+            # Nothing to auto-save
+            self.auto_save_timer.stop()
+        return modified
+    
     def set_auto_save_content(self, content: str) -> None:
         """
         Set content for auto-save.
@@ -149,28 +497,85 @@ class FileManager(QObject):
         if self.current_file:
             self.auto_save_filepath = self.current_file
     
+    def set_auto_save_source(self, source: Optional[Callable[[], str]]) -> None:
+        """
+        Set where auto-save reads the content from when it runs.
+        
+        Reading the content only when it is saved avoids copying large
+        documents on every edit.
+        
+        Args:
+            source: Function returning the current content, or None to
+                save the content given to set_auto_save_content()
+        """
+        self.auto_save_source = source
+    
+    def record_edit(self, first: int, count: int, lines: List[str]) -> None:
+        """
+        Record an edit of the current document for auto-save.
+        
+        Args:
+            first: Number of the first replaced line, from 0
+            count: Number of replaced lines
+            lines: Text of the new lines, without line endings
+        """
+        if self.auto_save_interval > 0:
+            self.auto_save_journal.record(first, count, lines)
+    
+    def recover_auto_save(self) -> Optional[str]:
+        """
+        Get the content auto-saved for the current document by an earlier session.
+        
+        Returns:
+            Recovered content, or None if nothing was auto-saved
+        """
+        return self.auto_save_journal.recover()
+    
+    def reset_auto_save(self, content: str) -> None:
+        """
+        Auto-save edits from new content on, dropping what was auto-saved.
+        
+        Used once the editor content is replaced other than by editing it,
+        such as with recovered content.
+        
+        Args:
+            content: Content of the editor
+        """
+        self.auto_save_content = content
+        try:
+            self.auto_save_journal.start(content)
+            if self.content_modified:
+                self.auto_save_journal.flush()
+        except Exception:
+            pass
+    
+    def _start_journal(self, filepath: Optional[str], content: str) -> None:
+        """Journal the edits of a new document instead of the current one."""
+        self.auto_save_journal.discard()
+        self.auto_save_journal = AutosaveJournal(filepath, content)
+    
     def _auto_save(self) -> None:
-        """Auto-save content to temporary location."""
-        if self.auto_save_content and self.content_modified:
-            try:
-                # Create auto-save directory
-                auto_save_dir = Path.home() / '.markdown_editor' / 'autosave'
-                auto_save_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Generate auto-save filename
-                if self.current_file:
-                    base_name = Path(self.current_file).stem
-                    auto_save_file = auto_save_dir / f"{base_name}_autosave.md"
-                else:
-                    auto_save_file = auto_save_dir / "untitled_autosave.md"
-                
-                # Save content
-                with open(auto_save_file, 'w', encoding='utf-8') as file:
-                    file.write(self.auto_save_content)
+        """Append the edits made since the last auto-save to the journal."""
+        if not self.content_modified:
+            return
+        
+        journal = self.auto_save_journal
+        try:
+            if journal.has_pending():
+                journal.flush()
                 
-            except Exception:
-                # Silently fail auto-save to not interrupt user experience
-                pass
+                # Rewriting the whole document once the journal has grown
+                # by a fraction of it keeps the cost proportional to typing
+                if journal.needs_compaction():
+                    if self.auto_save_source is not None:
+                        self.set_auto_save_content(self.auto_save_source())
+                    journal.compact(self.auto_save_content)
+            elif self.auto_save_source is None and self.auto_save_content:
+                # Without recorded edits only the whole content can be saved
+                journal.compact(self.auto_save_content)
+        except Exception:
+            # Silently fail auto-save to not interrupt user experience
+            pass
     
     def get_recent_files(self) -> List[str]:
         """
@@ -245,6 +650,10 @@ class FileManager(QObject):
         """Check if content is modified."""
         return self.content_modified
     
+    def get_file_format(self) -> dict:
+        """Get the encoding, byte order mark and line ending of the current file."""
+        return dict(self.file_format)
+    
     def get_file_info(self) -> dict:
         """
         Get information about the current file.
@@ -257,7 +666,8 @@ class FileManager(QObject):
                 'name': 'Untitled',
                 'path': None,
                 'size': 0,
-                'modified': self.content_modified
+                'modified': self.content_modified,
+                'encoding': describe_format(self.file_format)
             }
         
         try:
@@ -267,12 +677,14 @@ class FileManager(QObject):
                 'path': self.current_file,
                 'size': stat.st_size,
                 'modified': self.content_modified,
-                'last_modified': stat.st_mtime
+                'last_modified': stat.st_mtime,
+                'encoding': describe_format(self.file_format)
             }
         except Exception:
             return {
                 'name': os.path.basename(self.current_file) if self.current_file else 'Untitled',
                 'path': self.current_file,
                 'size': 0,
-                'modified': self.content_modified
+                'modified': self.content_modified,
+                'encoding': describe_format(self.file_format)
             }
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Background file reads and writes for the file manager.
+"""
+
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from .text_file import CHUNK_SIZE, content_hash, read_text, write_atomic
+
+
+class FileOperationCancelled(Exception):
+    """Raised on the worker thread when its operation is cancelled."""
+
+
+class FileWorker(QObject):
+    """
+    Reads and writes markdown files on a worker thread, a chunk at a time.
+    
+    Every operation carries an id. Cancelling an operation sets
+    ``cancelled_operation`` to its id; the worker checks it between chunks.
+    Files are read with read_text() and written with write_atomic(), so a
+    cancelled or failed save leaves the target untouched. Reads and writes
+    report the content hash of the file, and a write is skipped if the file
+    already has that hash.
+    
+    Content is passed as a Python object rather than a string, so large
+    documents aren't copied when they cross threads.
+    """
+    
+    # Signals
+    progress = pyqtSignal(int, int, int)  # operation, done, total
+    read_finished = pyqtSignal(int, str, object, str, object)  # operation, filepath, content, hash, format
+    write_finished = pyqtSignal(int, str, str, bool, object)  # operation, filepath, hash, written, format
+    failed = pyqtSignal(int, str)  # operation, error message
+    cancelled = pyqtSignal(int)  # operation
+    read_requested = pyqtSignal(int, str)  # operation, filepath
+    write_requested = pyqtSignal(int, str, object, str, object)  # operation, filepath, content, hash on disk, format
+    
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        """
+        Initialize the file worker.
+        
+        Args:
+            chunk_size: Bytes read or characters written between progress
+                reports and cancellation checks
+        """
+        super().__init__()
+        
+        self.chunk_size = chunk_size
+        self.cancelled_operation = 0
+        
+        self.read_requested.connect(self._read)
+        self.write_requested.connect(self._write)
+    
+    def _check_cancelled(self, operation: int) -> None:
+        """Stop the operation if it was cancelled."""
+        if self.cancelled_operation == operation:
+            raise FileOperationCancelled()
+    
+    @pyqtSlot(int, str)
+    def _read(self, operation, filepath):
+        """Read and decode a file in whatever encoding it has."""
+        def report(done, total):
+            self._check_cancelled(operation)
+            self.progress.emit(operation, done, total)
+        
+        try:
+            self._check_cancelled(operation)
+            content, file_format, new_hash = read_text(filepath, self.chunk_size, report)
+            self.read_finished.emit(operation, filepath, content, new_hash, file_format)
+        except FileOperationCancelled:
+            self.cancelled.emit(operation)
+        except Exception as e:
+            self.failed.emit(operation, f"Error opening file: {str(e)}")
+    
+    @pyqtSlot(int, str, object, str, object)
+    def _write(self, operation, filepath, content, disk_hash, file_format):
+        """Write a file atomically, unless it already has this content."""
+        try:
+            new_hash = content_hash(content, self.chunk_size)
+            if new_hash == disk_hash and os.path.exists(filepath):
+                self.write_finished.emit(operation, filepath, new_hash, False, file_format)
+                return
+            
+            os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+            
+            def report(done, total):
+                self._check_cancelled(operation)
+                self.progress.emit(operation, done, total)
+            
+            self._check_cancelled(operation)
+            file_format = write_atomic(filepath, content, file_format, str(operation), self.chunk_size, report)
+            self.write_finished.emit(operation, filepath, new_hash, True, file_format)
+        except FileOperationCancelled:
+            self.cancelled.emit(operation)
+        except Exception as e:
+            self.failed.emit(operation, f"Error saving file: {str(e)}")
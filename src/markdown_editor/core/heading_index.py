@@ -0,0 +1,182 @@
+"""
+Incrementally maintained index of the headings of a markdown document.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+ATX_HEADING_PATTERN = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+SETEXT_UNDERLINE_PATTERN = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+
+# Lines that can't be the text of a setext heading
+NOT_SETEXT_TEXT_PATTERN = re.compile(r'^(?: {4}|\t| {0,3}(?:[*+>-]|\d+[.)])(?:[ \t]|$))')
+
+# Line kinds
+TEXT = 0
+ATX_HEADING = 1
+SETEXT_UNDERLINE = 2
+FENCE = 3
+
+
+def _classify(line: str) -> Optional[Tuple]:
+    """
+    Classify a line for heading detection.
+    
+    Args:
+        line: Line without its line ending
+        
+    Returns:
+        Tuple starting with the line kind, or None for blank and other lines
+    """
+    if not line.strip():
+        return None
+    
+    match = ATX_HEADING_PATTERN.match(line)
+    if match:
+        return (ATX_HEADING, len(match.group(1)), (match.group(2) or '').strip())
+    
+    match = FENCE_PATTERN.match(line)
+    if match:
+        fence = match.group(1)
+        return (FENCE, fence[0], len(fence), bool(match.group(2).strip()))
+    
+    match = SETEXT_UNDERLINE_PATTERN.match(line)
+    if match:
+        return (SETEXT_UNDERLINE, 1 if match.group(1)[0] == '=' else 2)
+    
+    if NOT_SETEXT_TEXT_PATTERN.match(line):
+        return None
+    return (TEXT, line.strip())
+
+
+class HeadingIndex:
+    """
+    Index of ATX and setext headings, kept per line of the document.
+    
+    Edits replace a range of lines; only the lines in that range are
+    classified again. The heading list is derived from the per-line
+    classification when it is next asked for, skipping fenced code.
+    """
+    
+    def __init__(self, text: str = ""):
+        """
+        Initialize the heading index.
+        
+        Args:
+            text: Initial document text
+        """
+        self._lines = []  # Classification of every line
+        self._headings = []  # (line, level, title)
+        self._heading_lines = []  # Lines of the headings, for bisection
+        self._dirty = False
+        
+        self.reset(text)
+    
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the indexed document."""
+        return len(self._lines)
+    
+    def reset(self, text: str) -> None:
+        """
+        Index a whole document.
+        
+        Args:
+            text: Document text
+        """
+        self._lines = [_classify(line) for line in text.split('\n')]
+        self._dirty = True
+    
+    def replace_lines(self, first: int, count: int, lines: List[str]) -> None:
+        """
+        Replace a range of lines by new lines.
+        
+        Args:
+            first: Number of the first replaced line, from 0
+            count: Number of replaced lines
+            lines: Text of the new lines, without line endings
+        """
+        self._lines[first:first + count] = [_classify(line) for line in lines]
+        self._dirty = True
+    
+    def headings(self) -> List[Dict[str, Any]]:
+        """
+        Get the headings of the document.
+        
+        Returns:
+            List of dictionaries with the line (from 0), level and title of
+            each heading, in document order
+        """
+        self._update()
+        return [
+            {'line': line, 'level': level, 'title': title}
+            for line, level, title in self._headings
+        ]
+    
+    def heading_at(self, line: int) -> int:
+        """
+        Find the heading whose section contains a line.
+        
+        Args:
+            line: Line number, from 0
+            
+        Returns:
+            Position of the heading in the heading list, or -1 if the line
+            comes before the first heading
+        """
+        self._update()
+        return bisect_right(self._heading_lines, line) - 1
+    
+    def section_range(self, line: int) -> Tuple[int, int]:
+        """
+        Find the lines of the heading section that contains a line.
+        
+        Args:
+            line: Line number, from 0
+            
+        Returns:
+            (first, end) tuple: the line of the section's heading (0 before
+            the first heading) and the line of the next heading (the line
+            count after the last one)
+        """
+        self._update()
+        index = bisect_right(self._heading_lines, line)
+        first = self._heading_lines[index - 1] if index > 0 else 0
+        end = self._heading_lines[index] if index < len(self._heading_lines) else len(self._lines)
+        return first, end
+    
+    def _update(self) -> None:
+        """Derive the heading list from the line classification."""
+        if not self._dirty:
+            return
+        
+        headings = []
+        fence = None
+        previous = None
+        
+        for number, info in enumerate(self._lines):
+            if fence is not None:
+                # A closing fence has the same character, is no shorter and has no info string
+                if info is not None and info[0] == FENCE and info[1] == fence[0] \
+                        and info[2] >= fence[1] and not info[3]:
+                    fence = None
+                previous = None
+                continue
+            
+            if info is not None:
+                kind = info[0]
+                if kind == ATX_HEADING:
+                    headings.append((number, info[1], info[2]))
+                elif kind == FENCE:
+                    fence = (info[1], info[2])
+                elif kind == SETEXT_UNDERLINE and previous is not None and previous[0] == TEXT:
+                    headings.append((number - 1, info[1], previous[1]))
+                    info = None
+            
+            previous = info
+        
+        self._headings = headings
+        self._heading_lines = [heading[0] for heading in headings]
+        self._dirty = False
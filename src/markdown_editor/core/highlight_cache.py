@@ -0,0 +1,175 @@
+"""
+Memoized Pygments highlighting for code blocks.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+try:
+    from pygments import highlight as pygments_highlight
+    from pygments.lexers import get_lexer_by_name as pygments_get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # pragma: no cover
+    pygments_highlight = None
+    pygments_get_lexer_by_name = None
+
+# Cached result of a lookup for an unknown alias
+_NOT_FOUND = object()
+
+
+def _freeze(options: Dict[str, Any]) -> tuple:
+    """Turn an options dictionary into a hashable key."""
+    return tuple(sorted((key, repr(value)) for key, value in options.items()))
+
+
+class HighlightCache:
+    """
+    Bounded LRU cache of highlighted code and of lexer lookups.
+    """
+    
+    def __init__(self, max_entries: int = 512, max_lexers: int = 64):
+        """
+        Initialize the highlight cache.
+        
+        Args:
+            max_entries: Maximum number of highlighted blocks to keep
+            max_lexers: Maximum number of lexers to keep
+        """
+        self.max_entries = max_entries
+        self.max_lexers = max_lexers
+        
+        self._entries = OrderedDict()  # (lexer, code, options) -> html
+        self._lexers = OrderedDict()  # (alias, options) -> lexer
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.lexer_hits = 0
+        self.lexer_misses = 0
+    
+    def highlight(self, code: str, lexer, formatter, outfile=None):
+        """
+        Highlight code with Pygments, reusing earlier output for the same input.
+        
+        Takes the same arguments as ``pygments.highlight``.
+        
+        Returns:
+            Highlighted code
+        """
+        if outfile is not None:
+            return pygments_highlight(code, lexer, formatter, outfile)
+        
+        key = (
+            type(lexer).__name__, _freeze(lexer.options),
+            type(formatter).__name__, _freeze(formatter.options),
+            code
+        )
+        
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        
+        result = pygments_highlight(code, lexer, formatter)
+        
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return result
+    
+    def get_lexer_by_name(self, alias: str, **options):
+        """
+        Look up a lexer by alias, reusing lexers created with the same options.
+        
+        Takes the same arguments as ``pygments.lexers.get_lexer_by_name``.
+        
+        Returns:
+            Pygments lexer instance
+        """
+        key = (alias.lower() if alias else alias, _freeze(options))
+        
+        with self._lock:
+            lexer = self._lexers.get(key)
+            if lexer is not None:
+                self._lexers.move_to_end(key)
+                self.lexer_hits += 1
+                if lexer is _NOT_FOUND:
+                    raise ClassNotFound(f"no lexer for alias {alias!r} found")
+                return lexer
+            self.lexer_misses += 1
+        
+        try:
+            lexer = pygments_get_lexer_by_name(alias, **options)
+        except ClassNotFound:
+            # Blocks without a language look up the same unknown alias every time
+            self._add_lexer(key, _NOT_FOUND)
+            raise
+        
+        self._add_lexer(key, lexer)
+        return lexer
+    
+    def _add_lexer(self, key: tuple, lexer) -> None:
+        """Remember a lexer lookup, evicting the least recently used."""
+        with self._lock:
+            self._lexers[key] = lexer
+            while len(self._lexers) > self.max_lexers:
+                self._lexers.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hit/miss counters and cache sizes
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'lexer_hits': self.lexer_hits,
+                'lexer_misses': self.lexer_misses,
+                'lexers': len(self._lexers),
+            }
+    
+    def clear(self) -> None:
+        """Drop cached output and lexers and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._lexers.clear()
+            self.hits = 0
+            self.misses = 0
+            self.lexer_hits = 0
+            self.lexer_misses = 0
+
+
+# Shared by every MarkdownProcessor in the process
+highlight_cache = HighlightCache()
+
+
+def install_highlight_cache() -> None:
+    """
+    Route the Pygments calls of the highlighting extensions through the cache.
+    
+    Both ``codehilite`` and ``pymdownx.highlight`` import ``highlight`` and
+    ``get_lexer_by_name`` into their module namespace, so those names are
+    replaced there. Safe to call more than once.
+    """
+    if pygments_highlight is None:
+        return
+    
+    from markdown.extensions import codehilite
+    from pymdownx import highlight as pymdownx_highlight
+    
+    for module in (codehilite, pymdownx_highlight):
+        if getattr(module, 'highlight', None) is pygments_highlight:
+            module.highlight = highlight_cache.highlight
+        if getattr(module, 'get_lexer_by_name', None) is pygments_get_lexer_by_name:
+            module.get_lexer_by_name = highlight_cache.get_lexer_by_name
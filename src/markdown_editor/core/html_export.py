@@ -0,0 +1,197 @@
+"""
+HTML templates and style sheets of rendered markdown.
+
+The preview page and exported documents share the same document style
+sheet; themes only add the rules that change colors, so the preview can
+swap them without rendering again.
+"""
+
+import html
+import re
+from typing import List
+
+# Style sheet of rendered markdown
+DOCUMENT_CSS = """
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 20px;
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #2c3e50;
+    margin-top: 24px;
+    margin-bottom: 16px;
+}
+h1 { border-bottom: 2px solid #eee; padding-bottom: 10px; }
+h2 { border-bottom: 1px solid #eee; padding-bottom: 8px; }
+code {
+    background-color: #f4f4f4;
+    padding: 2px 4px;
+    border-radius: 3px;
+    font-family: 'Consolas', 'Monaco', monospace;
+}
+pre {
+    background-color: #f4f4f4;
+    padding: 16px;
+    border-radius: 6px;
+    overflow-x: auto;
+}
+blockquote {
+    border-left: 4px solid #ddd;
+    margin: 0;
+    padding-left: 16px;
+    color: #666;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 16px 0;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px 12px;
+    text-align: left;
+}
+th {
+    background-color: #f4f4f4;
+    font-weight: bold;
+}
+a {
+    color: #3498db;
+    text-decoration: none;
+}
+a:hover {
+    text-decoration: underline;
+}
+img {
+    max-width: 100%;
+    height: auto;
+}
+ul, ol {
+    padding-left: 24px;
+}
+li {
+    margin: 4px 0;
+}
+"""
+
+# Color overrides of each theme, applied after the document style sheet
+DOCUMENT_THEMES = {
+    "light": "",
+    "dark": """
+body { background-color: #212529; color: #f8f9fa; }
+h1, h2, h3, h4, h5, h6 { color: #f8f9fa; }
+h1, h2 { border-bottom-color: #495057; }
+code, pre, th { background-color: #343a40; }
+blockquote { border-left-color: #495057; color: #adb5bd; }
+th, td { border-color: #495057; }
+a { color: #6ea8fe; }
+""",
+}
+
+SLOT_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+
+class HtmlTemplate:
+    """
+    An HTML page with named slots, split into its literal parts once.
+    
+    Slots are written ``{{name}}``. Values known when the template is
+    created are filled in then, so rendering only joins the remaining
+    parts with the values of the other slots.
+    """
+    
+    def __init__(self, source: str, **constants: str):
+        """
+        Compile a template.
+        
+        Args:
+            source: Page with ``{{name}}`` slots
+            **constants: Values of the slots that never change
+        """
+        parts = SLOT_PATTERN.split(source)
+        
+        # Merge the constants into the literal text around them
+        self._parts: List[str] = [parts[0]]
+        self._slots: List[str] = []
+        for index in range(1, len(parts), 2):
+            name, text = parts[index], parts[index + 1]
+            if name in constants:
+                self._parts[-1] += constants[name] + text
+            else:
+                self._slots.append(name)
+                self._parts.append(text)
+    
+    @property
+    def slots(self) -> List[str]:
+        """Names of the slots filled in by render(), in page order."""
+        return list(self._slots)
+    
+    def render(self, **values: str) -> str:
+        """
+        Fill in the slots of the template.
+        
+        Args:
+            **values: Value of every slot
+            
+        Returns:
+            Complete page
+            
+        Raises:
+            KeyError: If a slot has no value
+        """
+        pieces = [self._parts[0]]
+        for name, text in zip(self._slots, self._parts[1:]):
+            pieces.append(values[name])
+            pieces.append(text)
+        return "".join(pieces)
+
+
+EXPORT_TEMPLATE = HtmlTemplate("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{{title}}</title>
+    <style>{{style}}</style>
+    <style>{{theme_style}}</style>
+</head>
+<body>
+    {{body}}
+</body>
+</html>""", style=DOCUMENT_CSS)
+
+
+def get_theme_css(theme: str) -> str:
+    """
+    Get the color overrides of a theme.
+    
+    Args:
+        theme: Theme name
+        
+    Returns:
+        CSS applied after the document style sheet
+        
+    Raises:
+        ValueError: If the theme is unknown
+    """
+    if theme not in DOCUMENT_THEMES:
+        raise ValueError(f"Unknown theme: {theme}")
+    return DOCUMENT_THEMES[theme]
+
+
+def build_html_document(body: str, title: str = "Exported Document", theme: str = "light") -> str:
+    """
+    Wrap rendered markdown in a complete HTML document.
+    
+    Args:
+        body: Rendered HTML body
+        title: Document title
+        theme: Name of the document theme
+        
+    Returns:
+        Complete HTML document
+    """
+    return EXPORT_TEMPLATE.render(title=html.escape(title), theme_style=get_theme_css(theme), body=body)
@@ -0,0 +1,640 @@
+"""
+Single-pass conversion of HTML back to markdown.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\r\n\f]+')
+
+# Language of a code block, from class="language-python" and the like
+LANGUAGE_PATTERN = re.compile(r'(?:^|\s)(?:language|lang)-([\w+#.-]+)')
+
+# Nesting level Qt writes on every list instead of nesting the list elements
+QT_LIST_INDENT_PATTERN = re.compile(r'-qt-list-indent:\s*(\d+)')
+
+HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+INLINE_MARKERS = {
+    'strong': '**', 'b': '**',
+    'em': '*', 'i': '*', 'cite': '*',
+    'del': '~~', 's': '~~', 'strike': '~~',
+    'ins': '^^', 'u': '^^',
+    'mark': '==',
+}
+
+# Elements that start a new block; anything else is treated as inline
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'body', 'center', 'details', 'div', 'dl',
+    'figure', 'figcaption', 'footer', 'form', 'header', 'html', 'main', 'nav',
+    'p', 'section', 'summary',
+})
+
+SKIPPED_TAGS = frozenset({'head', 'script', 'style', 'template', 'title'})
+
+CODE_TAGS = frozenset({'code', 'kbd', 'samp', 'tt'})
+
+# Font families that mark text set in a code font
+MONOSPACE_FONTS = ('monospace', 'courier', 'consolas', 'monaco', 'menlo', 'mono')
+
+# An ampersand that would start a character reference
+ENTITY_AMPERSAND_PATTERN = re.compile(r'&(?=#?\w+;)')
+
+# Ends a list, so that a following list at its level isn't merged into it
+LIST_BREAK = '<!-- -->'
+
+
+def escape_text(text: str) -> str:
+    """Escape the characters of text that markdown would read as HTML."""
+    text = ENTITY_AMPERSAND_PATTERN.sub('&amp;', text)
+    return text.replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _style_markers(style: str) -> List[str]:
+    """
+    Get the markdown markers for the character formats of a style attribute.
+    
+    Args:
+        style: Inline CSS, e.g. as written by QTextEdit.toHtml()
+        
+    Returns:
+        Opening markers, outermost first; a code font is a single backtick
+    """
+    markers = []
+    declarations = {}
+    for declaration in style.split(';'):
+        name, _, value = declaration.partition(':')
+        declarations[name.strip().lower()] = value.strip().lower()
+    
+    family = declarations.get('font-family', '')
+    if family and any(font in family for font in MONOSPACE_FONTS):
+        return ['`']
+    
+    weight = declarations.get('font-weight', '')
+    if weight == 'bold' or weight == 'bolder' or (weight.isdigit() and int(weight) >= 600):
+        markers.append('**')
+    if declarations.get('font-style') == 'italic':
+        markers.append('*')
+    
+    decoration = declarations.get('text-decoration', '')
+    if 'line-through' in decoration:
+        markers.append('~~')
+    if 'underline' in decoration:
+        markers.append('^^')
+    
+    return markers
+
+
+def _code_fence(text: str) -> str:
+    """Get a backtick fence longer than any backtick run in the text."""
+    longest = 0
+    run = 0
+    for char in text:
+        run = run + 1 if char == '`' else 0
+        longest = max(longest, run)
+    return '`' * (longest + 1)
+
+
+def format_inline(text: str, opening: str, closing: Optional[str] = None) -> str:
+    """
+    Wrap text in inline markdown markers.
+    
+    Markers must touch the text they format, so whitespace at either end is
+    kept outside them. A single backtick formats code and is widened to fit
+    backticks in the text.
+    
+    Args:
+        text: Text to format
+        opening: Opening markers, e.g. "**" or "***"
+        closing: Closing markers (the opening ones reversed if None)
+        
+    Returns:
+        Formatted text
+    """
+    content = text.strip()
+    if not content or not opening:
+        return text
+    
+    if opening == '`':
+        opening = closing = _code_fence(text)
+        if content.startswith('`') or content.endswith('`'):
+            content = f" {content} "
+    elif closing is None:
+        closing = opening[::-1]
+    
+    leading = text[:len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()):]
+    return f"{leading}{opening}{content}{closing}{trailing}"
+
+
+def format_link(text: str, href: str, title: str = '') -> str:
+    """
+    Format a link.
+    
+    Args:
+        text: Link text
+        href: Link target
+        title: Link title
+        
+    Returns:
+        Markdown link, or the text if there is no target
+    """
+    content = text.strip()
+    if not href:
+        return text
+    if not content:
+        content = href
+    if title:
+        return f'[{content}]({href} "{title}")'
+    return f"[{content}]({href})"
+
+
+class HtmlToMarkdownConverter(HTMLParser):
+    """
+    Converts HTML to markdown while tokenizing it.
+    
+    Text and tags are handled as the tokenizer reports them, so the input is
+    read once and may be fed in pieces. Output of ``QTextEdit.toHtml()`` is
+    recognised by its ``qrichtext`` meta tag: every Qt paragraph is one line
+    of markdown and its whitespace is kept.
+    
+    Text of Qt paragraphs is markdown source and is kept as it is. Other
+    text is escaped where markdown would read it as HTML.
+    """
+    
+    def __init__(self):
+        """Initialize the converter."""
+        super().__init__(convert_charrefs=True)
+        self._reset_state()
+    
+    def _reset_state(self):
+        """Reset the conversion state."""
+        self.qt_rich_text = False
+        
+        self.output = []  # Markdown pieces, joined once at the end
+        self.last_kind = None
+        self.last_quote_depth = 0
+        
+        self.inline = []  # Text of the current block
+        self.inline_stack = []  # (tag, position in inline, opening marker, closing marker)
+        
+        self.skip_depth = 0
+        self.text_depth = 0
+        self.code_depth = 0
+        self.quote_depth = 0
+        self.heading_level = 0
+        
+        self.lists = []  # [ordered, next number, depth]
+        self.closed_list_depth = None  # Depth of a list ended by the last tag
+        self.break_depth = None  # Depth of the last list break inside an item
+        self.item_marker = None  # Marker for the first block of a list item
+        self.definition_pending = False
+        
+        self.pre = None  # Text of the current code block
+        self.pre_language = ''
+        self.code_title = None  # Text of a highlighted block's title
+        self.title_language = ''
+        
+        self.tables = []  # Rows of cells
+        self.in_cell = False
+    
+    def reset(self):
+        """Reset the tokenizer and the conversion state."""
+        super().reset()
+        self._reset_state()
+    
+    def convert(self, html: str) -> str:
+        """
+        Convert a complete HTML document.
+        
+        Args:
+            html: HTML content to convert
+            
+        Returns:
+            Markdown text
+        """
+        self.reset()
+        self.feed(html)
+        return self.finish()
+    
+    def finish(self) -> str:
+        """
+        Finish converting the HTML fed so far.
+        
+        Returns:
+            Markdown text
+        """
+        self.close()
+        
+        if self.pre is not None:
+            self._end_code_block()
+        while self.tables:
+            self._end_table()
+        self._flush()
+        
+        return "".join(self.output).lstrip('\n').rstrip()
+    
+    # Tokenizer callbacks
+    def handle_starttag(self, tag, attrs):
+        """Handle an opening tag."""
+        if tag == 'meta':
+            # Inside <head>, which is otherwise skipped
+            if dict(attrs).get('name') == 'qrichtext':
+                self.qt_rich_text = True
+            return
+        
+        if self.skip_depth:
+            if tag in SKIPPED_TAGS:
+                self.skip_depth += 1
+            return
+        
+        attributes = dict(attrs)
+        
+        if self.pre is not None:
+            if tag == 'br':
+                self.pre.append('\n')
+            elif tag == 'code' and not self.pre_language:
+                self.pre_language = self._language(attributes)
+            return
+        
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'span' and 'filename' in (attributes.get('class') or '').split():
+            # Title pymdownx.highlight puts above a code block
+            self.code_title = []
+        elif tag == 'br':
+            self.inline.append(' ' if self.in_cell else '\n')
+        elif tag == 'img':
+            self._image(attributes)
+        elif tag == 'input':
+            if attributes.get('type') == 'checkbox':
+                self.inline.append('[x] ' if 'checked' in attributes else '[ ] ')
+        elif tag == 'a':
+            self.inline_stack.append(('a', len(self.inline), attributes.get('href') or '', attributes.get('title') or ''))
+        elif tag in CODE_TAGS:
+            self._open_markers(tag, ['`'])
+        elif tag in INLINE_MARKERS:
+            self._open_markers(tag, [INLINE_MARKERS[tag]])
+        elif tag == 'span':
+            self._open_markers(tag, _style_markers(attributes.get('style') or ''))
+        elif self.in_cell:
+            # Cells hold a single line
+            if tag in BLOCK_TAGS or tag in HEADING_LEVELS:
+                self.inline.append(' ')
+        elif tag in HEADING_LEVELS:
+            self._flush()
+            self.heading_level = HEADING_LEVELS[tag]
+            self.text_depth += 1
+        elif tag == 'li':
+            self._flush()
+            self._start_item(attributes)
+            self.text_depth += 1
+        elif tag == 'ul' or tag == 'ol':
+            self._flush()
+            self._start_list(tag == 'ol', attributes)
+        elif tag == 'blockquote':
+            self._flush()
+            self.quote_depth += 1
+        elif tag == 'pre':
+            self._flush()
+            self.pre = []
+            self.pre_language = self._language(attributes) or self.title_language
+            self.title_language = ''
+        elif tag == 'hr':
+            self._flush()
+            self._emit('---', 'rule')
+        elif tag == 'table':
+            self._flush()
+            self.tables.append([])
+        elif tag == 'tr':
+            if self.tables:
+                self.tables[-1].append([])
+        elif tag == 'td' or tag == 'th':
+            if self.tables:
+                if not self.tables[-1]:
+                    self.tables[-1].append([])
+                self.in_cell = True
+        elif tag == 'dt':
+            self._flush()
+            self.text_depth += 1
+        elif tag == 'dd':
+            self._flush()
+            self.definition_pending = True
+            self.text_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            if tag == 'p':
+                self.text_depth += 1
+    
+    def handle_startendtag(self, tag, attrs):
+        """Handle a self-closing tag such as <br />."""
+        self.handle_starttag(tag, attrs)
+        if tag not in ('br', 'img', 'input', 'meta', 'hr'):
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        """Handle a closing tag."""
+        if self.skip_depth:
+            if tag in SKIPPED_TAGS:
+                self.skip_depth -= 1
+            return
+        
+        if self.pre is not None:
+            if tag == 'pre':
+                self._end_code_block()
+            return
+        
+        if tag == 'span' and self.code_title is not None:
+            title = "".join(self.code_title).strip().lower()
+            self.code_title = None
+            # The title is the lexer name, which is usually also an alias
+            self.title_language = title if title and ' ' not in title else ''
+        elif tag == 'a' or tag == 'span' or tag in INLINE_MARKERS or tag in CODE_TAGS:
+            self._close_inline(tag)
+        elif tag == 'td' or tag == 'th':
+            if self.in_cell:
+                self._end_cell()
+        elif self.in_cell and tag != 'table':
+            if tag in BLOCK_TAGS or tag in HEADING_LEVELS:
+                self.inline.append(' ')
+        elif tag in HEADING_LEVELS:
+            self._end_text_block()
+            self.heading_level = 0
+        elif tag == 'li':
+            self._end_text_block()
+            self.item_marker = None
+        elif tag == 'ul' or tag == 'ol':
+            self._flush()
+            if self.lists:
+                self.closed_list_depth = self.lists.pop()[2]
+        elif tag == 'blockquote':
+            self._flush()
+            self.quote_depth = max(0, self.quote_depth - 1)
+        elif tag == 'table':
+            if self.in_cell:
+                self._end_cell()
+            if self.tables:
+                self._end_table()
+        elif tag == 'p':
+            # An empty Qt paragraph is a blank line
+            self._end_text_block(keep_empty=self.qt_rich_text)
+        elif tag == 'dt' or tag == 'dd':
+            self._end_text_block()
+            self.definition_pending = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+    
+    def handle_data(self, data):
+        """Handle text."""
+        if self.skip_depth:
+            return
+        
+        if self.pre is not None:
+            self.pre.append(data)
+            return
+        
+        if self.code_title is not None:
+            self.code_title.append(data)
+            return
+        
+        if self.qt_rich_text and self.text_depth and not self.in_cell:
+            # Qt paragraphs are white-space: pre-wrap
+            self.inline.append(data)
+        elif data.strip() or self.inline:
+            text = WHITESPACE_PATTERN.sub(' ', data)
+            # Whitespace collapses across inline elements too
+            if text.startswith(' ') and self.inline and self.inline[-1].endswith(' '):
+                text = text[1:]
+            if not self.code_depth and not self.qt_rich_text:
+                text = escape_text(text)
+            self.inline.append(text)
+    
+    # Inline formatting
+    def _open_markers(self, tag: str, markers: List[str]):
+        """Open character formatting for an element."""
+        if self.code_depth:
+            # Formatting inside code is not markdown
+            markers = []
+        elif markers == ['`']:
+            self.code_depth += 1
+        elif '^^' in markers and any(entry[0] == 'a' for entry in self.inline_stack):
+            # Qt underlines every link
+            markers = [marker for marker in markers if marker != '^^']
+        
+        opening = "".join(markers)
+        self.inline_stack.append((tag, len(self.inline), opening, opening[::-1]))
+    
+    def _close_inline(self, tag: str):
+        """Close an inline element and the elements left open inside it."""
+        if not any(entry[0] == tag for entry in self.inline_stack):
+            return
+        
+        while self.inline_stack:
+            entry = self.inline_stack.pop()
+            self._wrap_inline(entry)
+            if entry[0] == tag:
+                break
+    
+    def _wrap_inline(self, entry: Tuple[str, int, str, str]):
+        """Replace the text of an inline element by its markdown."""
+        tag, position, opening, closing = entry
+        text = "".join(self.inline[position:])
+        del self.inline[position:]
+        
+        if tag == 'a':
+            self.inline.append(format_link(text, opening, closing))
+            return
+        
+        if opening == '`':
+            self.code_depth -= 1
+        self.inline.append(format_inline(text, opening, closing))
+    
+    def _image(self, attributes: Dict[str, Optional[str]]):
+        """Add an image."""
+        source = attributes.get('src') or ''
+        if not source:
+            return
+        alt = attributes.get('alt') or ''
+        title = attributes.get('title') or ''
+        if title:
+            self.inline.append(f'![{alt}]({source} "{title}")')
+        else:
+            self.inline.append(f"![{alt}]({source})")
+    
+    def _language(self, attributes: Dict[str, Optional[str]]) -> str:
+        """Get the language of a code block from its class."""
+        match = LANGUAGE_PATTERN.search(attributes.get('class') or '')
+        return match.group(1) if match else ''
+    
+    # Blocks
+    def _start_list(self, ordered: bool, attributes: Dict[str, Optional[str]]):
+        """Start a list."""
+        match = QT_LIST_INDENT_PATTERN.search(attributes.get('style') or '')
+        if match:
+            depth = max(0, int(match.group(1)) - 1)
+        else:
+            depth = len(self.lists)
+        
+        if depth == self.closed_list_depth:
+            # Markdown continues the list just ended, whatever its markers
+            self._emit(LIST_BREAK, 'break')
+            if depth:
+                self.break_depth = depth
+        
+        start = attributes.get('start') or '1'
+        number = int(start) if start.isdigit() else 1
+        self.lists.append([ordered, number, depth])
+    
+    def _start_item(self, attributes: Dict[str, Optional[str]]):
+        """Start a list item."""
+        if not self.lists:
+            self.lists.append([False, 1, 0])
+        
+        current = self.lists[-1]
+        if current[0]:
+            self.item_marker = f"{current[1]}. "
+            current[1] += 1
+        else:
+            self.item_marker = "- "
+        
+        classes = (attributes.get('class') or '').split()
+        if 'checked' in classes:
+            self.item_marker += "[x] "
+        elif 'unchecked' in classes:
+            self.item_marker += "[ ] "
+    
+    def _end_text_block(self, keep_empty: bool = False):
+        """End an element holding text."""
+        self.text_depth = max(0, self.text_depth - 1)
+        self._flush(keep_empty)
+    
+    def _take_inline(self) -> str:
+        """Close open inline elements and take the text of the block."""
+        while self.inline_stack:
+            self._wrap_inline(self.inline_stack.pop())
+        
+        text = "".join(self.inline)
+        self.inline = []
+        return text
+    
+    def _flush(self, keep_empty: bool = False):
+        """Emit the text collected for the current block."""
+        text = self._take_inline()
+        
+        if self.qt_rich_text:
+            text = text.rstrip('\n')
+        else:
+            lines = [line.strip() for line in text.split('\n')]
+            text = "\n".join(lines).strip('\n')
+        
+        if not text.strip() and not keep_empty:
+            return
+        
+        if self.heading_level:
+            text = "#" * self.heading_level + " " + " ".join(text.split())
+            self._emit(text, 'heading')
+        elif self.definition_pending:
+            self.definition_pending = False
+            self._emit(": " + text, 'definition')
+        else:
+            self._emit(text, 'text')
+    
+    def _emit(self, text: str, kind: str):
+        """Add a block, prefixed for the lists and quotes it is in."""
+        lines = text.split('\n')
+        tight = True
+        
+        if self.lists and not self.in_cell:
+            indent = "    " * self.lists[-1][2]
+            if self.item_marker is not None and kind != 'rule' and kind != 'break':
+                first = indent + self.item_marker
+                self.item_marker = None
+                kind = 'item'
+                if self.break_depth is not None and self.lists[-1][2] < self.break_depth:
+                    # An item after a list break in the one before it
+                    self.break_depth = None
+                    tight = False
+            else:
+                first = indent + "    "
+            rest = indent + "    "
+            lines = [first + lines[0]] + [rest + line if line else line for line in lines[1:]]
+        
+        if self.quote_depth:
+            quote = "> " * self.quote_depth
+            lines = [(quote + line).rstrip() for line in lines]
+        
+        if not self.output:
+            separator = ""
+        elif self.qt_rich_text:
+            separator = "\n"
+        elif kind == 'item' and self.last_kind == 'item' and tight:
+            separator = "\n"
+        elif kind == 'definition' and self.last_kind in ('text', 'definition'):
+            separator = "\n"
+        elif self.quote_depth and self.last_quote_depth == self.quote_depth:
+            separator = "\n" + (">" * self.quote_depth) + "\n"
+        else:
+            separator = "\n\n"
+        
+        self.output.append(separator)
+        self.output.append("\n".join(lines))
+        self.last_kind = kind
+        self.last_quote_depth = self.quote_depth
+        self.closed_list_depth = None
+    
+    def _end_code_block(self):
+        """Emit the collected code block as a fenced block."""
+        code = "".join(self.pre)
+        self.pre = None
+        
+        if code.startswith('\n'):
+            code = code[1:]
+        code = code.rstrip('\n')
+        
+        fence = '```'
+        while fence in code:
+            fence += '`'
+        
+        self._emit(f"{fence}{self.pre_language}\n{code}\n{fence}", 'code')
+        self.pre_language = ''
+    
+    def _end_cell(self):
+        """Add the text of the current cell to its row."""
+        text = " ".join(self._take_inline().split()).replace('|', '\\|')
+        self.in_cell = False
+        if self.tables and self.tables[-1]:
+            self.tables[-1][-1].append(text)
+    
+    def _end_table(self):
+        """Emit the collected table as a pipe table."""
+        rows = [row for row in self.tables.pop() if row]
+        if not rows:
+            return
+        
+        columns = max(len(row) for row in rows)
+        rows = [row + [''] * (columns - len(row)) for row in rows]
+        
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * columns]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+        text = "\n".join(lines)
+        
+        if self.tables:
+            # Tables inside a cell are flattened into the cell
+            self.inline.append(" ".join(" ".join(row) for row in rows))
+            self.in_cell = True
+        else:
+            self._emit(text, 'table')
+
+
+def html_to_markdown(html: str) -> str:
+    """
+    Convert HTML to markdown.
+    
+    Args:
+        html: HTML content to convert
+        
+    Returns:
+        Markdown text
+    """
+    return HtmlToMarkdownConverter().convert(html)
@@ -0,0 +1,119 @@
+"""
+Pool of pre-built Markdown converter instances.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+import markdown
+
+
+class MarkdownPool:
+    """
+    Hands out Markdown instances for exclusive use and takes them back.
+    
+    ``markdown.Markdown`` keeps per-conversion state, so one instance can
+    only serve one conversion at a time. The pool builds instances on demand
+    up to ``max_size`` and blocks further callers until one is returned.
+    """
+    
+    def __init__(self, factory: Callable[[], markdown.Markdown], max_size: int = 4):
+        """
+        Initialize the pool.
+        
+        Args:
+            factory: Callable building a configured Markdown instance
+            max_size: Maximum number of instances to build
+        """
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._waits = 0
+    
+    def add(self, md: markdown.Markdown) -> None:
+        """
+        Add an already built instance to the pool.
+        
+        Args:
+            md: Markdown instance built by the same factory
+        """
+        with self._lock:
+            self._created += 1
+        self._idle.put(md)
+    
+    def prewarm(self, count: int) -> None:
+        """
+        Build instances ahead of time so later renders skip extension setup.
+        
+        Args:
+            count: Number of idle instances to have ready
+        """
+        while True:
+            with self._lock:
+                if self._created >= min(count, self.max_size):
+                    return
+                self._created += 1
+            self._idle.put(self._build())
+    
+    @contextmanager
+    def acquire(self) -> Iterator[markdown.Markdown]:
+        """
+        Borrow an instance for the duration of a ``with`` block.
+        
+        Yields:
+            Markdown instance, reset and ready for conversion
+        """
+        md = self._take()
+        try:
+            md.reset()
+            yield md
+        finally:
+            self._idle.put(md)
+    
+    def _take(self) -> markdown.Markdown:
+        """Get an idle instance, building or waiting for one if needed."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            build = self._created < self.max_size
+            if build:
+                self._created += 1
+            else:
+                self._waits += 1
+        
+        if build:
+            return self._build()
+        
+        return self._idle.get()
+    
+    def _build(self) -> markdown.Markdown:
+        """Build an instance already counted as created."""
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get pool statistics.
+        
+        Returns:
+            Dictionary with instance counts and the number of waits
+        """
+        with self._lock:
+            return {
+                'created': self._created,
+                'idle': self._idle.qsize(),
+                'max_size': self.max_size,
+                'waits': self._waits,
+            }
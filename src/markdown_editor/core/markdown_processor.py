@@ -4,9 +4,35 @@ Markdown processing functionality for converting between markdown and HTML.
 
 import markdown
 from markdown.extensions import codehilite, tables, toc, fenced_code
-from pymdown import superfences, highlight, inlinehilite, magiclink, tasklist
+from pymdownx import superfences, highlight, inlinehilite, magiclink, tasklist
+import pygments
+import pymdownx
+import hashlib
+import json
 import re
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .blocks import (
+    split_blocks, extract_definitions, abbreviation_terms, attribute_ids, has_repeated_footnotes
+)
+from .highlight_cache import highlight_cache, install_highlight_cache
+from .html_to_markdown import html_to_markdown
+from .markdown_pool import MarkdownPool
+from .render_profiler import RenderProfiler
+
+
+# Heading tags carrying an id attribute in rendered HTML
+HEADING_ID_PATTERN = re.compile(r'(<h[1-6][^>]*?\sid=")([^"]*)(")')
+
+# Table of contents marker, which needs the whole document to render
+TOC_MARKER_PATTERN = re.compile(r'^\[TOC\]\s*$', re.MULTILINE)
+
+# Render profiles
+FULL_PROFILE = 'full'
+DRAFT_PROFILE = 'draft'
 
 
 class MarkdownProcessor:
@@ -14,8 +40,15 @@ class MarkdownProcessor:
     Handles conversion between markdown text and HTML for rendering.
     """
     
-    def __init__(self):
-        """Initialize the markdown processor with extensions."""
+    def __init__(self, incremental: bool = False, pool_size: int = 4, profile: bool = False):
+        """
+        Initialize the markdown processor with extensions.
+        
+        Args:
+            incremental: Whether to re-render only the blocks that changed
+            pool_size: Maximum number of conversions that can run at once
+            profile: Whether to time every processor of every conversion
+        """
         self.extensions = [
             'markdown.extensions.extra',
             'markdown.extensions.codehilite',
@@ -57,36 +90,500 @@ class MarkdownProcessor:
             }
         }
         
-        self.md = markdown.Markdown(
-            extensions=self.extensions,
-            extension_configs=self.extension_configs
+        # Named render profiles: extensions left out of the full setup and
+        # configuration overrides on top of it. Drafts skip Pygments,
+        # link detection and mermaid diagrams, which dominate render time
+        self.render_profiles = {
+            FULL_PROFILE: {'exclude': [], 'configs': {}},
+            DRAFT_PROFILE: {
+                'exclude': ['pymdownx.magiclink'],
+                'configs': {
+                    'codehilite': {'use_pygments': False},
+                    'pymdownx.highlight': {'use_pygments': False},
+                    'pymdownx.superfences': {'custom_fences': []},
+                },
+            },
+        }
+        
+        # Re-highlight only code blocks that changed
+        install_highlight_cache()
+        
+        # Markdown instances are stateful, so each conversion borrows one
+        # from the pool of its render profile; the first one is built up front
+        self.pool_size = pool_size
+        self.md = self._create_markdown()
+        self.pool = MarkdownPool(self._create_markdown, pool_size)
+        self.pool.add(self.md)
+        self.pools = {FULL_PROFILE: self.pool}
+        
+        # Guards the block cache and table of contents state
+        self._lock = threading.RLock()
+        self._last_toc = ""
+        
+        # Incremental rendering state
+        self.incremental = incremental
+        self.max_cached_blocks = 4096
+        self._block_cache = OrderedDict()  # key -> (html, heading ids)
+        self._last_text = None
+        self._toc_text = None
+        self._toc = ""
+        
+        # Per-processor timings, only while profiling
+        self.profiler = RenderProfiler() if profile else None
+    
+    def _create_markdown(self, render_profile: str = FULL_PROFILE) -> markdown.Markdown:
+        """
+        Build a Markdown instance with the configured extensions.
+        
+        Args:
+            render_profile: Name of the render profile
+            
+        Returns:
+            Markdown instance
+        """
+        if render_profile not in self.render_profiles:
+            raise ValueError(f"Unknown render profile: {render_profile}")
+        
+        options = self.render_profiles[render_profile]
+        extension_configs = {}
+        for name, config in self.extension_configs.items():
+            extension_configs[name] = {**config, **options['configs'].get(name, {})}
+        
+        return markdown.Markdown(
+            extensions=[name for name in self.extensions if name not in options['exclude']],
+            extension_configs=extension_configs
         )
     
+    def _get_pool(self, render_profile: str) -> MarkdownPool:
+        """Get the instance pool of a render profile, creating it if needed."""
+        with self._lock:
+            pool = self.pools.get(render_profile)
+            if pool is None:
+                if render_profile not in self.render_profiles:
+                    raise ValueError(f"Unknown render profile: {render_profile}")
+                pool = MarkdownPool(lambda: self._create_markdown(render_profile), self.pool_size)
+                self.pools[render_profile] = pool
+            return pool
+    
+    @contextmanager
+    def _acquire(self, render_profile: str = FULL_PROFILE) -> Iterator[markdown.Markdown]:
+        """Borrow a Markdown instance, timing its processors while profiling."""
+        with self._get_pool(render_profile).acquire() as md:
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.instrument(md)
+            yield md
+    
+    def config_fingerprint(self) -> str:
+        """
+        Describe everything besides the markdown that shapes the rendered HTML.
+        
+        Returns:
+            Stable description of the extensions, their configuration and the
+            library versions
+        """
+        def describe(value):
+            if callable(value):
+                return getattr(value, '__qualname__', type(value).__name__)
+            if isinstance(value, dict):
+                return {str(key): describe(item) for key, item in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [describe(item) for item in value]
+            return value
+        
+        from .. import __version__
+        return json.dumps({
+            'extensions': self.extensions,
+            'extension_configs': describe(self.extension_configs),
+            'versions': [__version__, markdown.__version__, pymdownx.__version__, pygments.__version__],
+        }, sort_keys=True, default=repr)
+    
     def _format_mermaid(self, source: str, language: str, css_class: str, **kwargs) -> str:
         """Format mermaid diagrams."""
         return f'<div class="mermaid">{source}</div>'
     
-    def markdown_to_html(self, markdown_text: str) -> str:
+    def markdown_to_html(self, markdown_text: str, render_profile: str = FULL_PROFILE) -> str:
         """
         Convert markdown text to HTML.
         
         Args:
             markdown_text: The markdown content to convert
+            render_profile: Name of the render profile, 'full' or 'draft'
             
         Returns:
             HTML representation of the markdown
         """
         try:
-            # Reset the markdown processor to clear any previous state
-            self.md.reset()
-            
-            # Convert markdown to HTML
-            html = self.md.convert(markdown_text)
+            if self.incremental:
+                return "\n".join(
+                    html for group in self._iter_block_groups(markdown_text, render_profile) for html in group
+                )
             
-            return html
+            # Borrow a Markdown instance (reset on checkout)
+            with self._acquire(render_profile) as md:
+                # Convert markdown to HTML
+                html = md.convert(markdown_text)
+                
+                with self._lock:
+                    self._last_toc = getattr(md, 'toc', "")
+                
+                return html
         except Exception as e:
             return f"<p>Error processing markdown: {str(e)}</p>"
     
+    def set_incremental(self, enabled: bool) -> None:
+        """
+        Enable or disable incremental rendering.
+        
+        Args:
+            enabled: Whether to re-render only the blocks that changed
+        """
+        with self._lock:
+            self.incremental = enabled
+            if not enabled:
+                self.clear_cache()
+    
+    def clear_cache(self) -> None:
+        """Drop all cached block renders."""
+        with self._lock:
+            self._block_cache.clear()
+            self._last_text = None
+            self._toc_text = None
+            self._toc = ""
+    
+    def markdown_to_html_blocks(self, markdown_text: str, render_profile: str = FULL_PROFILE) -> List[str]:
+        """
+        Convert markdown text to HTML, one string per top-level block.
+        
+        Joined with newlines, the blocks give the HTML of markdown_to_html in
+        incremental mode. Renders of unchanged blocks are reused.
+        
+        Args:
+            markdown_text: The markdown content to convert
+            render_profile: Name of the render profile, 'full' or 'draft'
+            
+        Returns:
+            HTML of each block, the footnote list last
+        """
+        try:
+            return [html for group in self._iter_block_groups(markdown_text, render_profile) for html in group]
+        except Exception as e:
+            return [f"<p>Error processing markdown: {str(e)}</p>"]
+    
+    def iter_html_blocks(
+        self, markdown_text: str, group_size: int = 64 * 1024, render_profile: str = FULL_PROFILE
+    ) -> Iterator[List[str]]:
+        """
+        Convert markdown text to HTML blocks, a group of blocks at a time.
+        
+        Args:
+            markdown_text: The markdown content to convert
+            group_size: Approximate amount of markdown per group, in characters
+            render_profile: Name of the render profile, 'full' or 'draft'
+            
+        Yields:
+            Lists of block HTML, as in markdown_to_html_blocks
+        """
+        return self._iter_block_groups(markdown_text, render_profile, group_size)
+    
+    def _iter_block_groups(
+        self, markdown_text: str, render_profile: str = FULL_PROFILE, group_size: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """
+        Render the blocks of a document, reusing cached renders of unchanged blocks.
+        
+        Reference links, abbreviations and footnotes defined anywhere in the
+        document are passed to the blocks that use them, and heading ids are
+        made unique across blocks the same way the toc extension does.
+        
+        Args:
+            markdown_text: The markdown content to convert
+            render_profile: Name of the render profile
+            group_size: Approximate amount of markdown per group, or None for
+                a single group
+            
+        Yields:
+            Lists of block HTML
+        """
+        with self._lock:
+            self._last_text = markdown_text
+        
+        # A table of contents and repeated footnote references both need
+        # the whole document in one conversion
+        if TOC_MARKER_PATTERN.search(markdown_text) or has_repeated_footnotes(markdown_text):
+            with self._acquire(render_profile) as md:
+                html = md.convert(markdown_text)
+            yield [html]
+            return
+        
+        blocks = split_blocks(markdown_text)
+        definitions = self._collect_definitions(blocks)
+        # Like the toc extension, keep the ids set explicitly anywhere in
+        # the document and give auto-generated ones a suffix instead
+        seen_ids = {heading_id for block in blocks for heading_id in attribute_ids(block)}
+        
+        index = 0
+        while index < len(blocks):
+            group = []
+            size = 0
+            # The instance goes back to the pool between groups
+            with self._acquire(render_profile) as md:
+                while index < len(blocks) and (group_size is None or size < group_size):
+                    block = blocks[index]
+                    index += 1
+                    size += len(block)
+                    
+                    context, strip_footnotes = self._block_context(block, definitions)
+                    html, heading_ids = self._render_block(md, block, context, strip_footnotes, render_profile)
+                    if heading_ids:
+                        html = self._unique_heading_ids(html, heading_ids, seen_ids, attribute_ids(block))
+                    if html:
+                        group.append(html)
+            if group:
+                yield group
+        
+        # Footnotes are listed once, at the end of the document
+        with self._acquire(render_profile) as md:
+            footnotes = self._render_footnotes(md, definitions, render_profile)
+        if footnotes:
+            yield [footnotes]
+        
+        self._trim_block_cache()
+    
+    def _collect_definitions(self, blocks: Iterable[str]) -> Dict[str, Any]:
+        """
+        Collect definitions that blocks may refer to across the document.
+        
+        Args:
+            blocks: Block source strings
+            
+        Returns:
+            Dictionary with the reference, abbreviation and footnote sources
+            and the abbreviated terms
+        """
+        references = []
+        abbreviations = []
+        footnotes = []
+        for block in blocks:
+            block_references, block_abbreviations, block_footnotes = extract_definitions(block)
+            references.extend(block_references)
+            abbreviations.extend(block_abbreviations)
+            footnotes.extend(block_footnotes)
+        
+        return {
+            'references': "\n".join(references),
+            'abbreviations': "\n".join(abbreviations),
+            'footnotes': "\n\n".join(footnotes),
+            'terms': abbreviation_terms(abbreviations),
+        }
+    
+    def _block_context(self, block: str, definitions: Dict[str, Any]) -> Tuple[List[str], bool]:
+        """
+        Get the definition sources a block depends on.
+        
+        Args:
+            block: Block source text
+            definitions: Definitions returned by _collect_definitions
+            
+        Returns:
+            Tuple of (definition sources, whether the block uses footnotes)
+        """
+        context = []
+        if definitions['references'] and '[' in block:
+            context.append(definitions['references'])
+        if definitions['abbreviations'] and any(term in block for term in definitions['terms']):
+            context.append(definitions['abbreviations'])
+        
+        uses_footnotes = bool(definitions['footnotes']) and '[^' in block
+        if uses_footnotes:
+            context.append(definitions['footnotes'])
+        
+        return context, uses_footnotes
+    
+    def _render_footnotes(
+        self, md: markdown.Markdown, definitions: Dict[str, Any], render_profile: str = FULL_PROFILE
+    ) -> str:
+        """
+        Render the footnote list of the document.
+        
+        Args:
+            md: Markdown instance borrowed from the pool
+            definitions: Definitions returned by _collect_definitions
+            render_profile: Render profile md was built for
+            
+        Returns:
+            HTML of the footnote list, or an empty string
+        """
+        if not definitions['footnotes']:
+            return ""
+        
+        context = [
+            source for source in (definitions['references'], definitions['abbreviations']) if source
+        ]
+        html, _ = self._render_block(md, definitions['footnotes'], context, False, render_profile)
+        return html
+    
+    def _render_block(
+        self, md: markdown.Markdown, block: str, context: List[str], strip_footnotes: bool,
+        render_profile: str = FULL_PROFILE
+    ) -> Tuple[str, List[str]]:
+        """
+        Render a single block, using the block cache when possible.
+        
+        A draft reuses the full render of the block if there is one.
+        
+        Args:
+            md: Markdown instance borrowed from the pool
+            block: Block source text
+            context: Definition sources the block depends on
+            strip_footnotes: Whether to drop the footnote list from the output
+            render_profile: Render profile md was built for
+            
+        Returns:
+            Tuple of (html, heading ids in document order)
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for source in context:
+            digest.update(source.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(block.encode('utf-8'))
+        key = (digest.digest(), strip_footnotes, render_profile)
+        
+        # Drafts show the full render of blocks that haven't changed since it,
+        # so only the edited blocks lose their highlighting while typing
+        keys = [key]
+        if render_profile != FULL_PROFILE:
+            keys.insert(0, (key[0], strip_footnotes, FULL_PROFILE))
+        
+        with self._lock:
+            for cache_key in keys:
+                cached = self._block_cache.get(cache_key)
+                if cached is not None:
+                    self._block_cache.move_to_end(cache_key)
+                    return cached
+        
+        result = self._convert_block(md, block, context, strip_footnotes)
+        with self._lock:
+            self._block_cache[key] = result
+        return result
+    
+    def _convert_block(
+        self, md: markdown.Markdown, block: str, context: List[str], strip_footnotes: bool
+    ) -> Tuple[str, List[str]]:
+        """
+        Convert a single block with the definitions it depends on.
+        
+        Args:
+            md: Markdown instance borrowed from the pool
+            block: Block source text
+            context: Definition sources the block depends on
+            strip_footnotes: Whether to drop the footnote list from the output
+            
+        Returns:
+            Tuple of (html, heading ids in document order)
+        """
+        source = "\n\n".join(context + [block]) if context else block
+        md.reset()
+        html = md.convert(source)
+        
+        if strip_footnotes:
+            index = html.rfind('<div class="footnote">')
+            if index >= 0:
+                html = html[:index].rstrip()
+        
+        heading_ids = [match.group(2) for match in HEADING_ID_PATTERN.finditer(html)]
+        return html, heading_ids
+    
+    def _unique_heading_ids(self, html: str, heading_ids: List[str], seen_ids: Set[str],
+                            explicit_ids: List[str]) -> str:
+        """
+        Rename auto-generated heading ids that were already used.
+        
+        Args:
+            html: Rendered block HTML
+            heading_ids: Heading ids in the block, in order
+            seen_ids: Ids used so far in the document (updated in place)
+            explicit_ids: Ids the block sets with attribute lists, which are
+                kept as they are
+            
+        Returns:
+            Block HTML with unique heading ids
+        """
+        renamed = {}
+        for heading_id in heading_ids:
+            if heading_id in explicit_ids:
+                continue
+            unique_id = toc.unique(heading_id, seen_ids)
+            if unique_id != heading_id:
+                renamed[heading_id] = unique_id
+        
+        if not renamed:
+            return html
+        
+        return HEADING_ID_PATTERN.sub(
+            lambda match: match.group(1) + renamed.get(match.group(2), match.group(2)) + match.group(3),
+            html
+        )
+    
+    def _trim_block_cache(self) -> None:
+        """Evict least recently used block renders over the cache limit."""
+        with self._lock:
+            while len(self._block_cache) > self.max_cached_blocks:
+                self._block_cache.popitem(last=False)
+    
+    def get_pool_stats(self) -> Dict[str, int]:
+        """
+        Get statistics of the Markdown instance pool.
+        
+        Returns:
+            Dictionary of pool statistics
+        """
+        return self.pool.stats()
+    
+    def set_profiling(self, enabled: bool) -> None:
+        """
+        Enable or disable per-processor timing of conversions.
+        
+        Disabling restores the original processors and drops the timings.
+        
+        Args:
+            enabled: Whether to time every processor of every conversion
+        """
+        if enabled and self.profiler is None:
+            self.profiler = RenderProfiler()
+        elif not enabled and self.profiler is not None:
+            profiler = self.profiler
+            self.profiler = None
+            profiler.uninstrument()
+    
+    def get_profile_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the processor timings collected while profiling.
+        
+        Inline patterns run inside the ``inline`` tree processor; each
+        processor's ``self_seconds`` excludes the processors it called.
+        
+        Returns:
+            Report as returned by RenderProfiler.report, or None if
+            profiling is disabled
+        """
+        profiler = self.profiler
+        return profiler.report() if profiler is not None else None
+    
+    def reset_profile(self) -> None:
+        """Clear the processor timings collected so far."""
+        if self.profiler is not None:
+            self.profiler.reset()
+    
+    def get_highlight_stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters of the shared syntax highlighting cache.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return highlight_cache.stats()
+    
     def extract_metadata(self, markdown_text: str) -> Dict[str, Any]:
         """
         Extract metadata from markdown front matter.
@@ -124,14 +621,27 @@ class MarkdownProcessor:
         Returns:
             HTML table of contents
         """
-        if hasattr(self.md, 'toc'):
-            return self.md.toc
-        return ""
+        with self._lock:
+            if not self.incremental or self._last_text is None:
+                return self._last_toc
+            if self._toc_text == self._last_text:
+                return self._toc
+            text = self._last_text
+        
+        # Block renders only know their own headings
+        with self._acquire() as md:
+            md.convert(text)
+            toc_html = getattr(md, 'toc', "")
+        
+        with self._lock:
+            self._toc = toc_html
+            self._toc_text = text
+        
+        return toc_html
     
     def html_to_markdown_approximation(self, html: str) -> str:
         """
-        Convert basic HTML back to markdown (approximation).
-        This is a simple implementation for basic formatting.
+        Convert HTML back to markdown.
         
         Args:
             html: HTML content to convert
@@ -139,38 +649,4 @@ class MarkdownProcessor:
         Returns:
             Approximate markdown representation
         """
-        # Remove HTML tags and convert basic formatting
-        # This is a simplified conversion - for production use,
-        # consider using html2text library
-        
-        # Basic replacements
-        replacements = [
-            (r'<h1[^>]*>(.*?)</h1>', r'# \1'),
-            (r'<h2[^>]*>(.*?)</h2>', r'## \1'),
-            (r'<h3[^>]*>(.*?)</h3>', r'### \1'),
-            (r'<h4[^>]*>(.*?)</h4>', r'#### \1'),
-            (r'<h5[^>]*>(.*?)</h5>', r'##### \1'),
-            (r'<h6[^>]*>(.*?)</h6>', r'###### \1'),
-            (r'<strong[^>]*>(.*?)</strong>', r'**\1**'),
-            (r'<b[^>]*>(.*?)</b>', r'**\1**'),
-            (r'<em[^>]*>(.*?)</em>', r'*\1*'),
-            (r'<i[^>]*>(.*?)</i>', r'*\1*'),
-            (r'<code[^>]*>(.*?)</code>', r'`\1`'),
-            (r'<a[^>]*href="([^"]*)"[^>]*>(.*?)</a>', r'[\2](\1)'),
-            (r'<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*/?>', r'![\2](\1)'),
-            (r'<br[^>]*/?>', r'\n'),
-            (r'<p[^>]*>', r'\n'),
-            (r'</p>', r'\n'),
-            (r'<div[^>]*>', r''),
-            (r'</div>', r''),
-        ]
-        
-        text = html
-        for pattern, replacement in replacements:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Clean up extra whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        text = text.strip()
-        
-        return text
\ No newline at end of file
+        return html_to_markdown(html)
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Persistent cache of rendered HTML, keyed by document content.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+# Bump when the rendered HTML changes for reasons the processor
+# configuration doesn't capture
+CACHE_FORMAT = 2
+
+
+class RenderCache:
+    """
+    Rendered HTML stored on disk, one file per document content hash.
+    
+    Entries live in a directory named after a hash of the renderer
+    configuration (extensions, their settings and library versions), so a
+    configuration change starts an empty cache. The total size of all
+    directories is bounded; the least recently used entries are evicted
+    first, with recency kept in the file modification times so it survives
+    restarts. Entries of other configurations are never read again, so they
+    go first unless that configuration is used again, e.g. by an older
+    version of the editor.
+    
+    Disk errors are never raised: a failed read is a miss and a failed write
+    is dropped.
+    """
+    
+    def __init__(self, version: str, directory: Optional[str] = None,
+                 max_bytes: int = 256 * 1024 * 1024, min_size: int = 32 * 1024):
+        """
+        Initialize the render cache.
+        
+        Args:
+            version: Description of the renderer configuration
+            directory: Cache root (default: ~/.markdown_editor/render_cache)
+            max_bytes: Maximum total size of the cached HTML
+            min_size: Smallest document, in characters, worth caching
+        """
+        root = Path(directory) if directory else Path.home() / '.markdown_editor' / 'render_cache'
+        self.version = hashlib.sha256(f"{CACHE_FORMAT}:{version}".encode('utf-8')).hexdigest()[:16]
+        self.root = root
+        self.directory = root / self.version
+        self.max_bytes = max_bytes
+        self.min_size = min_size
+        
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path under the root -> size, least recently used first
+        self._total = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._load()
+    
+    def _load(self) -> None:
+        """Index the existing entries of every configuration."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            
+            entries = []
+            for directory in self.root.iterdir():
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    if path.suffix == '.tmp' and directory == self.directory:
+                        path.unlink()  # Left by an interrupted write
+                    elif path.suffix == '.html':
+                        stat = path.stat()
+                        entries.append((stat.st_mtime, f"{directory.name}/{path.name}", stat.st_size))
+        except OSError:
+            return
+        
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total += size
+        
+        with self._lock:
+            self._evict()
+    
+    def key(self, markdown_text: str) -> str:
+        """
+        Get the cache key of a document.
+        
+        Args:
+            markdown_text: Markdown content
+            
+        Returns:
+            Hex digest of the content
+        """
+        return hashlib.sha256(markdown_text.encode('utf-8', 'surrogatepass')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get the cached HTML of a document.
+        
+        Args:
+            key: Cache key returned by key()
+            
+        Returns:
+            Rendered HTML, or None if it isn't cached
+        """
+        name = self._name(key)
+        path = self.root / name
+        
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+        
+        try:
+            html = path.read_text(encoding='utf-8')
+            os.utime(path)  # Mark as recently used
+        except (OSError, UnicodeDecodeError):
+            with self._lock:
+                self._remove(name)
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            self.hits += 1
+        return html
+    
+    def put(self, key: str, html: str) -> None:
+        """
+        Store the rendered HTML of a document.
+        
+        Args:
+            key: Cache key returned by key()
+            html: Rendered HTML
+        """
+        data = html.encode('utf-8', 'surrogatepass')
+        if len(data) > self.max_bytes:
+            return
+        
+        name = self._name(key)
+        path = self.root / name
+        # Written aside and renamed, so readers never see a partial file
+        temporary = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._total -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._total += len(data)
+            self._evict()
+    
+    def _name(self, key: str) -> str:
+        """Get the path of an entry under the root."""
+        return f"{self.version}/{key}.html"
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size."""
+        while self._total > self.max_bytes and self._entries:
+            name = next(iter(self._entries))
+            self._remove(name)
+            self.evictions += 1
+    
+    def _remove(self, name: str) -> None:
+        """Remove an entry and its file."""
+        self._total -= self._entries.pop(name, 0)
+        path = self.root / name
+        try:
+            path.unlink()
+            # Another configuration's directory goes with its last entry
+            if path.parent != self.directory:
+                path.parent.rmdir()
+        except OSError:
+            pass
+    
+    def clear(self) -> None:
+        """Remove every cached render."""
+        with self._lock:
+            for name in list(self._entries):
+                self._remove(name)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get statistics of the render cache.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,268 @@
+"""
+Per-processor timing of markdown conversions.
+"""
+
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict
+
+import markdown
+
+# Modules of the processors that ship with Python-Markdown itself
+CORE_MODULES = frozenset({
+    'markdown.preprocessors', 'markdown.blockprocessors', 'markdown.treeprocessors',
+    'markdown.inlinepatterns', 'markdown.postprocessors',
+})
+
+
+def _extension_name(processor: Any) -> str:
+    """Get the name of the extension a processor comes from."""
+    module = type(processor).__module__
+    return 'core' if module in CORE_MODULES else module
+
+
+class _TimedRegex:
+    """Compiled regular expression whose matching is timed."""
+    
+    def __init__(self, regex, profiler: 'RenderProfiler', entry: Dict[str, Any]):
+        self._regex = regex
+        self._profiler = profiler
+        self._entry = entry
+    
+    def match(self, *args, **kwargs):
+        return self._profiler.measure(self._entry, self._regex.match, *args, **kwargs)
+    
+    def search(self, *args, **kwargs):
+        return self._profiler.measure(self._entry, self._regex.search, *args, **kwargs)
+    
+    def finditer(self, *args, **kwargs):
+        iterator = self._regex.finditer(*args, **kwargs)
+        while True:
+            match = self._profiler.measure(self._entry, next, iterator, None)
+            if match is None:
+                return
+            yield match
+    
+    def __getattr__(self, name):
+        return getattr(self._regex, name)
+
+
+class RenderProfiler:
+    """
+    Times every processor of the Markdown instances it instruments.
+    
+    Instrumenting replaces the methods of each registered preprocessor, block
+    processor, tree processor, inline pattern and postprocessor on the
+    instance, so the extensions themselves are unchanged. Time spent in a
+    processor called from another one (inline patterns run inside the
+    ``inline`` tree processor) counts as the inner processor's own time only.
+    """
+    
+    def __init__(self):
+        """Initialize the profiler."""
+        self._entries = {}  # (stage, name, extension) -> timings
+        self._instances = weakref.WeakSet()
+        self._patched = weakref.WeakKeyDictionary()  # md -> [(object, attribute)]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+        self.conversions = 0
+        self.seconds = 0.0
+    
+    def _entry(self, stage: str, name: str, extension: str) -> Dict[str, Any]:
+        """Get the timings of a processor, creating them if needed."""
+        key = (stage, name, extension)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {
+                    'stage': stage, 'name': name, 'extension': extension,
+                    'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0,
+                }
+                self._entries[key] = entry
+            return entry
+    
+    def measure(self, entry: Dict[str, Any], function: Callable, *args, **kwargs):
+        """
+        Call a function, adding its run time to a processor's timings.
+        
+        Args:
+            entry: Timings of the processor
+            function: Function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            Result of the function
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        
+        stack.append(0.0)  # Time of nested measurements
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                entry['calls'] += 1
+                entry['seconds'] += elapsed
+                entry['self_seconds'] += elapsed - nested
+    
+    def _patch(self, md: markdown.Markdown, target: Any, attribute: str, entry: Dict[str, Any]) -> None:
+        """Replace a method of an object by a timed one."""
+        original = getattr(target, attribute)
+        
+        def timed(*args, **kwargs):
+            return self.measure(entry, original, *args, **kwargs)
+        
+        setattr(target, attribute, timed)
+        self._patched[md].append((target, attribute))
+    
+    def _patch_regex(self, md: markdown.Markdown, pattern: Any, entry: Dict[str, Any]) -> None:
+        """Time the regular expression matching of an inline pattern."""
+        regex = _TimedRegex(pattern.getCompiledRegExp(), self, entry)
+        pattern.getCompiledRegExp = lambda: regex
+        self._patched[md].append((pattern, 'getCompiledRegExp'))
+    
+    def instrument(self, md: markdown.Markdown) -> None:
+        """
+        Time the conversions of a Markdown instance. Safe to call repeatedly.
+        
+        Args:
+            md: Markdown instance to instrument
+        """
+        if md in self._instances:
+            return
+        self._instances.add(md)
+        self._patched[md] = []
+        
+        registries = {
+            'preprocessors': md.preprocessors,
+            'blockprocessors': md.parser.blockprocessors,
+            'treeprocessors': md.treeprocessors,
+            'inlinepatterns': md.inlinePatterns,
+            'postprocessors': md.postprocessors,
+        }
+        for stage, registry in registries.items():
+            for name in [item.name for item in registry._priority]:
+                processor = registry[name]
+                entry = self._entry(stage, name, _extension_name(processor))
+                if stage == 'blockprocessors':
+                    self._patch(md, processor, 'test', entry)
+                    self._patch(md, processor, 'run', entry)
+                elif stage == 'inlinepatterns':
+                    self._patch(md, processor, 'handleMatch', entry)
+                    self._patch_regex(md, processor, entry)
+                else:
+                    self._patch(md, processor, 'run', entry)
+        
+        original_convert = md.convert
+        
+        def convert(source):
+            start = time.perf_counter()
+            try:
+                return original_convert(source)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.conversions += 1
+                    self.seconds += elapsed
+        
+        md.convert = convert
+        self._patched[md].append((md, 'convert'))
+    
+    def uninstrument(self) -> None:
+        """Restore the original methods of every instrumented instance."""
+        for md in list(self._instances):
+            for target, attribute in self._patched.pop(md, []):
+                # The timed versions are instance attributes over class methods
+                target.__dict__.pop(attribute, None)
+        self._instances = weakref.WeakSet()
+    
+    def reset(self) -> None:
+        """Clear the timings collected so far."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry['calls'] = 0
+                entry['seconds'] = 0.0
+                entry['self_seconds'] = 0.0
+            self.conversions = 0
+            self.seconds = 0.0
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the timings collected so far.
+        
+        Returns:
+            Dictionary with the number of conversions, their total time, the
+            processors sorted by own time and the own time per extension
+        """
+        with self._lock:
+            processors = [dict(entry) for entry in self._entries.values() if entry['calls']]
+            conversions = self.conversions
+            seconds = self.seconds
+        
+        processors.sort(key=lambda entry: entry['self_seconds'], reverse=True)
+        
+        extensions = {}
+        for entry in processors:
+            extensions[entry['extension']] = extensions.get(entry['extension'], 0.0) + entry['self_seconds']
+        
+        attributed = sum(extensions.values())
+        return {
+            'conversions': conversions,
+            'seconds': seconds,
+            'ms_per_conversion': seconds * 1000 / conversions if conversions else 0.0,
+            # Block parsing loop, serialization and profiler overhead
+            'unattributed_seconds': max(0.0, seconds - attributed),
+            'processors': processors,
+            'extensions': [
+                {
+                    'extension': name,
+                    'seconds': value,
+                    'share': value / seconds if seconds else 0.0,
+                }
+                for name, value in sorted(extensions.items(), key=lambda item: item[1], reverse=True)
+            ],
+        }
+
+
+def format_profile_report(report: Dict[str, Any], top: int = 15) -> str:
+    """
+    Format a profiling report for the terminal.
+    
+    Args:
+        report: Report returned by RenderProfiler.report
+        top: Number of processors to list
+        
+    Returns:
+        Human readable report
+    """
+    lines = [
+        f"{report['conversions']} conversions in {report['seconds'] * 1000:.1f} ms "
+        f"({report['ms_per_conversion']:.2f} ms each)",
+        "",
+        "By extension (own time):",
+    ]
+    for extension in report['extensions']:
+        lines.append(
+            f"  {extension['extension']:<36} {extension['seconds'] * 1000:9.1f} ms  "
+            f"{extension['share'] * 100:5.1f}%"
+        )
+    lines.append(f"  {'(unattributed)':<36} {report['unattributed_seconds'] * 1000:9.1f} ms")
+    
+    lines.append("")
+    lines.append(f"Top {min(top, len(report['processors']))} processors (own time):")
+    for entry in report['processors'][:top]:
+        lines.append(
+            f"  {entry['stage']:<16} {entry['name']:<24} {entry['extension']:<32} "
+            f"{entry['calls']:>8} calls {entry['self_seconds'] * 1000:9.1f} ms"
+        )
+    
+    return "\n".join(lines)
@@ -0,0 +1,173 @@
+"""
+Adaptive debounce delays for the live preview.
+"""
+
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class RenderScheduler:
+    """
+    Chooses how long to wait after an edit before rendering the preview.
+    
+    Render cost is tracked per render profile as a moving average of seconds
+    per character, so the estimate follows the document as it grows. The
+    delay is the estimated render time plus the time the UI thread spends
+    applying the result, times a headroom factor, within fixed bounds: cheap
+    renders refresh almost immediately and expensive ones back off.
+    
+    The scheduler also tracks the render in progress. Callers hold new
+    requests back until it finishes, so renders never queue up.
+    """
+    
+    def __init__(self, min_delay: int = 50, max_delay: int = 3000, headroom: float = 1.5,
+                 default_throughput: float = 1024 * 1024, smoothing: float = 0.3):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            min_delay: Shortest delay in milliseconds
+            max_delay: Longest delay in milliseconds
+            headroom: Delay as a multiple of the expected render time
+            default_throughput: Characters per second assumed before any render
+            smoothing: Weight of the newest sample in the moving averages
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.headroom = headroom
+        self.default_throughput = default_throughput
+        self.smoothing = smoothing
+        
+        self.seconds_per_char = {}  # profile -> moving average
+        self.apply_seconds = None  # UI thread time per result, moving average
+        self.decisions = deque(maxlen=64)
+        
+        self.requested_generation = 0
+        self.finished_generation = 0
+        self.renders = 0
+        self.deferred = 0
+    
+    @property
+    def busy(self) -> bool:
+        """Whether the latest requested render hasn't finished yet."""
+        return self.finished_generation < self.requested_generation
+    
+    def _average(self, previous: Optional[float], sample: float) -> float:
+        """Blend a sample into a moving average."""
+        return sample if previous is None else previous + self.smoothing * (sample - previous)
+    
+    def expected_render_time(self, characters: int, profile: str) -> float:
+        """
+        Estimate how long a render will take.
+        
+        Args:
+            characters: Document size in characters
+            profile: Render profile
+            
+        Returns:
+            Expected render time in seconds
+        """
+        rate = self.seconds_per_char.get(profile)
+        if rate is None:
+            return characters / self.default_throughput
+        return characters * rate
+    
+    def delay(self, characters: int, profile: str) -> int:
+        """
+        Choose the delay before rendering after an edit.
+        
+        Args:
+            characters: Document size in characters
+            profile: Render profile that will be used
+            
+        Returns:
+            Delay in milliseconds
+        """
+        expected = self.expected_render_time(characters, profile)
+        apply_seconds = self.apply_seconds or 0.0
+        delay = int(self.headroom * (expected + apply_seconds) * 1000)
+        delay = max(self.min_delay, min(self.max_delay, delay))
+        
+        self.decisions.append({
+            'time': time.time(),
+            'characters': characters,
+            'profile': profile,
+            'expected_render_ms': expected * 1000,
+            'apply_ms': apply_seconds * 1000,
+            'delay_ms': delay,
+        })
+        return delay
+    
+    def render_requested(self, generation: int) -> None:
+        """
+        Record that a render was requested.
+        
+        Args:
+            generation: Generation number of the request
+        """
+        self.requested_generation = generation
+    
+    def reset_generations(self) -> None:
+        """Forget the render in progress, for a new renderer numbering from zero."""
+        self.requested_generation = 0
+        self.finished_generation = 0
+    
+    def render_deferred(self) -> None:
+        """Record that a request was held back behind the render in progress."""
+        self.deferred += 1
+    
+    def render_finished(self, generation: int, timing: Dict[str, Any]) -> None:
+        """
+        Record a finished render.
+        
+        Args:
+            generation: Generation number of the render
+            timing: Timing emitted by the render worker
+        """
+        self.finished_generation = max(self.finished_generation, generation)
+        self.renders += 1
+        
+        # Cache hits say nothing about render cost
+        if timing.get('cached') or not timing.get('characters'):
+            return
+        profile = timing['profile']
+        rate = timing['seconds'] / timing['characters']
+        self.seconds_per_char[profile] = self._average(self.seconds_per_char.get(profile), rate)
+    
+    def record_apply(self, seconds: float) -> None:
+        """
+        Record the UI thread time spent showing a render.
+        
+        Args:
+            seconds: Time spent on the UI thread
+        """
+        self.apply_seconds = self._average(self.apply_seconds, seconds)
+    
+    def recent_decisions(self) -> List[Dict[str, Any]]:
+        """
+        Get the latest delay decisions, oldest first.
+        
+        Returns:
+            List of dictionaries with the document size, profile, estimates
+            and chosen delay of each decision
+        """
+        return list(self.decisions)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the scheduler.
+        
+        Returns:
+            Dictionary of scheduler statistics
+        """
+        return {
+            'delay_ms': self.decisions[-1]['delay_ms'] if self.decisions else None,
+            'ms_per_kb': {
+                profile: rate * 1024 * 1000 for profile, rate in self.seconds_per_char.items()
+            },
+            'apply_ms': (self.apply_seconds or 0.0) * 1000,
+            'renders': self.renders,
+            'deferred': self.deferred,
+            'busy': self.busy,
+        }
@@ -0,0 +1,233 @@
+"""
+Background markdown rendering for the live preview.
+"""
+
+import time
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+# Joins the blocks of a render in the render cache
+CACHED_BLOCK_SEPARATOR = "\n<!-- markdown-editor:block -->\n"
+
+
+class RenderWorker(QObject):
+    """
+    Converts markdown to HTML blocks on a worker thread.
+    
+    Every request carries a generation number. Requests that are superseded
+    before the worker gets to them are skipped, and results that went stale
+    while rendering are not emitted.
+    
+    Results are lists with the HTML of each top-level block, so the preview
+    can replace only the blocks that changed. Documents of at least
+    ``stream_threshold`` characters are emitted a group of blocks at a time,
+    and a newer request stops the stream early.
+    
+    Requests marked cacheable (documents just opened) are looked up in the
+    render cache first and stored there once fully rendered. Only renders
+    with the full profile are cached.
+    
+    Every render that runs to completion, stale or not, is followed by
+    ``render_finished`` with its timing, so the caller can tell when the
+    worker is free and how expensive renders are.
+    """
+    
+    # Signals
+    rendered = pyqtSignal(int, list)  # generation, html of each block
+    stream_started = pyqtSignal(int)  # generation
+    section_rendered = pyqtSignal(int, list)  # generation, html of some blocks
+    stream_finished = pyqtSignal(int)  # generation
+    render_finished = pyqtSignal(int, dict)  # generation, timing
+    render_requested = pyqtSignal(int, str, bool, str)  # generation, markdown, cacheable, profile
+    
+    def __init__(self, processor, stream_threshold: int = 1024 * 1024,
+                 section_size: int = 64 * 1024, render_cache=None):
+        """
+        Initialize the render worker.
+        
+        Args:
+            processor: MarkdownProcessor used for conversion
+            stream_threshold: Document size in characters from which to stream
+            section_size: Approximate amount of markdown per streamed group of blocks
+            render_cache: RenderCache for documents that are opened again
+        """
+        super().__init__()
+        
+        self.processor = processor
+        self.stream_threshold = stream_threshold
+        self.section_size = section_size
+        self.render_cache = render_cache
+        self.latest_generation = 0
+        
+        self.render_requested.connect(self._render)
+    
+    @pyqtSlot(int, str, bool, str)
+    def _render(self, generation, markdown_text, cacheable, profile):
+        """Render a request unless a newer one has been queued."""
+        if generation != self.latest_generation:
+            return
+        
+        start = time.perf_counter()
+        cache_key = None
+        if cacheable and profile == 'full' and self.render_cache is not None \
+                and len(markdown_text) >= self.render_cache.min_size:
+            cache_key = self.render_cache.key(markdown_text)
+            html = self.render_cache.get(cache_key)
+            if html is not None:
+                if generation == self.latest_generation:
+                    self.rendered.emit(generation, html.split(CACHED_BLOCK_SEPARATOR) if html else [])
+                self._finish(generation, markdown_text, profile, start, cached=True)
+                return
+        
+        if len(markdown_text) >= self.stream_threshold:
+            if self._render_stream(generation, markdown_text, profile, cache_key):
+                self._finish(generation, markdown_text, profile, start, streamed=True)
+            return
+        
+        blocks = self.processor.markdown_to_html_blocks(markdown_text, profile)
+        
+        # Conversion errors come back as an error paragraph, not worth keeping;
+        # documents without content render to no blocks at all
+        if cache_key is not None and not (blocks and blocks[0].startswith("<p>Error processing markdown:")):
+            self.render_cache.put(cache_key, CACHED_BLOCK_SEPARATOR.join(blocks))
+        
+        if generation == self.latest_generation:
+            self.rendered.emit(generation, blocks)
+        self._finish(generation, markdown_text, profile, start)
+    
+    def _finish(self, generation, markdown_text, profile, start, cached=False, streamed=False):
+        """Emit the timing of a completed render."""
+        self.render_finished.emit(generation, {
+            'profile': profile,
+            'characters': len(markdown_text),
+            'seconds': time.perf_counter() - start,
+            'cached': cached,
+            'streamed': streamed,
+        })
+    
+    def _render_stream(self, generation, markdown_text, profile='full', cache_key=None) -> bool:
+        """
+        Emit a large document a group of blocks at a time until it goes stale.
+        
+        Returns:
+            True if the whole document was rendered
+        """
+        self.stream_started.emit(generation)
+        blocks = [] if cache_key is not None else None
+        
+        try:
+            for group in self.processor.iter_html_blocks(markdown_text, self.section_size, profile):
+                if generation != self.latest_generation:
+                    return False
+                self.section_rendered.emit(generation, group)
+                if blocks is not None:
+                    blocks.extend(group)
+        except Exception as e:
+            if generation == self.latest_generation:
+                self.section_rendered.emit(generation, [f"<p>Error processing markdown: {str(e)}</p>"])
+                self.stream_finished.emit(generation)
+            return True
+        
+        if blocks is not None:
+            self.render_cache.put(cache_key, CACHED_BLOCK_SEPARATOR.join(blocks))
+        
+        if generation == self.latest_generation:
+            self.stream_finished.emit(generation)
+        return True
+
+
+class PreviewRenderer(QObject):
+    """
+    Owns the render thread and hands out generation numbers for requests.
+    """
+    
+    # Signals
+    rendered = pyqtSignal(int, list)  # generation, html of each block
+    stream_started = pyqtSignal(int)  # generation
+    section_rendered = pyqtSignal(int, list)  # generation, html of some blocks
+    stream_finished = pyqtSignal(int)  # generation
+    render_finished = pyqtSignal(int, dict)  # generation, timing
+    
+    def __init__(self, processor, parent=None, render_cache=None):
+        """
+        Initialize the preview renderer and start its thread.
+        
+        Args:
+            processor: MarkdownProcessor used for conversion
+            parent: Parent QObject
+            render_cache: RenderCache for documents that are opened again
+        """
+        super().__init__(parent)
+        
+        self.generation = 0
+        
+        self.thread = QThread()
+        self.thread.setObjectName("PreviewRenderThread")
+        self.worker = RenderWorker(processor, render_cache=render_cache)
+        self.worker.moveToThread(self.thread)
+        self.worker.rendered.connect(self._on_rendered)
+        self.worker.stream_started.connect(self._on_stream_started)
+        self.worker.section_rendered.connect(self._on_section_rendered)
+        self.worker.stream_finished.connect(self._on_stream_finished)
+        # Forwarded for every render, stale ones included
+        self.worker.render_finished.connect(self.render_finished)
+        self.thread.start()
+    
+    def request_render(self, markdown_text: str, cacheable: bool = False, profile: str = 'full') -> int:
+        """
+        Queue markdown text for rendering, superseding earlier requests.
+        
+        Args:
+            markdown_text: The markdown content to render
+            cacheable: Whether to use the render cache, for opened documents
+            profile: Name of the processor's render profile
+            
+        Returns:
+            Generation number of the request
+        """
+        self.generation += 1
+        self.worker.latest_generation = self.generation
+        self.worker.render_requested.emit(self.generation, markdown_text, cacheable, profile)
+        return self.generation
+    
+    def is_current(self, generation: int) -> bool:
+        """
+        Check if a generation is the latest one requested.
+        
+        Args:
+            generation: Generation number of a render
+            
+        Returns:
+            True if no newer render has been requested
+        """
+        return generation == self.generation
+    
+    @pyqtSlot(int, list)
+    def _on_rendered(self, generation, blocks):
+        """Forward results that are still current."""
+        if self.is_current(generation):
+            self.rendered.emit(generation, blocks)
+    
+    @pyqtSlot(int)
+    def _on_stream_started(self, generation):
+        """Forward the start of a stream that is still current."""
+        if self.is_current(generation):
+            self.stream_started.emit(generation)
+    
+    @pyqtSlot(int, list)
+    def _on_section_rendered(self, generation, blocks):
+        """Forward sections of a stream that is still current."""
+        if self.is_current(generation):
+            self.section_rendered.emit(generation, blocks)
+    
+    @pyqtSlot(int)
+    def _on_stream_finished(self, generation):
+        """Forward the end of a stream that is still current."""
+        if self.is_current(generation):
+            self.stream_finished.emit(generation)
+    
+    def shutdown(self) -> None:
+        """Stop the render thread, dropping pending requests."""
+        self.worker.latest_generation = -1
+        self.thread.quit()
+        self.thread.wait()
@@ -0,0 +1,318 @@
+"""
+Reading and writing text files in their own encoding and line endings.
+"""
+
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import re
+import shutil
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bytes read or characters written between progress reports
+CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a file the encoding and line endings are detected from
+SNIFF_SIZE = 64 * 1024
+
+# Format of new files; files are read and saved in the format they had
+DEFAULT_FORMAT = {'encoding': 'utf-8', 'bom': False, 'newline': os.linesep}
+
+# Byte order marks, longest first since UTF-32 LE starts like UTF-16 LE
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+# Encodings tried when a file isn't UTF-8; Latin-1 decodes any bytes
+LEGACY_ENCODING = 'cp1252'
+FALLBACK_ENCODING = 'latin-1'
+
+# Encoding content is saved in when its own encoding can't represent it
+SAVE_FALLBACK_ENCODING = 'utf-8'
+
+ENCODING_NAMES = {
+    'utf-8': "UTF-8",
+    'utf-16-le': "UTF-16 LE",
+    'utf-16-be': "UTF-16 BE",
+    'utf-32-le': "UTF-32 LE",
+    'utf-32-be': "UTF-32 BE",
+    'cp1252': "Windows-1252",
+    'latin-1': "ISO-8859-1",
+}
+NEWLINE_NAMES = {'\n': "LF", '\r\n': "CRLF", '\r': "CR"}
+
+NEWLINE_PATTERN = re.compile('\r\n|\r|\n')
+
+
+def _new_hasher():
+    """Create the hash object of content_hash()."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_hash(content: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Hash the content of a document.
+    
+    Args:
+        content: Document content
+        chunk_size: Characters encoded at a time
+        
+    Returns:
+        Hex digest of the UTF-8 encoded content
+    """
+    hasher = _new_hasher()
+    for start in range(0, len(content), chunk_size):
+        hasher.update(content[start:start + chunk_size].encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def detect_format(prefix: bytes) -> Dict[str, Any]:
+    """
+    Detect the format of a text file from its first bytes.
+    
+    Args:
+        prefix: Start of the file
+        
+    Returns:
+        Dictionary with the 'encoding', whether the file starts with a byte
+        order mark ('bom') and its line ending ('newline')
+    """
+    encoding, bom = None, False
+    for mark, name in BYTE_ORDER_MARKS:
+        if prefix.startswith(mark):
+            encoding, bom = name, True
+            prefix = prefix[len(mark):]
+            break
+    
+    if encoding is None:
+        encoding = _sniff_encoding(prefix)
+    
+    # The prefix may end inside a character
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(prefix)
+    match = NEWLINE_PATTERN.search(text)
+    newline = match.group() if match else DEFAULT_FORMAT['newline']
+    
+    return {'encoding': encoding, 'bom': bom, 'newline': newline}
+
+
+def _sniff_encoding(prefix: bytes) -> str:
+    """Guess the encoding of a file without a byte order mark."""
+    # ASCII text in UTF-16 has a zero byte in every other position
+    sample = prefix[:4096]
+    pairs = len(sample) // 2
+    if pairs:
+        if sample[1::2].count(0) > pairs * 0.3 and sample[0::2].count(0) < pairs * 0.05:
+            return 'utf-16-le'
+        if sample[0::2].count(0) > pairs * 0.3 and sample[1::2].count(0) < pairs * 0.05:
+            return 'utf-16-be'
+    
+    for encoding in ('utf-8', LEGACY_ENCODING):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(prefix)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    return FALLBACK_ENCODING
+
+
+def describe_format(file_format: Dict[str, Any]) -> str:
+    """
+    Describe a file format for display.
+    
+    Args:
+        file_format: Format returned by detect_format()
+        
+    Returns:
+        Encoding name, followed by the line ending unless it is LF
+    """
+    encoding = file_format['encoding']
+    description = ENCODING_NAMES.get(encoding, encoding.upper())
+    if file_format['bom']:
+        description += " BOM"
+    newline = file_format['newline']
+    if newline != '\n':
+        description += f" · {NEWLINE_NAMES.get(newline, repr(newline))}"
+    return description
+
+
+def read_text(filepath: str, chunk_size: int = CHUNK_SIZE,
+              progress: Optional[Callable[[int, int], None]] = None) -> Tuple[str, Dict[str, Any], str]:
+    """
+    Read a text file in whatever encoding it has.
+    
+    The file is memory-mapped, so it is never copied whole into a bytes
+    object. UTF-8 files with "\\n" line endings are decoded straight into
+    the content; other files are decoded a chunk at a time, translating
+    line endings to "\\n". The format records the original encoding and
+    line endings for write_atomic().
+    
+    Args:
+        filepath: Path of the file to read
+        chunk_size: Bytes decoded at a time
+        progress: Called with the bytes decoded and the total after each
+            chunk; an exception it raises stops the read
+            
+    Returns:
+        Tuple of (content, file format, content hash)
+    """
+    with open(filepath, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return "", dict(DEFAULT_FORMAT), content_hash("")
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = memoryview(mapped)
+            try:
+                file_format = detect_format(bytes(data[:SNIFF_SIZE]))
+                try:
+                    if file_format['encoding'] == 'utf-8' and mapped.find(b'\r') == -1:
+                        content, new_hash = _decode_utf8(data, file_format, chunk_size, progress)
+                    else:
+                        content, new_hash = _decode(data, file_format, chunk_size, progress)
+                except UnicodeDecodeError:
+                    # The start of the file decoded, but the rest doesn't
+                    file_format = dict(file_format, encoding=FALLBACK_ENCODING, bom=False)
+                    content, new_hash = _decode(data, file_format, chunk_size, progress)
+            finally:
+                data.release()
+    
+    return content, file_format, new_hash
+
+
+def _content_start(file_format: Dict[str, Any]) -> int:
+    """Get the offset of the content, after the byte order mark."""
+    if not file_format['bom']:
+        return 0
+    return next(len(mark) for mark, name in BYTE_ORDER_MARKS if name == file_format['encoding'])
+
+
+def _decode_utf8(data: memoryview, file_format: Dict[str, Any], chunk_size: int,
+                 progress: Optional[Callable[[int, int], None]]) -> Tuple[str, str]:
+    """Decode mapped UTF-8 data that needs no line ending translation, returning the content and its hash."""
+    start = _content_start(file_format)
+    total = len(data)
+    
+    # The data is the UTF-8 encoding of the content, so it is hashed as is
+    hasher = _new_hasher()
+    for offset in range(start, total, chunk_size):
+        with data[offset:offset + chunk_size] as chunk:
+            hasher.update(chunk)
+        if progress is not None:
+            progress(min(offset + chunk_size, total), total)
+    
+    # Decoded in one go, so there is a single copy of the content
+    with data[start:] as content_data:
+        content = str(content_data, 'utf-8')
+    return content, hasher.hexdigest()
+
+
+def _decode(data: memoryview, file_format: Dict[str, Any], chunk_size: int,
+            progress: Optional[Callable[[int, int], None]]) -> Tuple[str, str]:
+    """Decode mapped file data a chunk at a time, returning the content and its hash."""
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(file_format['encoding'])(), translate=True)
+    hasher = _new_hasher()
+    parts = []
+    total = len(data)
+    
+    for offset in range(_content_start(file_format), total, chunk_size):
+        with data[offset:offset + chunk_size] as chunk:
+            parts.append(decoder.decode(chunk))
+        hasher.update(parts[-1].encode('utf-8'))
+        if progress is not None:
+            progress(min(offset + chunk_size, total), total)
+    
+    parts.append(decoder.decode(b'', final=True))
+    hasher.update(parts[-1].encode('utf-8'))
+    return ''.join(parts), hasher.hexdigest()
+
+
+def write_atomic(filepath: str, content: str, file_format: Optional[Dict[str, Any]] = None, tag: str = "save",
+                 chunk_size: int = CHUNK_SIZE,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Write a file through a temporary file in the same directory.
+    
+    The temporary file is flushed to disk before it replaces the target, so
+    the target holds either its old or its new content whenever writing
+    stops. The temporary file is removed if writing fails. A symbolic link
+    is followed, so the file it points to gets the new content.
+    
+    Content with characters the encoding can't represent, such as an emoji
+    in a Windows-1252 file, is written as UTF-8 instead, keeping the line
+    endings.
+    
+    Args:
+        filepath: Path of the file to write
+        content: Content to write, with "\\n" line endings
+        file_format: Encoding, byte order mark and line ending to write
+            (if None, uses DEFAULT_FORMAT)
+        tag: Part of the temporary file name, to tell concurrent writes apart
+        chunk_size: Characters written at a time
+        progress: Called with the characters written and the total after
+            each chunk; an exception it raises stops the write
+            
+    Returns:
+        Format the file was written in
+    """
+    file_format = file_format or DEFAULT_FORMAT
+    # Replace the file a symbolic link points to rather than the link
+    filepath = os.path.realpath(filepath)
+    directory, name = os.path.split(filepath)
+    temporary = os.path.join(directory, f".{name}.{tag}.tmp")
+    
+    try:
+        try:
+            _write_file(temporary, content, file_format, chunk_size, progress)
+        except UnicodeEncodeError:
+            if file_format['encoding'] == SAVE_FALLBACK_ENCODING:
+                raise
+            file_format = dict(file_format, encoding=SAVE_FALLBACK_ENCODING, bom=False)
+            _write_file(temporary, content, file_format, chunk_size, progress)
+        
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, temporary)
+        os.replace(temporary, filepath)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+    
+    _sync_directory(directory)
+    return file_format
+
+
+def _write_file(filepath: str, content: str, file_format: Dict[str, Any], chunk_size: int,
+                progress: Optional[Callable[[int, int], None]]) -> None:
+    """Write content in a format and flush it to disk."""
+    total = len(content)
+    with open(filepath, 'w', encoding=file_format['encoding'], newline=file_format['newline']) as file:
+        if file_format['bom']:
+            file.write('\ufeff')
+        for start in range(0, total, chunk_size):
+            file.write(content[start:start + chunk_size])
+            if progress is not None:
+                progress(min(start + chunk_size, total), total)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _sync_directory(directory: str) -> None:
+    """Flush a rename in a directory to disk, where the platform allows it."""
+    try:
+        descriptor = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,102 @@
+"""
+Incrementally maintained word and character statistics of a document.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+# Average silent reading speed, in words per minute
+READING_SPEED = 200
+
+
+def _line_statistics(line: str) -> Tuple[int, int, int]:
+    """
+    Count the words and characters of a line.
+    
+    Args:
+        line: Line without its line ending
+        
+    Returns:
+        (words, characters, characters other than whitespace) tuple
+    """
+    words = line.split()
+    return len(words), len(line), sum(map(len, words))
+
+
+class TextStatistics:
+    """
+    Word and character counts, kept per line of the document.
+    
+    Words never span lines, so the totals are the sums of the line counts.
+    Edits replace a range of lines; only the lines in that range are counted
+    again, and the running totals are adjusted by the difference.
+    """
+    
+    def __init__(self, text: str = ""):
+        """
+        Initialize the statistics.
+        
+        Args:
+            text: Initial document text
+        """
+        self._lines = []  # Statistics of every line
+        self._words = 0
+        self._characters = 0
+        self._non_space_characters = 0
+        
+        self.reset(text)
+    
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the counted document."""
+        return len(self._lines)
+    
+    def reset(self, text: str) -> None:
+        """
+        Count a whole document.
+        
+        Args:
+            text: Document text
+        """
+        self._lines = [_line_statistics(line) for line in text.split('\n')]
+        self._words = sum(line[0] for line in self._lines)
+        self._characters = sum(line[1] for line in self._lines)
+        self._non_space_characters = sum(line[2] for line in self._lines)
+    
+    def replace_lines(self, first: int, count: int, lines: List[str]) -> None:
+        """
+        Replace a range of lines by new lines.
+        
+        Args:
+            first: Number of the first replaced line, from 0
+            count: Number of replaced lines
+            lines: Text of the new lines, without line endings
+        """
+        new_lines = [_line_statistics(line) for line in lines]
+        
+        for words, characters, non_space in self._lines[first:first + count]:
+            self._words -= words
+            self._characters -= characters
+            self._non_space_characters -= non_space
+        for words, characters, non_space in new_lines:
+            self._words += words
+            self._characters += characters
+            self._non_space_characters += non_space
+        
+        self._lines[first:first + count] = new_lines
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the statistics of the document.
+        
+        Returns:
+            Dictionary with the number of words, characters (line breaks
+            included), characters other than whitespace, lines and the
+            reading time in minutes
+        """
+        return {
+            'words': self._words,
+            'characters': self._characters + max(0, len(self._lines) - 1),
+            'characters_no_spaces': self._non_space_characters,
+            'lines': len(self._lines),
+            'reading_minutes': self._words / READING_SPEED,
+        }
@@ -13,9 +13,304 @@ from PyQt6.QtGui import (
     QKeySequence, QTextDocument, QTextBlockFormat, QTextListFormat,
     QPixmap, QPainter, QDesktopServices
 )
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+import json
 import re
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, List
+
+from ..core.document_markdown import DocumentMarkdownWriter
+from ..core.html_export import DOCUMENT_CSS, HtmlTemplate, get_theme_css
+from ..core.heading_index import HeadingIndex
+from ..core.render_scheduler import RenderScheduler
+from ..core.render_worker import PreviewRenderer
+from ..core.text_statistics import TextStatistics
+
+# Characters outside the Basic Multilingual Plane, two UTF-16 units in Qt
+ASTRAL_CHARACTER = re.compile('[\U00010000-\U0010FFFF]')
+
+# Large file mode: documents from this many characters are loaded in chunks
+# into the raw editor only, and the preview shows the section at the cursor
+LARGE_FILE_SIZE = 8 * 1024 * 1024
+LARGE_FILE_CHUNK_SIZE = 256 * 1024
+LARGE_FILE_PREVIEW_SIZE = 256 * 1024
+
+# Approximate amount of HTML inserted into the preview per script
+PREVIEW_SCRIPT_SIZE = 512 * 1024
+
+# Applies block patches to the preview page; blocks are wrappers around the
+# HTML of each top-level markdown block, keyed by a hash of that HTML
+PREVIEW_SCRIPT = """
+function previewPatch(position, removed, blocks) {
+    var root = document.getElementById('preview-root');
+    var next = root.children[position + removed] || null;
+    for (var i = 0; i < removed; i++) {
+        root.removeChild(root.children[position]);
+    }
+    var inserted = [];
+    for (var j = 0; j < blocks.length; j++) {
+        var block = document.createElement('div');
+        block.className = 'md-block';
+        block.dataset.key = blocks[j][0];
+        block.innerHTML = blocks[j][1];
+        root.insertBefore(block, next);
+        inserted.push(block);
+    }
+    if (window.mermaid) {
+        var diagrams = [];
+        inserted.forEach(function (block) {
+            diagrams.push.apply(diagrams, block.querySelectorAll('.mermaid'));
+        });
+        if (diagrams.length) {
+            window.mermaid.run({nodes: diagrams});
+        }
+    }
+}
+
+function previewSetTheme(css) {
+    document.getElementById('theme-style').textContent = css;
+}
+"""
+
+# The preview page: styles and scripts are loaded once, blocks are patched in
+PREVIEW_TEMPLATE = HtmlTemplate("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>{{style}}
+.md-block { display: contents; }
+    </style>
+    <style id="theme-style">{{theme_style}}</style>
+    <script>{{script}}</script>
+</head>
+<body>
+    <div id="preview-root">{{body}}</div>
+</body>
+</html>""", style=DOCUMENT_CSS, script=PREVIEW_SCRIPT)
+
+
+def _split_chunks(text: str, size: int):
+    """
+    Split a text into chunks of about a given size.
+    
+    A chunk ends after the first line break within another size past its
+    minimum size. Longer lines are split too, into chunks at least as long
+    as the part of the line before them: the editor lays out the whole line
+    again for every insert, so the number of inserts into one line is kept
+    logarithmic in its length.
+    
+    Args:
+        text: Text to split
+        size: Minimum chunk size, except for the last chunk
+        
+    Yields:
+        Consecutive chunks of the text
+    """
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start + size, start + 2 * size)
+        if end == -1:
+            line_start = text.rfind('\n', 0, start) + 1
+            end = min(start + max(size, start - line_start), len(text))
+        else:
+            end += 1
+        yield text[start:end]
+        start = end
+
+
+def _common_length(same, limit: int) -> int:
+    """
+    Find the length of the common start of two sequences.
+    
+    The compared length grows until the parts differ and is then bisected;
+    only the part beyond the known common length is compared each time, so
+    the cost is a memory comparison of the common part.
+    
+    Args:
+        same: Function telling if the parts of the sequences from low to
+            high (exclusive) are equal
+        limit: Length of the shorter sequence
+        
+    Returns:
+        Length of the common start
+    """
+    low, size = 0, 64
+    while size <= limit and same(low, size):
+        low, size = size, size * 2
+    high = min(size, limit + 1)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if same(low, middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _changed_span(old: str, new: str) -> tuple:
+    """
+    Find the part of a text that an edit replaced.
+    
+    The common prefix and suffix are found with _common_length(), so the
+    cost is a memory comparison of the unchanged text.
+    
+    Args:
+        old: Text before the edit
+        new: Text after the edit
+        
+    Returns:
+        (start, old_end, new_end) tuple: old[start:old_end] was replaced by
+        new[start:new_end]
+    """
+    limit = min(len(old), len(new))
+    start = _common_length(lambda low, high: old[low:high] == new[low:high], limit)
+    
+    old_length, new_length = len(old), len(new)
+    end = _common_length(
+        lambda low, high: old[old_length - high:old_length - low] == new[new_length - high:new_length - low],
+        limit - start
+    )
+    return start, old_length - end, new_length - end
+
+
+def _diff_lines(old: str, new: str) -> List[tuple]:
+    """
+    Find the runs of lines that differ between two texts.
+    
+    The common prefix and suffix are skipped with _changed_span(); the lines
+    between them are compared with _diff_block_keys().
+    
+    Args:
+        old: Text before the change
+        new: Text after the change
+        
+    Returns:
+        List of (first, last, lines) tuples in text order: the lines of old
+        from first to last (exclusive) are replaced by lines
+    """
+    start, old_end, new_end = _changed_span(old, new)
+    if start == old_end == new_end:
+        return []
+    
+    # The changed text spans whole lines, counted from both ends
+    first = old.count('\n', 0, start)
+    old_lines = old.split('\n')
+    new_lines = new.split('\n')
+    old_last = len(old_lines) - old.count('\n', old_end)
+    new_last = len(new_lines) - new.count('\n', new_end)
+    
+    runs = []
+    shift = first  # Old line number minus the position in the middle of new
+    for position, removed, end in _diff_block_keys(old_lines[first:old_last], new_lines[first:new_last]):
+        old_first = position + shift
+        runs.append((old_first, old_first + removed, new_lines[first + position:first + end]))
+        shift += removed - (end - position)
+    return runs
+
+
+def _replace_lines(document: QTextDocument, hunks: List[tuple]):
+    """
+    Replace runs of lines of a plain text document as a single undo step.
+    
+    Args:
+        document: Document with a block per line
+        hunks: (first, last, lines) tuples in text order, as returned by
+            _diff_lines() for the document's text
+    """
+    line_count = document.blockCount()
+    
+    def line_start(line):
+        # One past the end of the text for the line after the last
+        if line == line_count:
+            return document.characterCount()
+        return document.findBlockByNumber(line).position()
+    
+    cursor = QTextCursor(document)
+    # Later runs first, so the positions of earlier ones don't move
+    for index, (first, last, lines) in enumerate(reversed(hunks)):
+        if last < line_count:
+            start, end = line_start(first), line_start(last)
+            text = "".join(line + '\n' for line in lines)
+        elif first > 0:
+            # Through the end: take the line break before the run instead
+            start, end = line_start(first) - 1, document.characterCount() - 1
+            text = "".join('\n' + line for line in lines)
+        else:
+            start, end = 0, document.characterCount() - 1
+            text = '\n'.join(lines)
+        
+        # One undo step, but a change notification per run: a single
+        # edit block would report everything between the runs as changed
+        if index == 0:
+            cursor.beginEditBlock()
+        else:
+            cursor.joinPreviousEditBlock()
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(text)
+        cursor.endEditBlock()
+
+
+def _diff_block_keys(old_keys: List[str], keys: List[str], window: int = 64) -> List[tuple]:
+    """
+    Find the runs of blocks to replace to turn one list of blocks into another.
+    
+    Runs of equal keys are skipped with _common_length(). Where the lists
+    differ they are resynchronized on the nearest key they share within a
+    window, so the cost stays linear in the number of blocks however many of
+    them changed.
+    
+    Args:
+        old_keys: Keys of the current blocks
+        keys: Keys of the new blocks
+        window: How far ahead to look for a shared key
+        
+    Returns:
+        List of (position, removed, end) tuples, applied in order: at
+        position, remove that many blocks and insert new blocks up to end
+    """
+    patches = []
+    old_index = index = 0
+    while True:
+        same = _common_length(
+            lambda low, high: old_keys[old_index + low:old_index + high] == keys[index + low:index + high],
+            min(len(old_keys) - old_index, len(keys) - index)
+        )
+        old_index += same
+        index += same
+        if old_index == len(old_keys) and index == len(keys):
+            break
+        
+        # First position of each key in the window ahead in the old list
+        positions = {}
+        for old_position in range(old_index, min(len(old_keys), old_index + window)):
+            positions.setdefault(old_keys[old_position], old_position)
+        
+        # The closest pair of equal keys ahead in both lists
+        best = None
+        for offset in range(min(window, len(keys) - index)):
+            if best is not None and offset >= best[0]:
+                break
+            candidate = positions.get(keys[index + offset])
+            if candidate is not None:
+                cost = offset + candidate - old_index
+                if best is None or cost < best[0]:
+                    best = (cost, candidate, index + offset)
+        
+        if best is None:
+            # Nothing shared nearby: replace a window's worth of blocks
+            old_end = min(len(old_keys), old_index + window)
+            end = min(len(keys), index + window)
+        else:
+            old_end, end = best[1], best[2]
+        
+        if patches and patches[-1][2] == index:
+            position, removed, _ = patches.pop()
+            patches.append((position, removed + old_end - old_index, end))
+        else:
+            patches.append((index, old_end - old_index, end))
+        old_index, index = old_end, end
+    
+    return patches
 
 
 class MarkdownEditorWidget(QWidget):
@@ -24,28 +319,95 @@ class MarkdownEditorWidget(QWidget):
     """
     
     # Signals
-    content_changed = pyqtSignal(str)  # markdown content
+    content_changed = pyqtSignal()  # content was edited, get_content() returns it
     formatting_changed = pyqtSignal()
     cursor_position_changed = pyqtSignal(int, int)  # line, column
+    headings_changed = pyqtSignal(list)  # headings of the raw markdown
+    load_progress = pyqtSignal(int, int)  # loaded characters, total characters
+    lines_edited = pyqtSignal(int, int, object)  # first line, replaced line count, new lines
     
     def __init__(self, parent=None):
         """Initialize the editor widget."""
         super().__init__(parent)
         
         self.markdown_processor = None  # Will be set by parent
-        self.current_content = ""
+        self.preview_renderer = None  # Created with the processor
+        self.render_cache = None  # Renders of opened documents, set by parent
+        self.content_loaded = False  # Content was just set, its render may be cached
+        self.preview_keys = None  # Keys of the blocks in the preview page, None before it loads
+        self.stream_blocks = None  # Blocks of a stream, collected to patch the page once
+        self.pending_scripts = []  # Patches waiting for the page to load
+        self.preview_page_loading = False
+        self.preview_theme = "light"
+        self._current_content = ""
+        self.content_stale = False  # Raw edits not read back into current_content yet
         self.is_updating = False
-        
-        # Timer for delayed content processing
+        self.replacing_content = False  # set_content() is running, its changes aren't edits
+        self.rich_stale = False  # Raw edits not copied to the hidden rich editor yet
+        
+        # Timer for reading edits back into the current content
+        self.edited_editor = None  # Editor with edits not in current_content yet
+        self.content_timer = QTimer()
+        self.content_timer.setSingleShot(True)
+        self.content_timer.timeout.connect(self._flush_content)
+        self.content_timer.setInterval(100)
+        
+        # Render delays follow the measured render cost
+        self.render_scheduler = RenderScheduler()
+        self.pending_render = None  # Profile held back until the running render finishes
+        
+        # Timer for delayed content processing, rendering a draft
+        self.draft_profile = 'draft'  # None renders full quality while typing
         self.update_timer = QTimer()
         self.update_timer.setSingleShot(True)
-        self.update_timer.timeout.connect(self._process_content)
-        self.update_timer.setInterval(500)  # 500ms delay
+        self.update_timer.timeout.connect(self._process_draft_content)
+        
+        # Timer for the full quality render once typing pauses
+        self.full_render_delay = 1500  # Shortest idle time, longer for slow renders
+        self.full_render_timer = QTimer()
+        self.full_render_timer.setSingleShot(True)
+        self.full_render_timer.timeout.connect(self._process_content)
+        
+        # Large file mode, with chunked loading into the raw editor
+        self.large_file_mode = False
+        self.large_file_threshold = LARGE_FILE_SIZE
+        self.preview_section = None  # Lines shown in the preview in large file mode
+        self.load_chunks = None  # Chunks of a large file still to be inserted
+        self.load_line = []  # Parts of the last, unfinished line inserted
+        self.load_total = 0
+        self.load_done = 0
+        self.load_timer = QTimer()
+        self.load_timer.setSingleShot(True)
+        self.load_timer.timeout.connect(self._load_next_chunk)
+        
+        # Headings and word counts of the raw markdown, updated line by line as it changes
+        self.heading_index = HeadingIndex()
+        self.text_statistics = TextStatistics()
+        self.raw_character_count = 1
+        
+        # Timer for refreshing the outline
+        self.outline_timer = QTimer()
+        self.outline_timer.setSingleShot(True)
+        self.outline_timer.timeout.connect(self._update_outline)
+        self.outline_timer.setInterval(200)
         
         self._setup_ui()
         self._setup_connections()
         self._setup_formatting()
     
+    @property
+    def current_content(self) -> str:
+        """Markdown content, read back from the raw editor after raw edits."""
+        if self.content_stale:
+            self._current_content = self.raw_editor.toPlainText()
+            self.content_stale = False
+        return self._current_content
+    
+    @current_content.setter
+    def current_content(self, content: str):
+        self._current_content = content
+        self.content_stale = False
+    
     def _setup_ui(self):
         """Setup the user interface."""
         layout = QVBoxLayout(self)
@@ -66,6 +428,7 @@ class MarkdownEditorWidget(QWidget):
         self.rich_editor = QTextEdit()
         self.rich_editor.setAcceptRichText(True)
         self.rich_editor.setPlaceholderText("Start typing your markdown content...")
+        self.rich_markdown_writer = DocumentMarkdownWriter(self.rich_editor.document())
         self.tab_widget.addTab(self.rich_editor, "Rich Text")
         
         # Raw markdown editor tab
@@ -77,10 +440,12 @@ class MarkdownEditorWidget(QWidget):
         # Add editor to splitter
         self.splitter.addWidget(self.tab_widget)
         
-        # Create preview widget
-        self.preview = QWebEngineView()
-        self.preview.setMinimumWidth(300)
-        self.splitter.addWidget(self.preview)
+        # Preview widget, replaced by the web view once it is loaded
+        self.preview = None
+        self.preview_placeholder = QLabel("Loading preview...")
+        self.preview_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_placeholder.setMinimumWidth(300)
+        self.splitter.addWidget(self.preview_placeholder)
         
         # Set splitter proportions
         self.splitter.setSizes([500, 500])
@@ -189,6 +554,7 @@ class MarkdownEditorWidget(QWidget):
         # Raw editor connections
         self.raw_editor.textChanged.connect(self._on_raw_text_changed)
         self.raw_editor.cursorPositionChanged.connect(self._on_cursor_changed)
+        self.raw_editor.document().contentsChange.connect(self._on_raw_contents_change)
         
         # Tab change
         self.tab_widget.currentChanged.connect(self._on_tab_changed)
@@ -223,70 +589,143 @@ class MarkdownEditorWidget(QWidget):
         if self.is_updating:
             return
         
-        self.is_updating = True
-        
-        # Convert rich text to markdown
-        html = self.rich_editor.toHtml()
-        markdown = self._html_to_markdown(html)
-        
-        # Update raw editor
-        self.raw_editor.setPlainText(markdown)
-        
-        # Update current content
-        self.current_content = markdown
+        # Converted to markdown once typing pauses, not on every keystroke
+        self.edited_editor = self.rich_editor
+        self.content_timer.start()
         
         # Update preview
-        self.update_timer.start()
-        
-        # Update word count
-        self._update_word_count()
-        
-        # Emit signal
-        self.content_changed.emit(markdown)
-        
-        self.is_updating = False
+        self._schedule_render()
     
     def _on_raw_text_changed(self):
         """Handle raw text changes."""
         if self.is_updating:
             return
         
-        self.is_updating = True
-        
-        # Get markdown content
-        markdown = self.raw_editor.toPlainText()
+        # Read back once typing pauses, not on every keystroke
+        self.edited_editor = self.raw_editor
+        self.content_timer.start()
         
-        # Update current content
-        self.current_content = markdown
+        # Update preview
+        self._schedule_render()
+    
+    def _flush_content(self):
+        """Update the current content from the editor that was edited."""
+        self.content_timer.stop()
+        editor, self.edited_editor = self.edited_editor, None
+        if editor is None:
+            return
         
-        # Update rich editor (simplified - just set as plain text for now)
-        # In a production app, you'd want more sophisticated markdown-to-rich-text conversion
-        self.rich_editor.setPlainText(markdown)
+        self.is_updating = True
         
-        # Update preview
-        self.update_timer.start()
+        if editor is self.rich_editor:
+            # Convert rich text to markdown, reusing the blocks that didn't change
+            markdown = self.rich_markdown_writer.to_markdown()
+            
+            # Update raw editor, replacing only the edited text so its heading
+            # index and layout are updated incrementally
+            self._sync_raw_editor(markdown)
+            self.current_content = markdown
+        else:
+            # Copying a large document out of the editor is slow; it is only
+            # done once the content is needed
+            self.content_stale = True
+            
+            # The rich editor is hidden while the raw one is edited; it is
+            # updated once it is shown instead of being rebuilt for each edit
+            if self.tab_widget.currentIndex() == 0:
+                self._sync_rich_editor()
+            else:
+                self.rich_stale = True
         
         # Update word count
         self._update_word_count()
         
         # Emit signal
-        self.content_changed.emit(markdown)
+        self.content_changed.emit()
         
         self.is_updating = False
     
+    def _sync_raw_editor(self, markdown: str):
+        """
+        Replace the text of the raw editor where it differs from markdown.
+        
+        Args:
+            markdown: New content of the raw editor
+        """
+        text = self.raw_editor.toPlainText()
+        start, old_end, new_end = _changed_span(text, markdown)
+        if start == old_end == new_end:
+            return
+        
+        # Document positions count UTF-16 code units
+        astral = len(ASTRAL_CHARACTER.findall(text, 0, start))
+        removed = len(ASTRAL_CHARACTER.findall(text, start, old_end))
+        
+        cursor = QTextCursor(self.raw_editor.document())
+        cursor.setPosition(start + astral)
+        cursor.setPosition(old_end + astral + removed, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(markdown[start:new_end])
+    
+    def _sync_rich_editor(self):
+        """Show the current content in the rich editor (simplified: as plain text)."""
+        # In a production app, you'd want more sophisticated markdown-to-rich-text conversion
+        updating, self.is_updating = self.is_updating, True
+        self.rich_editor.setPlainText(self.current_content)
+        self.rich_stale = False
+        self.is_updating = updating
+    
+    def _on_raw_contents_change(self, position, chars_removed, chars_added):
+        """Rescan and recount the lines of the raw markdown that an edit touched."""
+        document = self.raw_editor.document()
+        character_count = document.characterCount()
+        expected_count = self.raw_character_count - chars_removed + chars_added
+        self.raw_character_count = character_count
+        
+        # Chunks of a large file are indexed from their text as they are loaded
+        if self.load_chunks is not None:
+            return
+        
+        first = document.findBlock(position)
+        last = document.findBlock(position + chars_added)
+        if not last.isValid():
+            last = document.lastBlock()
+        
+        new_lines = last.blockNumber() - first.blockNumber() + 1
+        old_lines = new_lines - (document.blockCount() - self.heading_index.line_count)
+        
+        if expected_count != character_count or not first.isValid() or old_lines < 1:
+            # setPlainText() and clear() report changes that don't add up
+            text = document.toPlainText()
+            if not self.replacing_content:
+                self.lines_edited.emit(0, self.heading_index.line_count, text.split('\n'))
+            self.heading_index.reset(text)
+            self.text_statistics.reset(text)
+        else:
+            lines = []
+            block = first
+            while block.isValid():
+                lines.append(block.text())
+                if block == last:
+                    break
+                block = block.next()
+            self.heading_index.replace_lines(first.blockNumber(), old_lines, lines)
+            self.text_statistics.replace_lines(first.blockNumber(), old_lines, lines)
+            if not self.replacing_content:
+                self.lines_edited.emit(first.blockNumber(), old_lines, lines)
+        
+        self.outline_timer.start()
+    
+    def _update_outline(self):
+        """Publish the current headings."""
+        self.headings_changed.emit(self.heading_index.headings())
+    
     def _on_tab_changed(self, index):
         """Handle tab change between rich and raw editors."""
-        if index == 0:  # Rich text tab
-            # Sync from raw to rich
-            if not self.is_updating:
-                markdown = self.raw_editor.toPlainText()
-                self.rich_editor.setPlainText(markdown)
-        else:  # Raw text tab
-            # Sync from rich to raw
-            if not self.is_updating:
-                html = self.rich_editor.toHtml()
-                markdown = self._html_to_markdown(html)
-                self.raw_editor.setPlainText(markdown)
+        # The raw editor follows rich edits once they are read back; the rich
+        # editor catches up with raw edits once it is shown
+        self._flush_content()
+        if index == 0 and self.rich_stale and not self.is_updating:
+            self._sync_rich_editor()
     
     def _on_cursor_changed(self):
         """Handle cursor position changes."""
@@ -304,6 +743,12 @@ class MarkdownEditorWidget(QWidget):
         # Update status
         self.cursor_label.setText(f"Line {line}, Column {column}")
         
+        # Show the section the cursor moved to
+        if self.large_file_mode and self.preview_section and self.load_chunks is None:
+            first, end = self.preview_section
+            if not first <= line - 1 < end:
+                self._schedule_render()
+        
         # Emit signal
         self.cursor_position_changed.emit(line, column)
     
@@ -327,109 +772,274 @@ class MarkdownEditorWidget(QWidget):
         
         self.formatting_changed.emit()
     
+    def _schedule_render(self):
+        """Render a draft shortly after an edit and the full preview once typing pauses."""
+        characters = self.raw_editor.document().characterCount() - 1
+        if self.large_file_mode:
+            characters = min(characters, LARGE_FILE_PREVIEW_SIZE)
+        self.update_timer.setInterval(self.render_scheduler.delay(characters, self.draft_profile or 'full'))
+        self.full_render_timer.setInterval(
+            max(self.full_render_delay, self.render_scheduler.delay(characters, 'full'))
+        )
+        self.update_timer.start()
+        self.full_render_timer.start()
+    
+    def set_full_render_delay(self, milliseconds: int):
+        """
+        Set how long typing has to pause before the full quality render.
+        
+        Args:
+            milliseconds: Idle time after the last edit
+        """
+        self.full_render_delay = max(0, milliseconds)
+    
+    def get_render_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the preview render scheduling.
+        
+        Returns:
+            Dictionary with the scheduler statistics and its recent decisions
+        """
+        return {
+            **self.render_scheduler.stats(),
+            'decisions': self.render_scheduler.recent_decisions(),
+        }
+    
+    def _process_draft_content(self):
+        """Queue a fast render of the current content while typing."""
+        if not self.draft_profile:
+            self._process_content()
+            return
+        
+        if self.preview_renderer:
+            self._request_render(self.draft_profile)
+    
     def _process_content(self):
-        """Process content for preview update."""
-        if self.markdown_processor:
-            html = self.markdown_processor.markdown_to_html(self.current_content)
+        """Queue the current content for a full quality render on the preview thread."""
+        self.update_timer.stop()
+        self.full_render_timer.stop()
+        if self.preview_renderer:
+            self._request_render('full', self.content_loaded)
+            self.content_loaded = False
+    
+    def _request_render(self, profile: str, cacheable: bool = False):
+        """
+        Render the current content, or once the render in progress finishes.
+        
+        Only one render is ever held back, and the content is read when it is
+        requested, so a slow render is followed by one of the latest text
+        instead of a queue of outdated ones.
+        
+        Args:
+            profile: Name of the processor's render profile
+            cacheable: Whether the content was just opened
+        """
+        # An opened document replaces whatever is rendering
+        if self.render_scheduler.busy and not cacheable:
+            if self.pending_render != 'full':
+                self.pending_render = profile
+            self.render_scheduler.render_deferred()
+            return
+        
+        self._flush_content()
+        self.pending_render = None
+        if self.large_file_mode:
+            text, cacheable = self._large_file_section(), False
+        else:
+            text = self.current_content
+        generation = self.preview_renderer.request_render(text, cacheable, profile)
+        self.render_scheduler.render_requested(generation)
+    
+    def _large_file_section(self) -> str:
+        """
+        Get the markdown of the heading section at the cursor, for large files.
+        
+        Sections longer than LARGE_FILE_PREVIEW_SIZE are cut down to the
+        lines around the cursor.
+        
+        Returns:
+            Markdown of the section
+        """
+        line = self.raw_editor.textCursor().blockNumber()
+        first, end = self.heading_index.section_range(line)
+        cursor_block = self.raw_editor.document().findBlockByNumber(line)
+        
+        # Up to half of the size before the cursor, the rest after it
+        before = []
+        size = 0
+        block = cursor_block.previous()
+        while block.isValid() and line - len(before) > first and size < LARGE_FILE_PREVIEW_SIZE // 2:
+            text = block.text()
+            before.append(text)
+            size += len(text) + 1
+            block = block.previous()
+        
+        after = []
+        block = cursor_block
+        while block.isValid() and line + len(after) < end and size < LARGE_FILE_PREVIEW_SIZE:
+            text = block.text()[:LARGE_FILE_PREVIEW_SIZE]
+            after.append(text)
+            size += len(text) + 1
+            block = block.next()
+        
+        self.preview_section = (line - len(before), line + len(after))
+        before.reverse()
+        return "\n".join(before + after)
+    
+    def _on_preview_render_finished(self, generation, timing):
+        """Record the cost of a render and start the one held back, if any."""
+        self.render_scheduler.render_finished(generation, timing)
+        if self.pending_render and not self.render_scheduler.busy and self.preview_renderer:
+            self._request_render(self.pending_render)
+    
+    def _on_preview_rendered(self, generation, blocks):
+        """Show a finished render in the preview."""
+        if self.preview and self.preview_renderer and self.preview_renderer.is_current(generation):
+            self.stream_blocks = None
+            start = time.perf_counter()
+            self._show_preview_blocks(blocks)
+            self.render_scheduler.record_apply(time.perf_counter() - start)
+    
+    def _on_preview_stream_started(self, generation):
+        """Prepare for the groups of blocks of a large document."""
+        if not (self.preview and self.preview_renderer and self.preview_renderer.is_current(generation)):
+            return
+        
+        if self.preview_keys is None:
+            # Nothing to patch yet: show the blocks as they arrive
+            self._load_preview_page()
+            self.stream_blocks = None
+        else:
+            # Collect the blocks and patch the page once
+            self.stream_blocks = []
+    
+    def _on_preview_section_rendered(self, generation, blocks):
+        """Append or collect a group of streamed blocks."""
+        if not (self.preview and self.preview_renderer and self.preview_renderer.is_current(generation)):
+            return
+        
+        if self.stream_blocks is not None:
+            self.stream_blocks.extend(blocks)
+        else:
+            self._patch_preview([(len(self.preview_keys), 0, blocks)])
+    
+    def _on_preview_stream_finished(self, generation):
+        """Patch the page with the collected blocks of a stream."""
+        if not (self.preview and self.preview_renderer and self.preview_renderer.is_current(generation)):
+            return
+        
+        if self.stream_blocks is not None:
+            blocks, self.stream_blocks = self.stream_blocks, None
+            start = time.perf_counter()
+            self._show_preview_blocks(blocks)
+            self.render_scheduler.record_apply(time.perf_counter() - start)
+    
+    def _show_preview_blocks(self, blocks: List[str]):
+        """
+        Update the preview to show a list of blocks.
+        
+        Blocks that didn't change are kept, with their scroll position and
+        script state; only the blocks that did are replaced.
+        
+        Args:
+            blocks: HTML of each block
+        """
+        if self.preview_keys is None:
+            self._load_preview_page()
+            self._patch_preview([(0, 0, blocks)])
+            return
+        
+        keys = [self._preview_block_key(html) for html in blocks]
+        self._patch_preview([
+            (position, removed, blocks[position:end])
+            for position, removed, end in _diff_block_keys(self.preview_keys, keys)
+        ])
+    
+    def _preview_block_key(self, html: str) -> str:
+        """Get the key of a block's HTML (string hashes are cached per string)."""
+        return format(hash(html) & 0xFFFFFFFFFFFFFFFF, 'x')
+    
+    def _patch_preview(self, patches: List[tuple]):
+        """
+        Replace blocks of the preview page.
+        
+        Args:
+            patches: (position, removed, blocks) tuples applied in order: the
+                index of the first replaced block, the number of blocks to
+                remove and the HTML of the blocks to insert in their place
+        """
+        calls = []
+        for position, removed, blocks in patches:
+            keys = [self._preview_block_key(html) for html in blocks]
+            self.preview_keys[position:position + removed] = keys
             
-            # Add CSS styling
-            styled_html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <style>
-                    body {{
-                        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                        line-height: 1.6;
-                        color: #333;
-                        max-width: 800px;
-                        margin: 0 auto;
-                        padding: 20px;
-                    }}
-                    h1, h2, h3, h4, h5, h6 {{
-                        color: #2c3e50;
-                        margin-top: 24px;
-                        margin-bottom: 16px;
-                    }}
-                    h1 {{ border-bottom: 2px solid #eee; padding-bottom: 10px; }}
-                    h2 {{ border-bottom: 1px solid #eee; padding-bottom: 8px; }}
-                    code {{
-                        background-color: #f4f4f4;
-                        padding: 2px 4px;
-                        border-radius: 3px;
-                        font-family: 'Consolas', 'Monaco', monospace;
-                    }}
-                    pre {{
-                        background-color: #f4f4f4;
-                        padding: 16px;
-                        border-radius: 6px;
-                        overflow-x: auto;
-                    }}
-                    blockquote {{
-                        border-left: 4px solid #ddd;
-                        margin: 0;
-                        padding-left: 16px;
-                        color: #666;
-                    }}
-                    table {{
-                        border-collapse: collapse;
-                        width: 100%;
-                        margin: 16px 0;
-                    }}
-                    th, td {{
-                        border: 1px solid #ddd;
-                        padding: 8px 12px;
-                        text-align: left;
-                    }}
-                    th {{
-                        background-color: #f4f4f4;
-                        font-weight: bold;
-                    }}
-                    a {{
-                        color: #3498db;
-                        text-decoration: none;
-                    }}
-                    a:hover {{
-                        text-decoration: underline;
-                    }}
-                    img {{
-                        max-width: 100%;
-                        height: auto;
-                    }}
-                    ul, ol {{
-                        padding-left: 24px;
-                    }}
-                    li {{
-                        margin: 4px 0;
-                    }}
-                </style>
-            </head>
-            <body>
-                {html}
-            </body>
-            </html>
-            """
+            # Large inserts are split over several calls
+            chunk = []
+            size = 0
+            for key, html in zip(keys, blocks):
+                chunk.append([key, html])
+                size += len(html)
+                if size >= PREVIEW_SCRIPT_SIZE:
+                    calls.append(f"previewPatch({position}, {removed}, {json.dumps(chunk)});")
+                    position += len(chunk)
+                    removed = 0
+                    chunk = []
+                    size = 0
             
-            self.preview.setHtml(styled_html)
+            if chunk or removed:
+                calls.append(f"previewPatch({position}, {removed}, {json.dumps(chunk)});")
+        
+        # Small calls share a script
+        script = []
+        size = 0
+        for call in calls:
+            script.append(call)
+            size += len(call)
+            if size >= PREVIEW_SCRIPT_SIZE:
+                self._run_preview_script("\n".join(script))
+                script = []
+                size = 0
+        if script:
+            self._run_preview_script("\n".join(script))
     
-    def _update_word_count(self):
-        """Update word count in status bar."""
-        if self.tab_widget.currentIndex() == 0:
-            text = self.rich_editor.toPlainText()
+    def _load_preview_page(self):
+        """Load an empty preview page that blocks are inserted into."""
+        self.preview_keys = []
+        self.pending_scripts = []
+        self.preview_page_loading = True
+        self.preview.setHtml(self._build_preview_page(""))
+    
+    def _run_preview_script(self, script: str):
+        """Run JavaScript in the preview page once it has loaded."""
+        # Scripts run against the old page until the new one has loaded
+        if self.preview_page_loading:
+            self.pending_scripts.append(script)
         else:
-            text = self.raw_editor.toPlainText()
-        
-        words = len(text.split()) if text.strip() else 0
-        chars = len(text)
+            self.preview.page().runJavaScript(script)
+    
+    def _on_preview_load_finished(self, ok):
+        """Run the scripts that were queued while the page was loading."""
+        self.preview_page_loading = False
+        scripts, self.pending_scripts = self.pending_scripts, []
+        for script in scripts:
+            self.preview.page().runJavaScript(script)
+    
+    def _build_preview_page(self, body: str) -> str:
+        """
+        Wrap rendered HTML in the styled preview page.
         
-        self.word_count_label.setText(f"Words: {words} | Characters: {chars}")
+        Args:
+            body: HTML for the page body
+            
+        Returns:
+            Complete HTML page
+        """
+        return PREVIEW_TEMPLATE.render(theme_style=get_theme_css(self.preview_theme), body=body)
     
-    def _html_to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown (simplified)."""
-        if self.markdown_processor:
-            return self.markdown_processor.html_to_markdown_approximation(html)
-        return html  # Fallback
+    def _update_word_count(self):
+        """Update word count in status bar."""
+        stats = self.text_statistics.stats()
+        self.word_count_label.setText(f"Words: {stats['words']} | Characters: {stats['characters']}")
     
     # Formatting actions
     def _on_font_changed(self, font):
@@ -581,37 +1191,312 @@ class MarkdownEditorWidget(QWidget):
             cursor.insertText(text)
     
     # Public methods
-    def set_markdown_processor(self, processor):
-        """Set the markdown processor."""
+    def load_preview(self):
+        """Create the web engine preview in place of the placeholder."""
+        if self.preview is not None:
+            return
+        
+        try:
+            from PyQt6.QtWebEngineWidgets import QWebEngineView
+        except ImportError as e:
+            self.preview_placeholder.setText(f"Preview unavailable:\n{e}")
+            return
+        
+        self.preview = QWebEngineView()
+        self.preview.setMinimumWidth(300)
+        self.preview.loadFinished.connect(self._on_preview_load_finished)
+        self.preview.setVisible(self.preview_placeholder.isVisibleTo(self))
+        self.splitter.replaceWidget(self.splitter.indexOf(self.preview_placeholder), self.preview)
+        self.preview_placeholder.hide()
+    
+    def set_markdown_processor(self, processor, render_cache=None):
+        """
+        Set the markdown processor.
+        
+        Args:
+            processor: MarkdownProcessor for the preview
+            render_cache: RenderCache for the renders of opened documents
+        """
+        if self.preview_renderer:
+            self.preview_renderer.shutdown()
+        
         self.markdown_processor = processor
+        self.render_cache = render_cache
+        self.preview_renderer = PreviewRenderer(processor, self, render_cache)
+        self.render_scheduler.reset_generations()
+        self.pending_render = None
+        self.preview_renderer.rendered.connect(self._on_preview_rendered)
+        self.preview_renderer.stream_started.connect(self._on_preview_stream_started)
+        self.preview_renderer.section_rendered.connect(self._on_preview_section_rendered)
+        self.preview_renderer.stream_finished.connect(self._on_preview_stream_finished)
+        self.preview_renderer.render_finished.connect(self._on_preview_render_finished)
+        
+        # Content may have been typed or opened before the processor existed
+        self._process_content()
+    
+    def shutdown(self):
+        """Stop background rendering."""
+        if self.preview_renderer:
+            self.preview_renderer.shutdown()
+            self.preview_renderer = None
     
     def set_content(self, content: str):
         """Set the editor content."""
         self.is_updating = True
+        self.replacing_content = True
         
+        self.content_timer.stop()
+        self.edited_editor = None
+        self._stop_loading()
         self.current_content = content
-        self.raw_editor.setPlainText(content)
-        self.rich_editor.setPlainText(content)  # Simplified
+        self.content_loaded = True
+        self._set_large_file_mode(len(content) >= self.large_file_threshold)
         
-        self._process_content()
+        if self.large_file_mode:
+            self._start_loading(content)
+        else:
+            self.raw_editor.setPlainText(content)
+            if self.tab_widget.currentIndex() == 0:
+                self._sync_rich_editor()
+            else:
+                self.rich_stale = True
+            self._process_content()
+        self._update_word_count()
+        
+        self.replacing_content = False
+        self.is_updating = False
+    
+    def reload_content(self, content: str):
+        """
+        Replace the content by editing only the lines that differ.
+        
+        Unlike set_content(), this keeps the cursor, the undo history and the
+        preview, and the editors and indexes only update the changed lines.
+        The reload is a single undo step.
+        
+        Args:
+            content: New content
+        """
+        self._flush_content()
+        
+        # Entering or leaving large file mode, or loading, needs a full reset
+        large = len(content) >= self.large_file_threshold
+        if self.is_loading() or large != self.large_file_mode:
+            self.set_content(content)
+            return
+        
+        hunks = _diff_lines(self.current_content, content)
+        if not hunks:
+            return
+        
+        updating, self.is_updating = self.is_updating, True
+        _replace_lines(self.raw_editor.document(), hunks)
+        
+        if self.tab_widget.currentIndex() == 0:
+            # Patch the rich editor the same way rather than rebuilding it,
+            # which would lose its cursor and undo history. Its lines are
+            # those of its own text, which rich formatting may have changed
+            rich_document = self.rich_editor.document()
+            rich_text = rich_document.toPlainText()
+            if rich_document.blockCount() == rich_text.count('\n') + 1:
+                _replace_lines(rich_document, _diff_lines(rich_text, content))
+            else:
+                self.rich_editor.setPlainText(content)
+            self.rich_stale = False
+        else:
+            self.rich_stale = True
+        
+        self.is_updating = updating
+        self.edited_editor = None
+        self.current_content = content
+        
+        # Published like an edit typed in the editor
         self._update_word_count()
+        self.content_changed.emit()
+        self._schedule_render()
+    
+    def is_loading(self) -> bool:
+        """Check if a large file is still being loaded into the editor."""
+        return self.load_chunks is not None
+    
+    def _set_large_file_mode(self, enabled: bool):
+        """
+        Switch the editor in or out of large file mode.
+        
+        In large file mode the rich editor is disabled, the raw editor
+        doesn't wrap lines and the preview only shows the section at the
+        cursor.
+        
+        Args:
+            enabled: Whether to use large file mode
+        """
+        if enabled == self.large_file_mode:
+            return
+        
+        self.large_file_mode = enabled
+        self.preview_section = None
+        if enabled:
+            self.tab_widget.setCurrentIndex(1)
+            self.rich_editor.clear()
+            self.rich_stale = False
+            self.tab_widget.setTabEnabled(0, False)
+            self.raw_editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        else:
+            self.tab_widget.setTabEnabled(0, True)
+            self.rich_stale = True
+            self.raw_editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+    
+    def _start_loading(self, content: str):
+        """
+        Start inserting a large text into the raw editor a chunk at a time.
+        
+        The editor is read-only until the last chunk is in; events are
+        processed between chunks.
+        
+        Args:
+            content: Text to load
+        """
+        self.raw_editor.clear()
+        self.raw_editor.setReadOnly(True)
+        self.raw_editor.document().setUndoRedoEnabled(False)
+        
+        self.load_chunks = _split_chunks(content, LARGE_FILE_CHUNK_SIZE)
+        self.load_line = []
+        self.load_total = len(content)
+        self.load_done = 0
+        self.load_timer.start(0)
+    
+    def _load_next_chunk(self):
+        """Insert the next chunk of a large file, or finish loading it."""
+        chunk = next(self.load_chunks, None) if self.load_chunks is not None else None
+        if chunk is None:
+            self._index_loaded_lines(["".join(self.load_line)])
+            self.load_line = []
+            self._stop_loading()
+            self.raw_editor.moveCursor(QTextCursor.MoveOperation.Start)
+            self._process_content()
+            self._update_word_count()
+            return
         
+        self.is_updating = True
+        # Moving to the end would lay out the unfinished last line; in an
+        # edit block, the layout is updated once, after the insert
+        document = self.raw_editor.document()
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+        cursor.setPosition(document.characterCount() - 1)
+        cursor.insertText(chunk)
+        cursor.endEditBlock()
         self.is_updating = False
+        
+        # A line is indexed once it is complete, so a long line split over
+        # many chunks is scanned once rather than for every chunk
+        lines = chunk.split('\n')
+        self.load_line.append(lines[0])
+        if len(lines) > 1:
+            lines[0] = "".join(self.load_line)
+            self.load_line = [lines[-1]]
+            lines[-1] = ""
+            self._index_loaded_lines(lines)
+        
+        self.load_done += len(chunk)
+        self.load_progress.emit(self.load_done, self.load_total)
+        self.load_timer.start(0)
+    
+    def _index_loaded_lines(self, lines: List[str]):
+        """
+        Index lines of a large file as they are loaded.
+        
+        The last indexed line stands for the unfinished line at the end of
+        the document and is replaced by the given lines, the last of which
+        takes its place.
+        
+        Args:
+            lines: Text of the lines, without line endings
+        """
+        last = self.heading_index.line_count - 1
+        self.heading_index.replace_lines(last, 1, lines)
+        self.text_statistics.replace_lines(last, 1, lines)
+        self.outline_timer.start()
+    
+    def _stop_loading(self):
+        """Stop loading a large file and make the raw editor editable again."""
+        self.load_timer.stop()
+        if self.load_chunks is None:
+            return
+        
+        self.load_chunks = None
+        self.raw_editor.document().setUndoRedoEnabled(True)
+        self.raw_editor.setReadOnly(False)
     
     def get_content(self) -> str:
         """Get the current markdown content."""
+        self._flush_content()
         return self.current_content
     
+    def get_text_statistics(self) -> Dict[str, Any]:
+        """
+        Get the word and character counts of the current content.
+        
+        Returns:
+            Dictionary of text statistics
+        """
+        self._flush_content()
+        return self.text_statistics.stats()
+    
+    def get_headings(self) -> List[Dict[str, Any]]:
+        """
+        Get the headings of the markdown content.
+        
+        Returns:
+            Headings with their line (from 0), level and title
+        """
+        return self.heading_index.headings()
+    
+    def go_to_line(self, line: int):
+        """
+        Move the cursor of the current editor to the start of a line.
+        
+        Args:
+            line: Line number, from 0
+        """
+        editor = self.rich_editor if self.tab_widget.currentIndex() == 0 else self.raw_editor
+        
+        # Block lookup by number is logarithmic in the document size
+        block = editor.document().findBlockByNumber(line)
+        if not block.isValid():
+            return
+        
+        editor.setTextCursor(QTextCursor(block))
+        editor.ensureCursorVisible()
+        editor.setFocus()
+    
     def clear_content(self):
         """Clear all content."""
         self.set_content("")
     
+    def set_preview_theme(self, theme: str):
+        """
+        Switch the colors of the preview without rendering it again.
+        
+        Args:
+            theme: Name of the document theme
+            
+        Raises:
+            ValueError: If the theme is unknown
+        """
+        css = get_theme_css(theme)
+        self.preview_theme = theme
+        if self.preview and self.preview_keys is not None:
+            self._run_preview_script(f"previewSetTheme({json.dumps(css)});")
+    
     def toggle_preview(self):
         """Toggle preview visibility."""
-        if self.preview.isVisible():
-            self.preview.hide()
+        preview = self.preview or self.preview_placeholder
+        if preview.isVisibleTo(self):
+            preview.hide()
         else:
-            self.preview.show()
+            preview.show()
     
     def focus_editor(self):
         """Focus the current editor."""
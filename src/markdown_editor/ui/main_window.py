@@ -7,14 +7,15 @@ from pathlib import Path
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QMenuBar, QMenu,
     QStatusBar, QToolBar, QFileDialog, QMessageBox, QApplication,
-    QSplashScreen, QLabel, QProgressBar, QAction, QActionGroup
+    QSplashScreen, QLabel, QProgressBar, QToolButton
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QThread, pyqtSlot, QSettings
-from PyQt6.QtGui import QKeySequence, QIcon, QPixmap, QFont, QAction
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QThread, pyqtSlot, QSettings, QEvent
+from PyQt6.QtGui import QKeySequence, QIcon, QPixmap, QFont, QAction, QActionGroup
 
 from .editor_widget import MarkdownEditorWidget
+from .outline_panel import OutlinePanel
 from ..core.file_manager import FileManager
-from ..core.markdown_processor import MarkdownProcessor
+from ..core.html_export import build_html_document
 
 
 class MainWindow(QMainWindow):
@@ -26,8 +27,10 @@ class MainWindow(QMainWindow):
         """Initialize the main window."""
         super().__init__()
         
-        # Initialize core components
-        self.markdown_processor = MarkdownProcessor()
+        # Initialize core components (the markdown processor is loaded
+        # once the window is showing)
+        self.markdown_processor = None
+        self.render_cache = None
         self.file_manager = FileManager()
         
         # Settings
@@ -35,6 +38,7 @@ class MainWindow(QMainWindow):
         
         # State
         self.is_fullscreen = False
+        self.deferred_load_scheduled = False
         
         self._setup_ui()
         self._setup_connections()
@@ -42,8 +46,31 @@ class MainWindow(QMainWindow):
         self._restore_settings()
         
         # Initialize with empty document
-        self.editor.set_markdown_processor(self.markdown_processor)
         self._update_window_title()
+        
+        # Offer the untitled document of a session that crashed
+        QTimer.singleShot(0, self._recover_auto_save)
+    
+    def paintEvent(self, event):
+        """Load the preview engine once the window has first been painted."""
+        super().paintEvent(event)
+        if not self.deferred_load_scheduled:
+            self.deferred_load_scheduled = True
+            QTimer.singleShot(0, self._load_deferred_components)
+    
+    def _load_deferred_components(self):
+        """Load the preview engine and markdown processing."""
+        if self.markdown_processor is not None:
+            return
+        
+        # Imports markdown, its extensions and Pygments
+        from ..core.markdown_processor import MarkdownProcessor
+        from ..core.render_cache import RenderCache
+        
+        self.editor.load_preview()
+        self.markdown_processor = MarkdownProcessor(incremental=True)
+        self.render_cache = RenderCache(self.markdown_processor.config_fingerprint())
+        self.editor.set_markdown_processor(self.markdown_processor, self.render_cache)
     
     def _setup_ui(self):
         """Setup the user interface."""
@@ -64,6 +91,10 @@ class MainWindow(QMainWindow):
         self.editor = MarkdownEditorWidget()
         layout.addWidget(self.editor)
         
+        # Create outline dock
+        self.outline_panel = OutlinePanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.outline_panel)
+        
         # Setup menu bar
         self._create_menu_bar()
         
@@ -171,6 +202,11 @@ class MainWindow(QMainWindow):
         self.toggle_preview_action.setChecked(True)
         view_menu.addAction(self.toggle_preview_action)
         
+        self.toggle_outline_action = self.outline_panel.toggleViewAction()
+        self.toggle_outline_action.setText("Toggle Outline")
+        self.toggle_outline_action.setShortcut("F6")
+        view_menu.addAction(self.toggle_outline_action)
+        
         self.fullscreen_action = QAction("Toggle Fullscreen", self)
         self.fullscreen_action.setShortcut("F11")
         view_menu.addAction(self.fullscreen_action)
@@ -256,8 +292,15 @@ class MainWindow(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setRange(0, 100)
         self.status_bar.addPermanentWidget(self.progress_bar)
         
+        # Cancels the file operation in progress
+        self.cancel_button = QToolButton()
+        self.cancel_button.setText("Cancel")
+        self.cancel_button.setVisible(False)
+        self.status_bar.addPermanentWidget(self.cancel_button)
+        
         # Encoding label
         self.encoding_label = QLabel("UTF-8")
         self.status_bar.addPermanentWidget(self.encoding_label)
@@ -310,10 +353,21 @@ class MainWindow(QMainWindow):
         self.file_manager.file_saved.connect(self._on_file_saved)
         self.file_manager.file_created.connect(self._on_file_created)
         self.file_manager.recent_files_updated.connect(self._update_recent_files_menu)
+        self.file_manager.operation_progress.connect(self._on_operation_progress)
+        self.file_manager.operation_failed.connect(self._on_operation_failed)
+        self.file_manager.operation_cancelled.connect(self._on_operation_cancelled)
+        self.file_manager.file_changed_externally.connect(self._on_file_changed_externally)
+        self.file_manager.format_changed.connect(self._on_format_changed)
+        self.cancel_button.clicked.connect(self.file_manager.cancel_operation)
         
         # Editor connections
         self.editor.content_changed.connect(self._on_content_changed)
+        self.file_manager.set_auto_save_source(self.editor.get_content)
         self.editor.cursor_position_changed.connect(self._on_cursor_position_changed)
+        self.editor.headings_changed.connect(self.outline_panel.set_headings)
+        self.editor.load_progress.connect(self._on_load_progress)
+        self.editor.lines_edited.connect(self.file_manager.record_edit)
+        self.outline_panel.heading_activated.connect(self.editor.go_to_line)
     
     def _setup_shortcuts(self):
         """Setup additional keyboard shortcuts."""
@@ -392,6 +446,15 @@ class MainWindow(QMainWindow):
         self.toggle_preview_action.setChecked(preview_visible)
         if not preview_visible:
             self.editor.toggle_preview()
+        
+        # Restore outline visibility
+        outline_visible = self.settings.value("outline_visible", True, type=bool)
+        self.outline_panel.setVisible(outline_visible)
+        
+        # Restore render scheduling: drafts while typing, full quality once idle
+        self.editor.set_full_render_delay(self.settings.value("full_render_delay", 1500, type=int))
+        if not self.settings.value("draft_preview", True, type=bool):
+            self.editor.draft_profile = None
     
     def _save_settings(self):
         """Save application settings."""
@@ -401,6 +464,9 @@ class MainWindow(QMainWindow):
         self.settings.setValue("theme", theme)
         
         self.settings.setValue("preview_visible", self.toggle_preview_action.isChecked())
+        self.settings.setValue("outline_visible", self.outline_panel.isVisibleTo(self))
+        self.settings.setValue("full_render_delay", self.editor.full_render_delay)
+        self.settings.setValue("draft_preview", self.editor.draft_profile is not None)
     
     # File operations
     def _new_file(self):
@@ -424,45 +490,85 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            success, content = self.file_manager.open_file(file_path)
-            if success:
-                self.editor.set_content(content)
-                self._update_window_title()
-                self.status_bar.showMessage(f"Opened: {os.path.basename(file_path)}", 2000)
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to open file:\n{content}")
+            self._start_open(file_path)
     
-    def _save_file(self):
-        """Save the current file."""
-        content = self.editor.get_content()
+    def _start_open(self, file_path: str) -> bool:
+        """
+        Open a file in the background; _on_file_opened() shows it once read.
         
-        if self.file_manager.get_current_file():
-            success, result = self.file_manager.save_file(content)
-            if success:
-                self._update_window_title()
-                self.status_bar.showMessage(f"Saved: {os.path.basename(result)}", 2000)
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to save file:\n{result}")
+        Args:
+            file_path: Path of the file to open
+            
+        Returns:
+            True if the file is being opened
+        """
+        success, result = self.file_manager.open_file_async(file_path)
+        if success:
+            self._show_progress(0, 1)
+            self.status_bar.showMessage(f"Opening: {os.path.basename(file_path)}...")
         else:
-            self._save_file_as()
+            QMessageBox.warning(self, "Error", f"Failed to open file:\n{result}")
+        return success
+    
+    def _save_file(self):
+        """Save the current file."""
+        self._save(wait=False)
     
     def _save_file_as(self):
         """Save the file with a new name."""
+        file_path = self._ask_save_path()
+        if file_path:
+            self._write_file(file_path, wait=False)
+    
+    def _save(self, wait: bool) -> bool:
+        """
+        Save to the current file, asking for a file name if there is none.
+        
+        Args:
+            wait: Whether to save on the UI thread instead of in the background
+            
+        Returns:
+            True if the file was saved or is being saved
+        """
+        if self.file_manager.get_current_file():
+            return self._write_file(None, wait)
+        
+        file_path = self._ask_save_path()
+        return bool(file_path) and self._write_file(file_path, wait)
+    
+    def _ask_save_path(self) -> str:
+        """Ask for the path to save to, empty if the dialog was cancelled."""
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Markdown File",
             "untitled.md",
             "Markdown Files (*.md);;All Files (*)"
         )
+        return file_path
+    
+    def _write_file(self, file_path, wait: bool) -> bool:
+        """
+        Write the content to a file; _on_file_saved() reports success.
         
-        if file_path:
-            content = self.editor.get_content()
+        Args:
+            file_path: Path to save to (if None, uses the current file)
+            wait: Whether to save on the UI thread instead of in the background
+            
+        Returns:
+            True if the file was saved or is being saved
+        """
+        content = self.editor.get_content()
+        if wait:
             success, result = self.file_manager.save_file(content, file_path)
-            if success:
-                self._update_window_title()
-                self.status_bar.showMessage(f"Saved: {os.path.basename(result)}", 2000)
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to save file:\n{result}")
+        else:
+            success, result = self.file_manager.save_file_async(content, file_path)
+        
+        if not success:
+            QMessageBox.warning(self, "Error", f"Failed to save file:\n{result}")
+        elif not wait:
+            self._show_progress(0, 1)
+            self.status_bar.showMessage(f"Saving: {os.path.basename(result)}...")
+        return success
     
     def _export_html(self):
         """Export as HTML."""
@@ -476,30 +582,11 @@ class MainWindow(QMainWindow):
         if file_path:
             try:
                 content = self.editor.get_content()
+                self._load_deferred_components()
                 html = self.markdown_processor.markdown_to_html(content)
                 
                 # Create complete HTML document
-                full_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Exported Document</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        /* Add more CSS styling here */
-    </style>
-</head>
-<body>
-    {html}
-</body>
-</html>"""
+                full_html = build_html_document(html)
                 
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(full_html)
@@ -518,6 +605,7 @@ class MainWindow(QMainWindow):
         """Quit the application."""
         if self._check_unsaved_changes():
             self._save_settings()
+            self.editor.shutdown()
             QApplication.quit()
     
     # Edit operations
@@ -579,6 +667,7 @@ class MainWindow(QMainWindow):
     
     def _change_theme(self, theme):
         """Change application theme."""
+        self.editor.set_preview_theme(theme)
         if theme == "dark":
             # Apply dark theme
             self.setStyleSheet("""
@@ -604,15 +693,14 @@ class MainWindow(QMainWindow):
     # Tools operations
     def _show_word_count(self):
         """Show word count dialog."""
-        content = self.editor.get_content()
-        words = len(content.split()) if content.strip() else 0
-        chars = len(content)
-        chars_no_spaces = len(content.replace(' ', ''))
+        stats = self.editor.get_text_statistics()
         
         QMessageBox.information(
             self,
             "Word Count",
-            f"Words: {words}\nCharacters: {chars}\nCharacters (no spaces): {chars_no_spaces}"
+            f"Words: {stats['words']}\nCharacters: {stats['characters']}\n"
+            f"Characters (no spaces): {stats['characters_no_spaces']}\n"
+            f"Reading time: {max(1, round(stats['reading_minutes']))} min"
         )
     
     def _insert_table(self):
@@ -669,16 +757,127 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Markdown Help", help_text)
     
     # File manager event handlers
-    @pyqtSlot(str, str)
+    @pyqtSlot(str, object)
     def _on_file_opened(self, filepath, content):
         """Handle file opened event."""
+        self._hide_progress()
         self.editor.set_content(content)
         self._update_window_title()
+        self.status_bar.showMessage(f"Opened: {os.path.basename(filepath)}", 2000)
+        self._recover_auto_save()
+    
+    def _recover_auto_save(self):
+        """Offer to restore the changes auto-saved before a crash for the current document."""
+        journal = self.file_manager.auto_save_journal
+        content = self.file_manager.recover_auto_save()
+        if content is None:
+            return
+        
+        original = self.file_manager.auto_save_content
+        if content != original:
+            reply = QMessageBox.question(
+                self,
+                "Recover Unsaved Changes",
+                "The editor closed unexpectedly while this document had unsaved changes.\n"
+                "Do you want to recover them?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            
+            # Another document may have been opened while asking
+            if self.file_manager.auto_save_journal is not journal:
+                return
+            
+            if reply == QMessageBox.StandardButton.Yes:
+                self.editor.set_content(content)
+                self.file_manager.set_content_modified(True)
+                self.file_manager.reset_auto_save(content)
+                self._update_window_title()
+                self.status_bar.showMessage("Recovered unsaved changes", 2000)
+                return
+        
+        self.file_manager.reset_auto_save(original)
+    
+    @pyqtSlot(int, int)
+    def _on_load_progress(self, loaded, total):
+        """Show the progress of loading a large file into the editor."""
+        if loaded < total:
+            self._show_progress(loaded, total, cancellable=False)
+            self.status_bar.showMessage("Loading large file...")
+        else:
+            self._hide_progress()
+            self.status_bar.showMessage("Large file mode: rich text editing is off, preview shows the section at the cursor", 5000)
     
     @pyqtSlot(str)
     def _on_file_saved(self, filepath):
         """Handle file saved event."""
+        self._hide_progress()
+        self._update_window_title()
+        self.status_bar.showMessage(f"Saved: {os.path.basename(filepath)}", 2000)
+    
+    @pyqtSlot(str, str)
+    def _on_format_changed(self, old_format, new_format):
+        """Tell the user a file was saved in a different encoding."""
         self._update_window_title()
+        self.status_bar.showMessage(
+            f"Saved as {new_format}: {old_format} can't represent some characters", 5000)
+    
+    @pyqtSlot(str, object)
+    def _on_file_changed_externally(self, filepath, content):
+        """Reload the current file after another program changed it."""
+        name = os.path.basename(filepath)
+        if self.file_manager.is_modified():
+            reply = QMessageBox.question(
+                self,
+                "File Changed",
+                f"{name} was changed by another program.\n"
+                "Do you want to reload it and lose your changes?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                # The editor no longer matches the file
+                self.file_manager.set_content_modified(True)
+                self._update_window_title()
+                return
+        
+        # Only the changed lines are replaced, so the cursor and undo history stay
+        self.editor.reload_content(content)
+        self.status_bar.showMessage(f"Reloaded: {name}", 2000)
+    
+    @pyqtSlot(int, int)
+    def _on_operation_progress(self, done, total):
+        """Show the progress of a background file operation."""
+        self._show_progress(done, total)
+    
+    @pyqtSlot(str)
+    def _on_operation_failed(self, message):
+        """Report a failed background file operation."""
+        self._hide_progress()
+        self.status_bar.clearMessage()
+        QMessageBox.warning(self, "Error", message)
+    
+    @pyqtSlot()
+    def _on_operation_cancelled(self):
+        """Report a cancelled background file operation."""
+        self._hide_progress()
+        self.status_bar.showMessage("Cancelled", 2000)
+    
+    def _show_progress(self, done: int, total: int, cancellable: bool = True):
+        """
+        Show progress in the status bar.
+        
+        Args:
+            done: Amount of work done
+            total: Total amount of work
+            cancellable: Whether to show the cancel button
+        """
+        self.progress_bar.setValue(done * 100 // total if total else 100)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(cancellable)
+    
+    def _hide_progress(self):
+        """Hide the progress bar and the cancel button."""
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
     
     @pyqtSlot()
     def _on_file_created(self):
@@ -687,17 +886,19 @@ class MainWindow(QMainWindow):
         self._update_window_title()
     
     # Editor event handlers
-    @pyqtSlot(str)
-    def _on_content_changed(self, content):
+    @pyqtSlot()
+    def _on_content_changed(self):
         """Handle content changed event."""
-        self.file_manager.set_content_modified(True)
-        self.file_manager.set_auto_save_content(content)
+        # The content is only copied out of the editor if its length is unchanged
+        characters = self.editor.get_text_statistics()['characters']
+        self.file_manager.update_modified(characters, self.editor.get_content)
         self._update_window_title()
     
     @pyqtSlot(int, int)
     def _on_cursor_position_changed(self, line, column):
         """Handle cursor position changed event."""
-        pass  # Already handled by editor status
+        # Line numbers in the status bar start at 1
+        self.outline_panel.set_current_line(line - 1)
     
     # Utility methods
     def _update_window_title(self):
@@ -716,6 +917,7 @@ class MainWindow(QMainWindow):
             self.file_info_label.setText(f"{file_info['name']} - {file_info['path']}")
         else:
             self.file_info_label.setText(file_info['name'])
+        self.encoding_label.setText(file_info['encoding'])
     
     def _update_recent_files_menu(self):
         """Update the recent files menu."""
@@ -743,15 +945,9 @@ class MainWindow(QMainWindow):
     def _open_recent_file(self, file_path):
         """Open a recent file."""
         if self._check_unsaved_changes():
-            success, content = self.file_manager.open_file(file_path)
-            if success:
-                self.editor.set_content(content)
-                self._update_window_title()
-                self.status_bar.showMessage(f"Opened: {os.path.basename(file_path)}", 2000)
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to open file:\n{content}")
+            if not self._start_open(file_path):
                 # Remove from recent files if it no longer exists
-                if "not found" in content.lower():
+                if not os.path.exists(file_path):
                     recent_files = self.file_manager.get_recent_files()
                     if file_path in recent_files:
                         recent_files.remove(file_path)
@@ -771,8 +967,8 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Save:
-                self._save_file()
-                return True
+                # Whatever comes next needs the file saved first
+                return self._save(wait=True)
             elif reply == QMessageBox.StandardButton.Discard:
                 return True
             else:  # Cancel
@@ -781,10 +977,18 @@ class MainWindow(QMainWindow):
         return True
     
     # Override close event
+    def changeEvent(self, event):
+        """Check the current file for changes by other programs when the window is activated."""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            self.file_manager.check_external_change()
+    
     def closeEvent(self, event):
         """Handle window close event."""
         if self._check_unsaved_changes():
             self._save_settings()
+            self.editor.shutdown()
+            self.file_manager.shutdown()
             event.accept()
         else:
             event.ignore()
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Outline dock listing the headings of the document.
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List
+
+from PyQt6.QtWidgets import QDockWidget, QTreeWidget, QTreeWidgetItem
+from PyQt6.QtCore import Qt, pyqtSignal
+
+
+class OutlinePanel(QDockWidget):
+    """
+    Dock widget showing the document headings as a tree.
+    """
+    
+    # Signals
+    heading_activated = pyqtSignal(int)  # line, from 0
+    
+    def __init__(self, parent=None):
+        """Initialize the outline panel."""
+        super().__init__("Outline", parent)
+        self.setObjectName("OutlinePanel")
+        self.setAllowedAreas(
+            Qt.DockWidgetArea.LeftDockWidgetArea | Qt.DockWidgetArea.RightDockWidgetArea
+        )
+        
+        self.headings = []
+        self.heading_lines = []  # Line of every heading, for bisection
+        self.items = []  # Tree item of every heading
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemClicked.connect(self._on_item_activated)
+        self.tree.itemActivated.connect(self._on_item_activated)
+        self.setWidget(self.tree)
+    
+    def set_headings(self, headings: List[Dict[str, Any]]):
+        """
+        Show a new list of headings.
+        
+        Args:
+            headings: Headings as returned by HeadingIndex.headings()
+        """
+        if headings == self.headings:
+            return
+        
+        structure = [(heading['level'], heading['title']) for heading in headings]
+        if structure == [(heading['level'], heading['title']) for heading in self.headings]:
+            # Only lines moved, the tree can stay
+            for item, heading in zip(self.items, headings):
+                item.setData(0, Qt.ItemDataRole.UserRole, heading['line'])
+        else:
+            self._rebuild(headings)
+        
+        self.headings = headings
+        self.heading_lines = [heading['line'] for heading in headings]
+    
+    def _rebuild(self, headings: List[Dict[str, Any]]):
+        """Rebuild the tree, nesting headings under the closest higher level."""
+        self.tree.setUpdatesEnabled(False)
+        self.tree.clear()
+        self.items = []
+        
+        parents = []  # (level, item) of the open sections
+        for heading in headings:
+            while parents and parents[-1][0] >= heading['level']:
+                parents.pop()
+            
+            item = QTreeWidgetItem([heading['title'] or "(untitled)"])
+            item.setData(0, Qt.ItemDataRole.UserRole, heading['line'])
+            if parents:
+                parents[-1][1].addChild(item)
+            else:
+                self.tree.addTopLevelItem(item)
+            
+            parents.append((heading['level'], item))
+            self.items.append(item)
+        
+        self.tree.expandAll()
+        self.tree.setUpdatesEnabled(True)
+    
+    def set_current_line(self, line: int):
+        """
+        Select the heading of the section containing a line.
+        
+        Args:
+            line: Line number, from 0
+        """
+        index = bisect_right(self.heading_lines, line) - 1
+        if index < 0:
+            self.tree.clearSelection()
+            return
+        
+        item = self.items[index]
+        if item is not self.tree.currentItem():
+            self.tree.blockSignals(True)
+            self.tree.setCurrentItem(item)
+            self.tree.blockSignals(False)
+            self.tree.scrollToItem(item)
+    
+    def _on_item_activated(self, item, column):
+        """Navigate to the clicked heading."""
+        self.heading_activated.emit(item.data(0, Qt.ItemDataRole.UserRole))
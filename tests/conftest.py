@@ -0,0 +1,23 @@
+"""
+Shared test setup.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import the package from the source tree when it isn't installed
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    """Application for tests of widgets and text documents, headless without a display."""
+    widgets = pytest.importorskip('PyQt6.QtWidgets')
+    if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return widgets.QApplication.instance() or widgets.QApplication([])
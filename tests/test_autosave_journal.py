@@ -0,0 +1,146 @@
+"""
+Tests for recovering documents from the auto-save journal.
+"""
+
+import pytest
+
+from markdown_editor.core import autosave_journal
+from markdown_editor.core.autosave_journal import AutosaveJournal
+
+BASE = "# Notes\n\nfirst\nsecond\nthird"
+
+
+def apply_edit(content, first, count, lines):
+    """Apply a recorded line edit to content, the way recovery replays it."""
+    content_lines = content.split('\n')
+    content_lines[first:first + count] = lines
+    return '\n'.join(content_lines)
+
+
+def record(journal, content, first, count, lines):
+    """Record an edit in the journal and return the edited content."""
+    journal.record(first, count, lines)
+    return apply_edit(content, first, count, lines)
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return tmp_path / "autosave"
+
+
+def test_no_files_recovers_nothing(directory):
+    assert AutosaveJournal("/docs/a.md", BASE, directory).recover() is None
+
+
+def test_replay_after_flush(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    content = record(journal, BASE, 2, 1, ["first edited"])
+    content = record(journal, content, 4, 0, ["inserted", "lines"])
+    journal.flush()
+    content = record(journal, content, 0, 1, [])
+    journal.flush()
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == content
+
+
+def test_unflushed_edits_are_not_recovered(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    flushed = record(journal, BASE, 2, 1, ["saved"])
+    journal.flush()
+    record(journal, flushed, 3, 1, ["lost"])
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == flushed
+
+
+def test_typing_within_a_line_is_merged(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    content = BASE
+    for text in ["s", "se", "sec"]:
+        content = record(journal, content, 3, 1, [text])
+    
+    assert len(journal.pending) == 1
+    journal.flush()
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == content
+
+
+def test_replay_after_compaction(directory, monkeypatch):
+    monkeypatch.setattr(autosave_journal, 'COMPACT_MIN_SIZE', 0)
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    content = BASE
+    for number in range(20):
+        content = record(journal, content, 2, 0, [f"line {number}"])
+        journal.flush()
+    
+    assert journal.needs_compaction()
+    generation = journal.generation
+    journal.compact(content)
+    assert journal.generation != generation
+    assert not journal.needs_compaction()
+    
+    content = record(journal, content, 0, 1, ["# Compacted"])
+    journal.flush()
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == content
+    assert journal.journal_path.read_text(encoding='utf-8').count('\n') == 2
+
+
+def test_journal_cut_off_mid_write(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    content = record(journal, BASE, 2, 1, ["complete"])
+    journal.flush()
+    record(journal, content, 3, 1, ["interrupted"])
+    journal.flush()
+    
+    data = journal.journal_path.read_bytes()
+    journal.journal_path.write_bytes(data[:-8])
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == content
+
+
+def test_journal_of_another_generation_is_ignored(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    record(journal, BASE, 2, 1, ["edited"])
+    journal.flush()
+    
+    # A crash between writing a new snapshot and starting its journal
+    # leaves the journal of the previous snapshot behind
+    lines = journal.journal_path.read_text(encoding='utf-8').split('\n')
+    lines[0] = "0" * 32
+    journal.journal_path.write_text('\n'.join(lines), encoding='utf-8')
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == BASE
+
+
+def test_missing_journal_recovers_snapshot(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    journal.flush()
+    journal.journal_path.unlink()
+    
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == BASE
+
+
+def test_start_and_discard_remove_files(directory):
+    journal = AutosaveJournal("/docs/a.md", BASE, directory)
+    record(journal, BASE, 2, 1, ["edited"])
+    journal.flush()
+    
+    journal.start("new base")
+    assert not journal.has_pending()
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() is None
+    
+    journal.flush()
+    assert AutosaveJournal("/docs/a.md", directory=directory).recover() == "new base"
+    
+    journal.discard()
+    assert not journal.snapshot_path.exists() and not journal.journal_path.exists()
+
+
+def test_documents_with_the_same_name_do_not_collide(directory):
+    first = AutosaveJournal("/one/notes.md", "one", directory)
+    second = AutosaveJournal("/two/notes.md", "two", directory)
+    first.flush()
+    second.flush()
+    
+    assert AutosaveJournal("/one/notes.md", directory=directory).recover() == "one"
+    assert AutosaveJournal("/two/notes.md", directory=directory).recover() == "two"
+    assert AutosaveJournal(None, directory=directory).recover() is None
@@ -0,0 +1,38 @@
+"""
+Tests for serializing the rich editor's document to markdown.
+"""
+
+import pytest
+
+pytest.importorskip('PyQt6.QtGui')
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from markdown_editor.core.document_markdown import DocumentMarkdownWriter
+
+
+@pytest.mark.parametrize('markdown_text', [
+    "# t\n\ntext\n",
+    "# t\n\ntext",
+    "\n\nleading blank lines\n",
+    "trailing blank lines\n\n\n",
+    "",
+])
+def test_plain_text_round_trip(qt_app, markdown_text):
+    document = QTextDocument()
+    document.setPlainText(markdown_text)
+    assert DocumentMarkdownWriter(document).to_markdown() == markdown_text
+
+
+def test_edit_keeps_trailing_newline(qt_app):
+    document = QTextDocument()
+    document.setPlainText("# t\n\ntext\n")
+    writer = DocumentMarkdownWriter(document)
+    writer.to_markdown()
+    
+    cursor = QTextCursor(document.findBlockByNumber(2))
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    cursor.insertText(" more")
+    
+    assert writer.to_markdown() == "# t\n\ntext more\n"
+    assert writer.serialized_blocks == 1
@@ -0,0 +1,100 @@
+"""
+Tests that the incrementally updated heading index matches a full reindex.
+"""
+
+import random
+
+import pytest
+
+from markdown_editor.core.heading_index import HeadingIndex
+
+TEXT = (
+    "# Title\n"
+    "\n"
+    "Intro\n"
+    "\n"
+    "```python\n"
+    "# comment, not a heading\n"
+    "```\n"
+    "\n"
+    "Setext\n"
+    "======\n"
+    "\n"
+    "## Section\n"
+    "\n"
+    "text\n"
+)
+
+# (first line, replaced line count, new lines)
+EDITS = {
+    'open_fence': (2, 1, ["```"]),
+    'open_fence_with_info': (2, 1, ["~~~ text"]),
+    'close_fence': (6, 1, [""]),
+    'remove_opening_fence': (4, 1, ["plain"]),
+    'shorter_closing_fence': (4, 1, ["````"]),
+    'insert_heading': (3, 0, ["### Added", ""]),
+    'break_setext': (8, 1, [""]),
+    'make_setext': (13, 0, ["---"]),
+    'delete_headings': (0, 12, []),
+}
+
+
+def apply_edit(text, first, count, lines):
+    old_lines = text.split('\n')
+    old_lines[first:first + count] = lines
+    return '\n'.join(old_lines)
+
+
+def test_headings():
+    assert HeadingIndex(TEXT).headings() == [
+        {'line': 0, 'level': 1, 'title': "Title"},
+        {'line': 8, 'level': 1, 'title': "Setext"},
+        {'line': 11, 'level': 2, 'title': "Section"},
+    ]
+
+
+@pytest.mark.parametrize('name', sorted(EDITS))
+def test_edit_matches_reset(name):
+    index = HeadingIndex(TEXT)
+    index.headings()
+    index.replace_lines(*EDITS[name])
+    
+    expected = HeadingIndex(apply_edit(TEXT, *EDITS[name]))
+    assert index.headings() == expected.headings()
+    assert index.line_count == expected.line_count
+
+
+def test_opening_fence_hides_later_headings():
+    index = HeadingIndex(TEXT)
+    index.replace_lines(*EDITS['open_fence_with_info'])
+    assert [heading['line'] for heading in index.headings()] == [0]
+    
+    index.replace_lines(2, 1, ["Intro"])
+    assert index.headings() == HeadingIndex(TEXT).headings()
+
+
+def test_sections():
+    index = HeadingIndex(TEXT)
+    assert index.heading_at(7) == 0
+    assert index.heading_at(9) == 1
+    assert index.section_range(12) == (11, 15)
+    assert HeadingIndex("text\n# A").section_range(0) == (0, 1)
+
+
+def test_random_edits_match_reset():
+    rng = random.Random(3)
+    pieces = ["# A", "## B", "```", "~~~", "````", "text", "===", "---", "", "    # code"]
+    text = TEXT
+    index = HeadingIndex(text)
+    
+    for _ in range(300):
+        line_count = text.count('\n') + 1
+        first = rng.randrange(line_count)
+        count = rng.randint(0, min(2, line_count - first))
+        lines = [rng.choice(pieces) for _ in range(rng.randint(0, 2))]
+        if count == line_count and not lines:
+            lines = [""]  # A document has at least one line
+        
+        text = apply_edit(text, first, count, lines)
+        index.replace_lines(first, count, lines)
+        assert index.headings() == HeadingIndex(text).headings()
@@ -0,0 +1,76 @@
+"""
+Tests for memoized Pygments highlighting.
+"""
+
+import pytest
+
+pytest.importorskip('pygments')
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import PythonLexer
+from pygments.util import ClassNotFound
+
+from markdown_editor.core.highlight_cache import HighlightCache
+
+
+def test_repeated_highlight_hits():
+    cache = HighlightCache()
+    formatter = HtmlFormatter()
+    expected = highlight("x = 1\n", PythonLexer(), formatter)
+    
+    assert cache.highlight("x = 1\n", PythonLexer(), formatter) == expected
+    assert cache.highlight("x = 1\n", PythonLexer(), HtmlFormatter()) == expected
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_code_and_options_change_the_key():
+    cache = HighlightCache()
+    cache.highlight("x = 1\n", PythonLexer(), HtmlFormatter())
+    cache.highlight("x = 2\n", PythonLexer(), HtmlFormatter())
+    cache.highlight("x = 1\n", PythonLexer(), HtmlFormatter(linenos='table'))
+    cache.highlight("x = 1\n", PythonLexer(stripnl=False), HtmlFormatter())
+    
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 4
+
+
+def test_least_recently_used_highlight_is_evicted():
+    cache = HighlightCache(max_entries=2)
+    formatter = HtmlFormatter()
+    cache.highlight("a\n", PythonLexer(), formatter)
+    cache.highlight("b\n", PythonLexer(), formatter)
+    cache.highlight("a\n", PythonLexer(), formatter)
+    cache.highlight("c\n", PythonLexer(), formatter)
+    
+    cache.highlight("a\n", PythonLexer(), formatter)
+    assert cache.stats()['hits'] == 2
+    cache.highlight("b\n", PythonLexer(), formatter)
+    assert cache.stats()['misses'] == 4
+
+
+def test_lexers_are_reused_per_alias_and_options():
+    cache = HighlightCache()
+    lexer = cache.get_lexer_by_name('python')
+    
+    assert cache.get_lexer_by_name('Python') is lexer
+    assert cache.get_lexer_by_name('python', stripall=True) is not lexer
+    assert cache.stats()['lexer_hits'] == 1
+
+
+def test_unknown_alias_is_remembered_and_bounded():
+    cache = HighlightCache(max_lexers=2)
+    for _ in range(2):
+        with pytest.raises(ClassNotFound):
+            cache.get_lexer_by_name('no-such-language')
+    assert cache.stats()['lexer_hits'] == 1
+    
+    cache.get_lexer_by_name('python')
+    for alias in ('unknown-a', 'unknown-b'):
+        with pytest.raises(ClassNotFound):
+            cache.get_lexer_by_name(alias)
+    assert cache.stats()['lexers'] == 2
+    with pytest.raises(ClassNotFound):
+        cache.get_lexer_by_name('no-such-language')
+    assert cache.stats()['lexer_misses'] == 5
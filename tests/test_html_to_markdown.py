@@ -0,0 +1,52 @@
+"""
+Tests for converting HTML back to markdown.
+"""
+
+import markdown
+import pytest
+
+from markdown_editor.core.html_to_markdown import html_to_markdown
+
+
+def render(text):
+    return markdown.markdown(text).replace('\n', '')
+
+
+@pytest.mark.parametrize('html', [
+    "<ul><li>a</li></ul><ol><li>b</li></ol>",
+    "<ol><li>a</li></ol><ul><li>b</li></ul>",
+    "<ul><li>a</li></ul><ul><li>b</li></ul>",
+    "<blockquote><ul><li>a</li></ul><ol><li>b</li></ol></blockquote>",
+])
+def test_adjacent_lists_stay_separate(html):
+    assert render(html_to_markdown(html)).replace('<!-- -->', '') == html
+
+
+def test_adjacent_nested_lists_stay_separate():
+    html = "<ul><li>a<ol><li>x</li></ol><ul><li>y</li></ul></li><li>b</li></ul>"
+    rendered = render(html_to_markdown(html))
+    assert "<ol><li>x</li></ol><!-- --><ul><li>y</li></ul></li>" in rendered
+    assert rendered.endswith("<li><p>b</p></li></ul>")
+
+
+def test_nested_list_stays_tight():
+    markdown_text = html_to_markdown("<ul><li>a<ol><li>x</li></ol></li><li>b</li></ul>")
+    assert markdown_text == "- a\n    1. x\n- b"
+
+
+def test_numbering_continues_after_a_paragraph():
+    html = '<ol><li>a</li></ol><p>t</p><ol start="3"><li>b</li></ol>'
+    assert html_to_markdown(html) == "1. a\n\nt\n\n3. b"
+
+
+def test_text_is_escaped():
+    html = "<p>&lt;tag&gt; &amp; &amp;amp; <code>&lt;b&gt;</code></p>"
+    markdown_text = html_to_markdown(html)
+    assert markdown_text == "&lt;tag&gt; & &amp;amp; `<b>`"
+    assert render(markdown_text) == "<p>&lt;tag&gt; &amp; &amp;amp; <code>&lt;b&gt;</code></p>"
+
+
+def test_qt_paragraphs_are_not_escaped():
+    html = ('<html><head><meta name="qrichtext" content="1" /></head>'
+            '<body><p>&lt;b&gt; &amp;amp;</p></body></html>')
+    assert html_to_markdown(html) == "<b> &amp;"
@@ -0,0 +1,96 @@
+"""
+Tests that incremental rendering gives the same HTML as a full render.
+"""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from markdown_editor.core.blocks import split_blocks
+from markdown_editor.core.markdown_processor import MarkdownProcessor
+
+SAMPLE_FILE = Path(__file__).resolve().parent.parent / "test_sample.md"
+
+CASES = {
+    'paragraphs': "First *paragraph*.\n\nSecond **paragraph**.\n",
+    'headings': "# Title\n\nText\n\n## Title\n\nMore\n\n## Title\n",
+    'headings_explicit_ids': "# A {#custom}\n\nText\n\n## B {#custom}\n\n## custom\n",
+    'headings_explicit_id_later': "# Custom\n\nText\n\n## Other {: .x #custom }\n\n```\n# Code {#code}\n```\n\n# Code\n",
+    'fence': "Before\n\n```python\ndef f():\n\n    return 1\n```\n\nAfter\n",
+    'list': "- one\n\n- two\n\n  continued\n\n- three\n",
+    'blockquote': "> quoted\n\n> still quoted\n\nPlain\n",
+    'definition_list': "Term\n: Definition\n\nOther\n: More\n",
+    'references': "A [link][ref] here.\n\nText\n\n[ref]: https://example.com\n",
+    'abbreviations': "The HTML spec.\n\nMore HTML.\n\n*[HTML]: Hyper Text Markup Language\n",
+    'footnotes': "One[^a]\n\nTwo[^b]\n\n[^a]: First note\n\n[^b]: Second note\n",
+    'html_div': "<div>\nraw\n\nstill raw\n</div>\n\nAfter\n",
+    'html_comment': "Intro\n\n<!-- a\n\nb -->\n\nAfter\n",
+    'html_comment_one_line': "<!-- note -->\n\nText *em*\n",
+    'html_p': "Intro\n\n<p>one\n\ntwo</p>\n\nAfter\n",
+    'html_script': "Intro\n\n<script>\nvar a = 1;\n\nvar b = 2;\n</script>\n\nAfter\n",
+    'html_style': "<style>\na {}\n\nb {}\n</style>\n\nText\n",
+    'html_hr': "<hr>\n\nText *em*\n",
+    'footnote_repeated_across_blocks': "First[^1]\n\nSecond[^1]\n\n[^1]: Note\n",
+    'footnote_repeated_in_block': "First[^1] and again[^1]\n\n[^1]: Note\n",
+    'footnotes_mixed': "A[^a] B[^b]\n\nC[^b]\n\n[^a]: x\n\n[^b]: y\n",
+}
+
+
+def normalize(html: str) -> str:
+    """Drop the extra blank line a full render leaves after raw HTML blocks."""
+    return re.sub(r'\n\n+(?=<)', '\n', html)
+
+
+def full_render(text: str) -> str:
+    """Render a document in one conversion."""
+    return MarkdownProcessor().markdown_to_html(text)
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_incremental_matches_full(name):
+    text = CASES[name]
+    incremental = MarkdownProcessor(incremental=True).markdown_to_html(text)
+    assert normalize(incremental) == normalize(full_render(text))
+
+
+@pytest.mark.parametrize('name', ['html_comment', 'html_p', 'html_script', 'html_style'])
+def test_raw_html_with_blank_lines_is_one_block(name):
+    raw_blocks = [block for block in split_blocks(CASES[name]) if block.startswith('<')]
+    assert len(raw_blocks) == 1
+
+
+def test_blocks_join_to_source():
+    text = "".join(CASES.values())
+    assert "".join(split_blocks(text)) == text
+
+
+def test_edits_reuse_cached_blocks():
+    processor = MarkdownProcessor(incremental=True)
+    text = "".join(CASES[name] + "\n" for name in ('paragraphs', 'fence', 'footnotes', 'html_comment'))
+    processor.markdown_to_html(text)
+    
+    edited = text.replace("Second **paragraph**", "Edited **paragraph**")
+    assert normalize(processor.markdown_to_html(edited)) == normalize(full_render(edited))
+    
+    # Referencing a footnote again needs the whole document
+    repeated = edited + "\nOnce more[^a]\n"
+    assert normalize(processor.markdown_to_html(repeated)) == normalize(full_render(repeated))
+
+
+@pytest.mark.skipif(not SAMPLE_FILE.exists(), reason="sample document missing")
+def test_sample_document():
+    text = SAMPLE_FILE.read_text(encoding='utf-8')
+    incremental = MarkdownProcessor(incremental=True).markdown_to_html(text)
+    assert normalize(incremental) == normalize(full_render(text))
+
+
+def test_draft_reuses_full_renders_of_unchanged_blocks():
+    text = "".join(f"Para {i}\n\n```python\nx = {i}\n```\n\n" for i in range(10))
+    processor = MarkdownProcessor(incremental=True)
+    full = processor.markdown_to_html_blocks(text)
+    
+    draft = processor.markdown_to_html_blocks(text.replace("Para 3", "Para three"), 'draft')
+    
+    assert len(draft) == len(full)
+    assert [index for index, (a, b) in enumerate(zip(full, draft)) if a != b] == [6]
@@ -0,0 +1,78 @@
+"""
+Tests for the pool of Markdown converter instances.
+"""
+
+import threading
+
+import markdown
+import pytest
+
+from markdown_editor.core.markdown_pool import MarkdownPool
+
+
+class FailingFactory:
+    """Builds Markdown instances, failing the first time."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("extension failed to load")
+        return markdown.Markdown()
+
+
+def test_instances_are_reused():
+    pool = MarkdownPool(markdown.Markdown, max_size=4)
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+    
+    assert second is first
+    assert pool.stats() == {'created': 1, 'idle': 1, 'max_size': 4, 'waits': 0}
+
+
+def test_concurrent_use_builds_up_to_max_size():
+    pool = MarkdownPool(markdown.Markdown, max_size=2)
+    with pool.acquire() as first, pool.acquire() as second:
+        assert second is not first
+    assert pool.stats()['created'] == 2
+
+
+def test_callers_wait_at_max_size():
+    pool = MarkdownPool(markdown.Markdown, max_size=1)
+    borrowed = []
+    
+    def borrow():
+        with pool.acquire() as other:
+            borrowed.append(other)
+    
+    with pool.acquire() as md:
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+    thread.join(5)
+    
+    assert borrowed == [md]
+    assert pool.stats()['waits'] == 1
+
+
+def test_instances_are_reset_before_use():
+    pool = MarkdownPool(lambda: markdown.Markdown(extensions=['markdown.extensions.footnotes']))
+    with pool.acquire() as md:
+        md.convert("Text[^1]\n\n[^1]: Note\n")
+    with pool.acquire() as md:
+        assert 'footnote' not in md.convert("Plain")
+
+
+def test_failed_build_frees_its_slot():
+    pool = MarkdownPool(FailingFactory(), max_size=1)
+    with pytest.raises(RuntimeError):
+        pool.prewarm(1)
+    assert pool.stats()['created'] == 0
+    
+    pool.prewarm(3)
+    assert pool.stats()['created'] == pool.stats()['idle'] == 1
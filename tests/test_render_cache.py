@@ -0,0 +1,96 @@
+"""
+Tests for the persistent cache of rendered HTML.
+"""
+
+import os
+
+from markdown_editor.core.render_cache import RenderCache
+
+HTML = "<p>" + "x" * 93 + "</p>"  # 100 bytes
+
+
+def put(cache, text, html=HTML):
+    key = cache.key(text)
+    cache.put(key, html)
+    return key
+
+
+def age(cache, key, seconds):
+    """Make an entry look last used some seconds ago."""
+    path = cache.directory / f"{key}.html"
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_round_trip(tmp_path):
+    cache = RenderCache("v1", directory=str(tmp_path))
+    key = put(cache, "# doc")
+    
+    assert cache.get(key) == HTML
+    assert cache.stats()['hits'] == 1
+
+
+def test_edited_content_misses(tmp_path):
+    cache = RenderCache("v1", directory=str(tmp_path))
+    put(cache, "# doc")
+    
+    assert cache.key("# doc\n") != cache.key("# doc")
+    assert cache.get(cache.key("# doc\n")) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_other_configuration_misses(tmp_path):
+    key = put(RenderCache("v1", directory=str(tmp_path)), "# doc")
+    
+    cache = RenderCache("v2", directory=str(tmp_path))
+    assert cache.get(key) is None
+    assert RenderCache("v1", directory=str(tmp_path)).get(key) == HTML
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = RenderCache("v1", directory=str(tmp_path), max_bytes=250)
+    first = put(cache, "first")
+    second = put(cache, "second")
+    cache.get(first)
+    third = put(cache, "third")
+    
+    assert cache.get(second) is None
+    assert cache.get(first) == HTML
+    assert cache.get(third) == HTML
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 200
+
+
+def test_recency_survives_restart(tmp_path):
+    cache = RenderCache("v1", directory=str(tmp_path))
+    first = put(cache, "first")
+    second = put(cache, "second")
+    age(cache, second, 60)
+    age(cache, first, 30)
+    
+    cache = RenderCache("v1", directory=str(tmp_path), max_bytes=150)
+    assert cache.get(second) is None
+    assert cache.get(first) == HTML
+
+
+def test_other_configurations_are_evicted_by_size(tmp_path):
+    old = RenderCache("v1", directory=str(tmp_path))
+    old_key = put(old, "old")
+    age(old, old_key, 60)
+    
+    cache = RenderCache("v2", directory=str(tmp_path), max_bytes=250)
+    assert old.directory.exists()
+    assert cache.stats()['bytes'] == 100
+    
+    put(cache, "first")
+    put(cache, "second")
+    assert not old.directory.exists()
+    assert cache.stats() == dict(cache.stats(), entries=2, bytes=200, evictions=1)
+
+
+def test_interrupted_writes_are_removed(tmp_path):
+    cache = RenderCache("v1", directory=str(tmp_path))
+    (cache.directory / "partial.html.1.tmp").write_text("<p>")
+    
+    RenderCache("v1", directory=str(tmp_path))
+    assert list(cache.directory.iterdir()) == []
@@ -0,0 +1,72 @@
+"""
+Tests for timing the processors of markdown conversions.
+"""
+
+import time
+
+import markdown
+
+from markdown_editor.core.render_profiler import RenderProfiler, format_profile_report
+
+TEXT = "# Title\n\nSome *text*.\n\n| a | b |\n| --- | --- |\n| 1 | 2 |\n"
+
+
+def create_markdown():
+    return markdown.Markdown(extensions=['markdown.extensions.tables'])
+
+
+def test_instrumented_output_is_unchanged():
+    expected = create_markdown().convert(TEXT)
+    
+    md = create_markdown()
+    profiler = RenderProfiler()
+    profiler.instrument(md)
+    profiler.instrument(md)
+    
+    assert md.convert(TEXT) == expected
+    assert profiler.report()['conversions'] == 1
+
+
+def test_time_is_attributed_to_extensions():
+    md = create_markdown()
+    profiler = RenderProfiler()
+    profiler.instrument(md)
+    md.convert(TEXT)
+    
+    report = profiler.report()
+    extensions = {entry['extension'] for entry in report['extensions']}
+    assert {'core', 'markdown.extensions.tables'} <= extensions
+    assert all(entry['calls'] for entry in report['processors'])
+    assert sum(entry['seconds'] for entry in report['extensions']) <= report['seconds']
+    assert "By extension (own time):" in format_profile_report(report)
+
+
+def test_nested_time_is_not_own_time():
+    profiler = RenderProfiler()
+    outer = profiler._entry('treeprocessors', 'outer', 'core')
+    inner = profiler._entry('inlinepatterns', 'inner', 'core')
+    
+    def run_outer():
+        profiler.measure(inner, time.sleep, 0.02)
+    
+    profiler.measure(outer, run_outer)
+    
+    assert inner['self_seconds'] >= 0.02
+    assert outer['seconds'] >= inner['seconds']
+    assert outer['self_seconds'] < 0.01
+
+
+def test_uninstrument_and_reset():
+    md = create_markdown()
+    profiler = RenderProfiler()
+    profiler.instrument(md)
+    md.convert(TEXT)
+    
+    profiler.reset()
+    assert profiler.report()['conversions'] == 0
+    assert profiler.report()['processors'] == []
+    
+    profiler.uninstrument()
+    assert 'convert' not in md.__dict__
+    md.convert(TEXT)
+    assert profiler.report()['conversions'] == 0
@@ -0,0 +1,71 @@
+"""
+Tests for choosing the preview render delay.
+"""
+
+import pytest
+
+from markdown_editor.core.render_scheduler import RenderScheduler
+
+
+def timing(seconds, characters, profile='full', cached=False):
+    return {'seconds': seconds, 'characters': characters, 'profile': profile, 'cached': cached}
+
+
+@pytest.mark.parametrize('characters, expected', [
+    (0, 50),
+    (1024, 50),
+    (100 * 1024 * 1024, 3000),
+])
+def test_delay_is_clamped(characters, expected):
+    assert RenderScheduler().delay(characters, 'full') == expected
+
+
+def test_delay_follows_render_cost():
+    scheduler = RenderScheduler(headroom=2.0)
+    scheduler.render_finished(1, timing(0.1, 10000))
+    
+    assert scheduler.delay(10000, 'full') == 200
+    assert scheduler.delay(1000, 'full') == 50
+    assert scheduler.delay(1000000, 'full') == 3000
+
+
+def test_slow_apply_lengthens_the_delay():
+    scheduler = RenderScheduler(headroom=1.0)
+    scheduler.render_finished(1, timing(0.1, 10000))
+    scheduler.record_apply(0.2)
+    
+    assert scheduler.delay(10000, 'full') == 300
+    assert scheduler.recent_decisions()[-1]['apply_ms'] == pytest.approx(200)
+
+
+def test_costs_are_averaged_per_profile():
+    scheduler = RenderScheduler(smoothing=0.5)
+    scheduler.render_finished(1, timing(1.0, 1000))
+    scheduler.render_finished(2, timing(3.0, 1000))
+    scheduler.render_finished(3, timing(0.01, 1000, profile='draft'))
+    
+    assert scheduler.expected_render_time(1000, 'full') == pytest.approx(2.0)
+    assert scheduler.expected_render_time(1000, 'draft') == pytest.approx(0.01)
+
+
+def test_cache_hits_are_not_render_cost():
+    scheduler = RenderScheduler()
+    scheduler.render_finished(1, timing(0.0001, 10000, cached=True))
+    
+    assert 'full' not in scheduler.seconds_per_char
+    assert scheduler.renders == 1
+
+
+def test_busy_until_latest_request_finishes():
+    scheduler = RenderScheduler()
+    scheduler.render_requested(1)
+    scheduler.render_requested(2)
+    scheduler.render_finished(1, timing(0.1, 100))
+    assert scheduler.busy
+    
+    scheduler.render_finished(2, timing(0.1, 100))
+    assert not scheduler.busy
+    
+    scheduler.render_requested(3)
+    scheduler.reset_generations()
+    assert not scheduler.busy
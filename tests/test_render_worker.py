@@ -0,0 +1,46 @@
+"""
+Tests for rendering previews on the render worker.
+"""
+
+import pytest
+
+pytest.importorskip('PyQt6.QtCore')
+
+from markdown_editor.core.markdown_processor import MarkdownProcessor
+from markdown_editor.core.render_cache import RenderCache
+from markdown_editor.core.render_worker import RenderWorker
+
+
+@pytest.fixture
+def worker(tmp_path):
+    processor = MarkdownProcessor(incremental=True)
+    cache = RenderCache("test", directory=str(tmp_path), min_size=16)
+    return RenderWorker(processor, render_cache=cache)
+
+
+def render(worker, markdown_text):
+    """Render a cacheable document directly on this thread."""
+    results = []
+    worker.rendered.connect(lambda generation, blocks: results.append(blocks))
+    worker.latest_generation += 1
+    worker._render(worker.latest_generation, markdown_text, True, 'full')
+    return results[-1]
+
+
+@pytest.mark.parametrize('markdown_text', [
+    " " * 64,
+    "\n" * 64,
+    "[ref]: https://example.com\n" * 4,
+])
+def test_cached_document_without_blocks(worker, markdown_text):
+    assert render(worker, markdown_text) == []
+    # The second render comes from the cache
+    assert render(worker, markdown_text) == []
+    assert worker.render_cache.stats()['hits'] == 1
+
+
+def test_cached_document_with_blocks(worker):
+    markdown_text = "# Title\n\n" + "Some text. " * 10
+    first = render(worker, markdown_text)
+    assert render(worker, markdown_text) == first
+    assert worker.render_cache.stats()['hits'] == 1
@@ -0,0 +1,134 @@
+"""
+Tests for reading and writing text files in their own format.
+"""
+
+import codecs
+import os
+
+import pytest
+
+from markdown_editor.core.text_file import DEFAULT_FORMAT, content_hash, detect_format, read_text, write_atomic
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="symbolic links not supported")
+def test_write_follows_symlink(tmp_path):
+    target = tmp_path / "real.md"
+    target.write_text("old\n", encoding='utf-8')
+    link = tmp_path / "link.md"
+    link.symlink_to(target)
+    
+    write_atomic(str(link), "new\n", tag="test")
+    
+    assert link.is_symlink()
+    assert target.read_text(encoding='utf-8') == "new\n"
+    assert read_text(str(link))[0] == "new\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["link.md", "real.md"]
+
+
+FORMATS = {
+    'utf8': {'encoding': 'utf-8', 'bom': False, 'newline': '\n'},
+    'utf8_bom': {'encoding': 'utf-8', 'bom': True, 'newline': '\n'},
+    'utf8_crlf': {'encoding': 'utf-8', 'bom': False, 'newline': '\r\n'},
+    'utf8_bom_crlf': {'encoding': 'utf-8', 'bom': True, 'newline': '\r\n'},
+    'utf16_le': {'encoding': 'utf-16-le', 'bom': True, 'newline': '\n'},
+    'utf16_be_crlf': {'encoding': 'utf-16-be', 'bom': True, 'newline': '\r\n'},
+    'utf16_le_no_bom': {'encoding': 'utf-16-le', 'bom': False, 'newline': '\n'},
+    'utf32_le': {'encoding': 'utf-32-le', 'bom': True, 'newline': '\n'},
+    'cp1252': {'encoding': 'cp1252', 'bom': False, 'newline': '\n'},
+    'cp1252_crlf': {'encoding': 'cp1252', 'bom': False, 'newline': '\r\n'},
+}
+
+CONTENT = "# Café €5\n\nNaïve “quotes” — done.\n"
+WIDE_CONTENT = CONTENT + "Emoji \U0001F600 and 中文\n"
+
+
+def content_for(file_format):
+    """Get test content the format can represent."""
+    return CONTENT if file_format['encoding'] == 'cp1252' else WIDE_CONTENT
+
+
+@pytest.mark.parametrize('name', sorted(FORMATS))
+def test_round_trip_keeps_format(tmp_path, name):
+    file_format = FORMATS[name]
+    content = content_for(file_format)
+    path = tmp_path / "doc.md"
+    write_atomic(str(path), content, file_format)
+    
+    read_content, read_format, read_hash = read_text(str(path), chunk_size=7)
+    
+    assert read_content == content
+    assert read_format == file_format
+    assert read_hash == content_hash(content)
+    
+    # Saving what was read writes the same bytes back
+    data = path.read_bytes()
+    write_atomic(str(path), read_content, read_format)
+    assert path.read_bytes() == data
+
+
+@pytest.mark.parametrize('name', sorted(FORMATS))
+def test_written_bytes(tmp_path, name):
+    file_format = FORMATS[name]
+    content = content_for(file_format)
+    path = tmp_path / "doc.md"
+    write_atomic(str(path), content, file_format)
+    
+    expected = content.replace('\n', file_format['newline']).encode(file_format['encoding'])
+    if file_format['bom']:
+        expected = '\ufeff'.encode(file_format['encoding']) + expected
+    assert path.read_bytes() == expected
+
+
+def test_detects_byte_order_marks():
+    assert detect_format(codecs.BOM_UTF8 + b"a\r\nb")['encoding'] == 'utf-8'
+    assert detect_format(codecs.BOM_UTF16_LE + "a\n".encode('utf-16-le'))['encoding'] == 'utf-16-le'
+    assert detect_format(codecs.BOM_UTF32_LE + "a\n".encode('utf-32-le'))['encoding'] == 'utf-32-le'
+
+
+def test_invalid_utf8_after_the_sniffed_prefix_falls_back(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_bytes(b"a" * 100 + b"\n\xff\xfe end\n")
+    
+    content, file_format, _ = read_text(str(path), chunk_size=16)
+    
+    assert file_format['encoding'] in ('cp1252', 'latin-1')
+    assert content.endswith(" end\n")
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.md"
+    path.write_bytes(b"")
+    
+    content, file_format, file_hash = read_text(str(path))
+    
+    assert content == ""
+    assert file_format == DEFAULT_FORMAT
+    assert file_hash == content_hash("")
+
+
+@pytest.mark.parametrize('name', ['cp1252', 'cp1252_crlf'])
+def test_unencodable_content_falls_back_to_utf8(tmp_path, name):
+    path = tmp_path / "doc.md"
+    write_atomic(str(path), CONTENT, FORMATS[name])
+    
+    file_format = write_atomic(str(path), WIDE_CONTENT, FORMATS[name])
+    
+    assert file_format == dict(FORMATS[name], encoding='utf-8')
+    assert read_text(str(path))[:2] == (WIDE_CONTENT, file_format)
+    assert [child.name for child in tmp_path.iterdir()] == ["doc.md"]
+
+
+def test_write_returns_the_format_written(tmp_path):
+    path = tmp_path / "doc.md"
+    assert write_atomic(str(path), CONTENT, FORMATS['cp1252']) == FORMATS['cp1252']
+
+
+def test_progress_reports_reach_the_total(tmp_path):
+    path = tmp_path / "doc.md"
+    reports = []
+    write_atomic(str(path), WIDE_CONTENT, chunk_size=10, progress=lambda done, total: reports.append((done, total)))
+    assert reports[-1] == (len(WIDE_CONTENT), len(WIDE_CONTENT))
+    
+    reports = []
+    read_text(str(path), chunk_size=10, progress=lambda done, total: reports.append((done, total)))
+    assert reports[-1][0] == reports[-1][1] == path.stat().st_size
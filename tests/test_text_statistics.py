@@ -0,0 +1,70 @@
+"""
+Tests that incrementally updated statistics match a full recount.
+"""
+
+import random
+
+import pytest
+
+from markdown_editor.core.text_statistics import TextStatistics
+
+TEXT = "# Title\n\nSome words here.\n\tTabbed  and  spaced\n\n- item one\n- item two\n"
+
+# (first line, replaced line count, new lines)
+EDITS = {
+    'insert_lines': (2, 0, ["New line of text", ""]),
+    'insert_at_end': (8, 0, ["trailing words"]),
+    'delete_lines': (1, 3, []),
+    'delete_all': (0, 8, [""]),
+    'edit_in_line': (2, 1, ["Some more words here."]),
+    'split_line': (2, 1, ["Some words", " here."]),
+    'join_lines': (5, 2, ["- item one- item two"]),
+}
+
+
+def apply_edit(text, first, count, lines):
+    old_lines = text.split('\n')
+    old_lines[first:first + count] = lines
+    return '\n'.join(old_lines)
+
+
+def recount(text):
+    return {
+        'words': len(text.split()),
+        'characters': len(text),
+        'characters_no_spaces': len(''.join(text.split())),
+        'lines': text.count('\n') + 1,
+        'reading_minutes': len(text.split()) / 200,
+    }
+
+
+def test_initial_counts():
+    assert TextStatistics(TEXT).stats() == recount(TEXT)
+    assert TextStatistics().stats() == recount("")
+
+
+@pytest.mark.parametrize('name', sorted(EDITS))
+def test_edit_matches_recount(name):
+    statistics = TextStatistics(TEXT)
+    statistics.replace_lines(*EDITS[name])
+    
+    assert statistics.stats() == recount(apply_edit(TEXT, *EDITS[name]))
+
+
+def test_random_edits_match_recount():
+    rng = random.Random(7)
+    words = ["alpha", "beta", " ", "\t", "gamma delta", ""]
+    text = TEXT
+    statistics = TextStatistics(text)
+    
+    for _ in range(200):
+        line_count = text.count('\n') + 1
+        first = rng.randrange(line_count)
+        count = rng.randint(0, min(3, line_count - first))
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 3))]
+        if count == line_count and not lines:
+            lines = [""]  # A document has at least one line
+        
+        text = apply_edit(text, first, count, lines)
+        statistics.replace_lines(first, count, lines)
+        assert statistics.stats() == recount(text)